@@ -0,0 +1,122 @@
+"""Camera watchdog recovery times, measured on a live PresenceMonitor.
+
+The camera is replaced by FaultInjectingCameras and the detector always sees
+a face, so the numbers are purely the watchdog's: how long until frames flow
+again after a fault clears, how long a failover to the alternate source takes,
+and how long until the lock policy fires when no camera is left.
+
+    python benchmarks/bench_camera_recovery.py --outage 0.5 2 5 --lock-after 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.camera_watchdog import FaultInjectingCameras, HEALTHY
+from core.presence_monitor import BaseDetector, PresenceMonitor
+
+PRIMARY, ALTERNATE = 0, 1
+
+
+class AlwaysPresent(BaseDetector):
+    def detect(self, frame):
+        return True
+
+
+def _monitor(cameras, base_backoff, max_backoff, lock_after=None, alternates=()):
+    events = []
+    monitor = PresenceMonitor(AlwaysPresent(), lambda present: events.append((present, time.monotonic())),
+                              alternate_sources=alternates, camera_factory=cameras.open,
+                              camera_lock_after=lock_after)
+    monitor.grace_period_seconds = 0
+    monitor.camera.base_backoff = base_backoff
+    monitor.camera.max_backoff = max_backoff
+    monitor.start()
+    return monitor, events
+
+
+def _wait_for(condition, timeout):
+    start = time.monotonic()
+    while not condition():
+        if time.monotonic() - start > timeout:
+            return None
+        time.sleep(0.005)
+    return time.monotonic()
+
+
+def recovery_after_outage(outage, mode, base_backoff, max_backoff):
+    cameras = FaultInjectingCameras(sources=(PRIMARY,))
+    monitor, _ = _monitor(cameras, base_backoff, max_backoff)
+    try:
+        _wait_for(lambda: monitor.camera.health == HEALTHY, 5)
+        cameras.set_fault(PRIMARY, mode)
+        _wait_for(lambda: monitor.camera.health != HEALTHY, 5)
+        time.sleep(outage)
+        restored = time.monotonic()
+        cameras.set_fault(PRIMARY, FaultInjectingCameras.OK)
+        healthy = _wait_for(lambda: monitor.camera.health == HEALTHY, outage + max_backoff + 5)
+        return (healthy - restored) if healthy else None, monitor.camera.reconnects
+    finally:
+        monitor.stop()
+        monitor.join()
+
+
+def failover(base_backoff, max_backoff, mode=FaultInjectingCameras.MISSING):
+    cameras = FaultInjectingCameras(sources=(PRIMARY, ALTERNATE))
+    monitor, _ = _monitor(cameras, base_backoff, max_backoff, alternates=(ALTERNATE,))
+    try:
+        _wait_for(lambda: monitor.camera.health == HEALTHY, 5)
+        unplugged = time.monotonic()
+        cameras.set_fault(PRIMARY, mode)
+        switched = _wait_for(lambda: monitor.camera.active_source == ALTERNATE
+                             and monitor.camera.health == HEALTHY, 10)
+        return (switched - unplugged) if switched else None
+    finally:
+        monitor.stop()
+        monitor.join()
+
+
+def lock_on_outage(lock_after, base_backoff, max_backoff):
+    cameras = FaultInjectingCameras(sources=(PRIMARY,))
+    monitor, events = _monitor(cameras, base_backoff, max_backoff, lock_after=lock_after)
+    try:
+        _wait_for(lambda: monitor.camera.health == HEALTHY, 5)
+        unplugged = time.monotonic()
+        cameras.set_fault(PRIMARY, FaultInjectingCameras.MISSING)
+        locked = _wait_for(lambda: any(not present for present, _ in events), lock_after + 10)
+        return (locked - unplugged) if locked else None
+    finally:
+        monitor.stop()
+        monitor.join()
+
+
+def _ms(value):
+    return f"{value * 1000:.0f} ms" if value is not None else "never"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outage", type=float, nargs="+", default=[0.5, 2.0, 5.0],
+                        help="Seconds the camera stays broken before the fault is cleared.")
+    parser.add_argument("--base-backoff", type=float, default=0.5)
+    parser.add_argument("--max-backoff", type=float, default=4.0)
+    parser.add_argument("--lock-after", type=float, default=3.0, help="camera_lock_after for the policy case.")
+    args = parser.parse_args()
+
+    print(f"{'fault':<14}{'outage':>10}{'recovery':>12}{'reconnects':>12}")
+    for mode in (FaultInjectingCameras.READ_ERRORS, FaultInjectingCameras.MISSING):
+        for outage in args.outage:
+            recovery, reconnects = recovery_after_outage(outage, mode, args.base_backoff, args.max_backoff)
+            print(f"{mode:<14}{outage:>9.1f}s{_ms(recovery):>12}{reconnects:>12}")
+
+    print(f"\nFailover to alternate source: {_ms(failover(args.base_backoff, args.max_backoff))} (primary unplugged), "
+          f"{_ms(failover(args.base_backoff, args.max_backoff, FaultInjectingCameras.READ_ERRORS))} "
+          f"(primary opens but every read fails)")
+    print(f"Lock with camera_lock_after={args.lock_after:g}s: "
+          f"{_ms(lock_on_outage(args.lock_after, args.base_backoff, args.max_backoff))} after unplug")
+
+
+if __name__ == "__main__":
+    main()
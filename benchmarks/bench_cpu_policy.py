@@ -0,0 +1,153 @@
+"""Detector throughput and interference for each CPU policy setting.
+
+Every row runs in a fresh process (cv2 thread settings are process-wide) on
+synthetic 720p frames, with the detector the monitor would use (Haar when
+the cascade loads, otherwise the skin detector). Columns:
+
+- ``fps``: detections per second on the monitor thread, honouring the
+  policy's ``detection_interval``.
+- ``cpu%``: CPU time of the monitoring process per wall second (100 = one core).
+- ``gui p99``: 99th percentile lateness of a 10 ms timer on another thread of
+  the same process, i.e. what a Tk window would feel.
+- ``other``: throughput of an unrelated CPU-bound process running at the same
+  time, relative to running it alone.
+
+    python benchmarks/bench_cpu_policy.py --seconds 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COMPETITOR = """
+import sys, time
+end = time.perf_counter() + float(sys.argv[1])
+count = 0
+while time.perf_counter() < end:
+    for _ in range(1000):
+        count += 1
+print(count)
+"""
+
+
+def matrix():
+    cores = os.cpu_count() or 1
+    rows = [('default', 'default'), ('threads=1', {'opencv_threads': 1})]
+    if cores > 1:
+        rows.append((f'threads={cores}', {'opencv_threads': cores}))
+    rows += [('threads=0 (no pool)', {'opencv_threads': 0}),
+             ('use_optimized=off', {'use_optimized': False}),
+             ('pinned to core 0', {'monitor_cores': [0]}),
+             ('priority=idle', {'monitor_priority': 'idle'}),
+             ('balanced', 'balanced'),
+             ('low_impact', 'low_impact')]
+    return rows
+
+
+def start_competitor(seconds):
+    return subprocess.Popen([sys.executable, '-c', COMPETITOR, str(seconds)], stdout=subprocess.PIPE, text=True)
+
+
+def worker(setting, seconds, with_competitor):
+    """Runs in the child process; prints one JSON line."""
+    import cv2
+    import numpy as np
+    from core.cpu_policy import CpuPolicy
+    from core.presence_monitor import CustomSkinDetector, HaarCascadeDetector
+
+    os.chdir(ROOT)  # the cascade path is relative to the repo root
+    try:
+        detector, name = HaarCascadeDetector(), 'haar'
+    except (AttributeError, FileNotFoundError, ValueError, cv2.error):
+        detector, name = CustomSkinDetector(), 'skin'
+    policy = CpuPolicy.from_setting(setting if isinstance(setting, str) else dict(setting, preset='default'))
+    policy.apply_to_opencv()
+    interval = policy.detection_interval or 0.0
+
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(4)]
+    for frame in frames:
+        cv2.rectangle(frame, (500, 200), (780, 520), (120, 150, 200), -1)  # skin-toned block
+
+    stop = threading.Event()
+    detections = 0
+    lateness = []
+
+    def monitor():
+        nonlocal detections
+        policy.apply_to_current_thread()
+        while not stop.is_set():
+            detector.detect(frames[detections % len(frames)])
+            detections += 1
+            if interval:
+                stop.wait(interval)
+
+    def gui():
+        while not stop.is_set():
+            due = time.perf_counter() + 0.01
+            time.sleep(0.01)
+            lateness.append(time.perf_counter() - due)
+
+    threads = [threading.Thread(target=monitor), threading.Thread(target=gui)]
+    # Started only now so that importing cv2 and building frames do not count against it.
+    competitor = start_competitor(seconds) if with_competitor else None
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    lateness.sort()
+    print(json.dumps({'detector': name, 'fps': detections / wall, 'cpu': 100 * cpu / wall,
+                      'gui_p99_ms': 1e3 * lateness[int(0.99 * (len(lateness) - 1))],
+                      'opencv_threads': cv2.getNumThreads(),
+                      'other_count': int(competitor.communicate()[0]) if competitor else None}))
+
+
+def run_row(setting, seconds, competitor_alone):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', json.dumps(setting), '--seconds', str(seconds)]
+    if competitor_alone:
+        command.append('--competitor')
+    child = subprocess.run(command, capture_output=True, text=True, check=True)
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    if competitor_alone:
+        result['other'] = result['other_count'] / competitor_alone
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0, help="Measurement time per row.")
+    parser.add_argument('--no-competitor', action='store_true', help="Skip the interference measurement.")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--competitor', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(json.loads(args.worker), args.seconds, args.competitor)
+        return
+
+    competitor_alone = None
+    if not args.no_competitor:
+        competitor = start_competitor(args.seconds)
+        competitor_alone = int(competitor.communicate()[0])
+
+    print(f"{os.cpu_count()} logical CPU(s), {args.seconds:.0f} s per row")
+    print(f"{'policy':<22}{'detector':>9}{'cv2 thr':>8}{'fps':>8}{'cpu%':>7}{'gui p99':>10}{'other':>8}")
+    for label, setting in matrix():
+        r = run_row(setting, args.seconds, competitor_alone)
+        other = f"{100 * r['other']:.0f}%" if 'other' in r else '-'
+        print(f"{label:<22}{r['detector']:>9}{r['opencv_threads']:>8}{r['fps']:>8.1f}{r['cpu']:>7.0f}"
+              f"{r['gui_p99_ms']:>8.1f}ms{other:>8}")
+
+
+if __name__ == "__main__":
+    main()
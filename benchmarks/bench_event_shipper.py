@@ -0,0 +1,141 @@
+"""Load test: hundreds of simulated agents shipping events to one collector.
+
+Every agent is a real EventShipper (own thread, keep-alive connection and
+spool directory) fed with a realistic mix of presence, lockdown and device
+events. Half way through, the collector goes down for ``--outage`` seconds,
+so every agent has to spool and later drain its backlog. At the end all
+agents are stopped and delivery is checked: every event accepted by an agent
+must reach the collector exactly once (duplicates from retries are dropped by
+batch id).
+
+    python benchmarks/bench_event_shipper.py --agents 300 --duration 20 --outage 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_collector import EventCollector
+from core.event_shipper import EventShipper
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    return float('nan')
+
+
+def agent_events(rng, now):
+    # Mostly presence flips; now and then a lockdown that touches a few dozen devices.
+    if rng.random() < 0.9:
+        return [{'type': 'presence', 'time': now, 'present': rng.random() < 0.5}]
+    devices = rng.randint(10, 60)
+    events = [{'type': 'device', 'time': now, 'device': f"USB\\VID_{rng.randint(0, 0xFFFF):04X}&PID_{i:04X}\\{i:08d}",
+               'change': 'disabled', 'ok': rng.random() > 0.01, 'user_present': False} for i in range(devices)]
+    events.append({'type': 'lockdown', 'time': now, 'level': 'standard', 'seconds': devices * 0.2,
+                   'completed': True})
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', type=int, default=300)
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds of event generation.")
+    parser.add_argument('--outage', type=float, default=5.0, help="Collector downtime in the middle of the run.")
+    parser.add_argument('--rate', type=float, default=2.0, help="Event bursts per agent per second.")
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--flush-interval', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    collector = EventCollector().start()
+    rss_before = rss_mb()
+    with tempfile.TemporaryDirectory() as spool_root:
+        shippers = [EventShipper(collector.url, spool_dir=os.path.join(spool_root, f"agent{i:04d}"),
+                                 agent_id=f"agent{i:04d}", batch_size=args.batch_size,
+                                 flush_interval=args.flush_interval, base_backoff=0.5, max_backoff=4.0)
+                    for i in range(args.agents)]
+        for shipper in shippers:
+            shipper.start()
+
+        peak_spooled = peak_buffered = 0
+        peak_rss = rss_mb()
+        stop = threading.Event()
+
+        def watch():
+            nonlocal peak_spooled, peak_buffered, peak_rss
+            while not stop.wait(0.25):
+                peak_spooled = max(peak_spooled, sum(s.spooled_batches() for s in shippers))
+                peak_buffered = max(peak_buffered, sum(s.buffered_events() for s in shippers))
+                peak_rss = max(peak_rss, rss_mb())
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+
+        start = time.monotonic()
+        outage_at = start + (args.duration - args.outage) / 2
+        outage_started = False
+        tick = 1.0 / args.rate
+        next_tick = start
+        while time.monotonic() - start < args.duration:
+            if not outage_started and time.monotonic() >= outage_at:
+                collector.outage(args.outage)
+                outage_started = True
+            now = time.time()
+            for shipper in shippers:
+                for event in agent_events(rng, now):
+                    shipper.submit(event)
+            next_tick += tick
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+        generated_s = time.monotonic() - start
+
+        # Let the backlog drain, then stop every agent.
+        drain_start = time.monotonic()
+        while any(s.spooled_batches() or s.buffered_events() for s in shippers) and time.monotonic() - drain_start < 60:
+            time.sleep(0.25)
+        drain_s = time.monotonic() - drain_start
+        for shipper in shippers:
+            shipper.stop()
+        stop.set()
+        watcher.join()
+
+    collector.stop()
+    submitted = sum(s.events_submitted for s in shippers)
+    dropped = sum(s.events_dropped for s in shippers)
+    sent = sum(s.events_sent for s in shippers)
+    raw = sum(s.bytes_raw for s in shippers)
+    compressed = sum(s.bytes_sent for s in shippers)
+    connections = sum(s.connections_opened for s in shippers)
+    batches = sum(s.batches_sent for s in shippers)
+    received = collector.total_events()
+
+    print(f"agents                 {args.agents}")
+    print(f"events submitted       {submitted}  ({submitted / generated_s:.0f}/s)")
+    print(f"events received        {received}  (dropped by agents: {dropped}, duplicate batches: "
+          f"{collector.duplicate_batches})")
+    print(f"batches                {batches}  ({sent / max(batches, 1):.0f} events each)")
+    print(f"payload                {raw / 1e6:.1f} MB raw -> {compressed / 1e6:.1f} MB gzip "
+          f"({raw / max(compressed, 1):.1f}x)")
+    print(f"connections opened     {connections}  ({connections / args.agents:.2f} per agent; "
+          f"collector accepted {collector.connections})")
+    print(f"peak spooled batches   {peak_spooled}  (outage {args.outage:.0f} s)")
+    print(f"peak buffered events   {peak_buffered}")
+    print(f"drain after generation {drain_s:.1f} s")
+    print(f"process RSS            {rss_before:.0f} MB before agents, {peak_rss:.0f} MB peak")
+    if received != submitted - dropped:
+        raise SystemExit(f"Delivery mismatch: {submitted - dropped} accepted, {received} received")
+    print("Every accepted event was delivered exactly once.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Idle memory and CPU: headless service vs the all-in-one Tk process.
+
+Each variant runs in a fresh interpreter with a simulated system backend and
+monitoring stopped, idles for ``--idle`` seconds and reports its resident set
+size and the CPU time used while idle.
+
+- ``service``: what service.py loads — MonitorService plus the IPC channel.
+- ``gui``: what FaceLockApp has loaded once the main window is up — Tk, the
+  GUI package, pystray/PIL, plyer, bcrypt and OpenCV (preloaded in the
+  background). Tk needs a display; without one the Tk root is skipped and only
+  the imports are counted, which understates the GUI's footprint.
+
+    python benchmarks/bench_footprint.py --idle 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = """
+import json, os, sys, time
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+def report(idle, notes):
+    startup_rss = rss_mb()
+    cpu_start = sum(os.times()[:2])
+    time.sleep(idle)
+    cpu = sum(os.times()[:2]) - cpu_start
+    print(json.dumps({'startup_rss_mb': startup_rss, 'idle_rss_mb': rss_mb(),
+                      'idle_cpu_ms': cpu * 1000, 'notes': notes}), flush=True)
+"""
+
+SERVICE_PROBE = MEASURE + """
+from core.config_store import ConfigStore
+from core.ipc import IPCServer
+from core.monitor_service import MonitorService
+from core.system_backends import SimulatedBackend
+from core.system_controller import SystemController
+from core.lockdown_journal import LockdownJournal
+
+controller = SystemController(backend=SimulatedBackend(call_latency=0.0), journal=LockdownJournal(path=%(journal)r))
+service = MonitorService(controller, ConfigStore())
+server = IPCServer(service, 'bench', port=0)
+server.start()
+report(%(idle)r, [])
+server.stop()
+"""
+
+GUI_PROBE = MEASURE + """
+notes = []
+import main
+for name in ("bcrypt", "core.presence_monitor", "gui.main_window", "pystray", "plyer"):
+    try:
+        __import__(name)
+    except Exception as e:
+        notes.append(f"import {name} failed: {e.__class__.__name__}")
+try:
+    import tkinter
+    root = tkinter.Tk()
+    root.withdraw()
+    # Keep Tk's event loop ticking while we idle, as mainloop() would.
+    import threading
+    done = threading.Event()
+    def idle_then_quit():
+        report(%(idle)r, notes)
+        done.set()
+    threading.Thread(target=idle_then_quit, daemon=True).start()
+    while not done.is_set():
+        root.update()
+        time.sleep(0.02)
+except tkinter.TclError:
+    notes.append("no display: Tk root not created")
+    report(%(idle)r, notes)
+"""
+
+
+def _probe(code):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"Probe failed:\n{result.stderr.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=float, default=10.0, help="Seconds to idle before measuring.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        params = {'idle': args.idle, 'journal': os.path.join(tmp, "journal.jsonl")}
+        results = {'service': _probe(SERVICE_PROBE % params), 'gui': _probe(GUI_PROBE % params)}
+
+    print(f"{'variant':<10}{'startup RSS':>13}{'idle RSS':>11}{'idle CPU':>11}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['startup_rss_mb']:>11.1f}MB{result['idle_rss_mb']:>9.1f}MB"
+              f"{result['idle_cpu_ms']:>9.0f}ms")
+        for note in result['notes']:
+            print(f"  {name}: {note}")
+
+
+if __name__ == "__main__":
+    main()
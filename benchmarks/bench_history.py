@@ -0,0 +1,78 @@
+"""Query latency of the presence history store over months of synthetic data.
+
+Writes a history of ``--days`` days with one presence sample per
+``--interval`` seconds and a few locks per day, then times the report queries
+over the full range and over the last week.
+
+    python benchmarks/bench_history.py --days 30 180 --interval 60
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.presence_history import DAY, KIND_AWAY, KIND_LOCK, KIND_LOCKDOWN, KIND_PRESENT, PresenceHistory
+
+
+def populate(directory, days, interval, seed=1):
+    rng = np.random.default_rng(seed)
+    history = PresenceHistory(directory, segment_capacity=65536)
+    now = time.time()
+    start = now - days * DAY
+    samples = int(days * DAY / interval)
+    away = rng.random(samples) < 0.3
+    write_start = time.perf_counter()
+    for i in range(samples):
+        t = start + i * interval
+        history.record(KIND_AWAY if away[i] else KIND_PRESENT, duration=interval, timestamp=t)
+        if away[i] and not away[i - 1] and rng.random() < 0.2:
+            history.record(KIND_LOCK, timestamp=t)
+            history.record(KIND_LOCKDOWN, duration=float(rng.gamma(2.0, 0.5)), timestamp=t)
+    write_seconds = time.perf_counter() - write_start
+    history.close()
+    return now, samples, write_seconds
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 180])
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds per presence sample.")
+    args = parser.parse_args()
+
+    print(f"{'days':>6}{'records':>10}{'size':>9}{'append':>10}{'open':>9}"
+          f"{'away/day':>10}{'locks/hr':>10}{'last 7d':>9}")
+    for days in args.days:
+        with tempfile.TemporaryDirectory() as directory:
+            now, samples, write_seconds = populate(directory, days, args.interval)
+            size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+
+            open_start = time.perf_counter()
+            history = PresenceHistory(directory, readonly=True)
+            open_ms = (time.perf_counter() - open_start) * 1000
+            records = len(history.query())
+
+            away_ms = timed(lambda: history.away_minutes_per_day())
+            locks_ms = timed(lambda: history.locks_per_hour())
+            week_ms = timed(lambda: (history.away_minutes_per_day(now - 7 * DAY, now),
+                                     history.locks_by_hour_of_day(now - 7 * DAY, now)))
+            history.close()
+        print(f"{days:>6}{records:>10}{size / 1e6:>7.1f}MB{write_seconds / samples * 1e6:>8.1f}us"
+              f"{open_ms:>7.1f}ms{away_ms:>8.1f}ms{locks_ms:>8.1f}ms{week_ms:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Throughput and fidelity of the vectorized lock-policy simulator.
+
+Generates labelled synthetic detection traces of growing length, times a full
+policy sweep over each, and checks a sample of policies against the real
+PresenceMonitor._update_state driven sample by sample with a fake clock.
+
+    python benchmarks/bench_lock_policy.py --days 1 7 28
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.presence_monitor as presence_monitor
+from core.lock_policy import PolicySimulator, session_starts, synthetic_trace
+
+
+class _FakeClock:
+    # Stands in for the time module inside core.presence_monitor.
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+def monitor_lock_times(timestamps, detected, lock_delay, grace_period):
+    """Feeds the trace through PresenceMonitor._update_state as run() would."""
+    clock = _FakeClock()
+    locks = []
+    real_time = presence_monitor.time
+    presence_monitor.time = clock
+    try:
+        monitor = None
+        for t, face, new_session in zip(timestamps, detected, session_starts(timestamps)):
+            clock.now = t
+            if new_session:
+                monitor = presence_monitor.PresenceMonitor(
+                    detector_engine=None, lock_delay=lock_delay, camera_factory=lambda source: None,
+                    on_presence_change=lambda present: None if present else locks.append(clock.now))
+                session_start = t
+            # run() treats grace-period frames as present.
+            monitor._update_state(bool(face) or t - session_start < grace_period)
+    finally:
+        presence_monitor.time = real_time
+    return np.array(locks)
+
+
+def verify(days, seed):
+    timestamps, detected, truth = synthetic_trace(days=days, hours_per_day=1.0, seed=seed, miss_rate=0.03)
+    timestamps[len(timestamps) // 2:] += 120  # a monitor restart half way through
+    simulator = PolicySimulator(timestamps, detected, truth)
+    checked = 0
+    for lock_delay in (2.0, 5.0, 10.0, 20.0):
+        for grace in (0.0, 5.0):
+            expected = monitor_lock_times(timestamps, detected, lock_delay, grace)
+            if not np.array_equal(simulator.lock_times(lock_delay, grace), expected):
+                raise SystemExit(f"Mismatch with PresenceMonitor at lock_delay={lock_delay}, grace={grace}")
+            checked += 1
+    return checked, len(timestamps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=float, nargs='+', default=[1, 7, 28])
+    parser.add_argument('--hours-per-day', type=float, default=9.0)
+    parser.add_argument('--rate', type=float, default=10.0, help="Detection samples per second.")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    checked, samples = verify(2, args.seed)
+    print(f"Matches PresenceMonitor._update_state on {checked} policies ({samples} samples each).\n")
+
+    lock_delays = np.arange(2.0, 61.0, 2.0)
+    grace_periods = (0.0, 5.0, 10.0)
+    intervals = (0.0, 0.25, 0.5, 1.0)
+    smoothing = ((1, 1), (2, 3), (3, 5), (5, 8))
+    policies = len(lock_delays) * len(grace_periods) * len(intervals) * len(smoothing)
+
+    header = f"{'days':>6} {'samples':>11} {'policies':>9} {'setup s':>8} {'sweep s':>8} {'us/policy/day':>14}"
+    print(header)
+    print("-" * len(header))
+    for days in args.days:
+        timestamps, detected, truth = synthetic_trace(days=int(days), hours_per_day=args.hours_per_day,
+                                                      rate=args.rate, seed=args.seed)
+        start = time.perf_counter()
+        simulator = PolicySimulator(timestamps, detected, truth)
+        setup = time.perf_counter() - start
+        start = time.perf_counter()
+        simulator.run(lock_delays, grace_periods, intervals, smoothing)
+        sweep = time.perf_counter() - start
+        print(f"{days:>6g} {len(timestamps):>11} {policies:>9} {setup:>8.2f} {sweep:>8.2f} "
+              f"{sweep / policies / days * 1e6:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
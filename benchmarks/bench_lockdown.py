@@ -0,0 +1,87 @@
+"""Lock and restore latency of the lockdown path against a simulated backend.
+
+Runs on any OS: devcon and the registry are replaced by SimulatedBackend, so
+only the orchestration cost (device filtering, journaling, parallel restore)
+and the modelled per-call latency are measured.
+
+    python benchmarks/bench_lockdown.py --devices 10 50 200 1000 --latency 0.005
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.lockdown import apply_lockdown
+from core.lockdown_journal import LockdownJournal
+from core.system_backends import SimulatedBackend
+from core.system_controller import SystemController
+
+
+def _controller(journal_dir, device_count, latency, failure_rate, seed):
+    backend = SimulatedBackend(device_count=device_count, call_latency=latency,
+                               failure_rate=failure_rate, seed=seed)
+    journal = LockdownJournal(path=os.path.join(journal_dir, f"journal_{device_count}.jsonl"))
+    return SystemController(journal=journal, backend=backend), backend
+
+
+def _lock(controller, lockdown_level):
+    # The synchronous lockdown path (see bench_orchestrator.py for the background one).
+    start = time.perf_counter()
+    controller.lock_workstation()
+    apply_lockdown(controller, lockdown_level, whitelisted_ids=set())
+    return time.perf_counter() - start
+
+
+def run_case(journal_dir, device_count, latency, failure_rate, lockdown_level, seed=1):
+    controller, backend = _controller(journal_dir, device_count, latency, failure_rate, seed)
+    lock_s = _lock(controller, lockdown_level)
+    disabled = len(backend.disabled_devices())
+
+    start = time.perf_counter()
+    controller.reset_all_usb_ports()
+    journal_restore_s = time.perf_counter() - start
+    left_disabled = len(backend.disabled_devices())
+    devcon_failures = controller.devcon_failures
+
+    controller, backend = _controller(journal_dir, device_count, latency, failure_rate, seed)
+    _lock(controller, lockdown_level)
+    start = time.perf_counter()
+    controller.full_usb_reset()
+    blanket_restore_s = time.perf_counter() - start
+    controller.journal.compact()
+
+    return {
+        'devices': device_count,
+        'disabled': disabled,
+        'lock_ms': lock_s * 1000,
+        'journal_restore_ms': journal_restore_s * 1000,
+        'blanket_restore_ms': blanket_restore_s * 1000,
+        'left_disabled': left_disabled,
+        'devcon_failures': devcon_failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--devices', type=int, nargs='+', default=[10, 50, 200, 1000])
+    parser.add_argument('--latency', type=float, default=0.005, help="Seconds per devcon call per device.")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--level', choices=['standard', 'total'], default='standard')
+    args = parser.parse_args()
+
+    header = f"{'devices':>8} {'disabled':>9} {'lock ms':>10} {'journal restore ms':>19} " \
+             f"{'blanket restore ms':>19} {'left disabled':>14} {'devcon failures':>16}"
+    print(header)
+    print("-" * len(header))
+    with tempfile.TemporaryDirectory() as journal_dir:
+        for device_count in args.devices:
+            r = run_case(journal_dir, device_count, args.latency, args.failure_rate, args.level)
+            print(f"{r['devices']:>8} {r['disabled']:>9} {r['lock_ms']:>10.1f} {r['journal_restore_ms']:>19.1f} "
+                  f"{r['blanket_restore_ms']:>19.1f} {r['left_disabled']:>14} {r['devcon_failures']:>16}")
+
+
+if __name__ == "__main__":
+    main()
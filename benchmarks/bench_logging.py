@@ -0,0 +1,91 @@
+"""Hot-path latency with logging enabled: direct handlers vs the queue pipeline.
+
+Each iteration mimics PresenceMonitor._update_state: take a lock, log one
+line, release it. "direct" attaches the rotating file and console handlers
+to the logger (the old setup); "queued" is what setup_logging now installs.
+Console output goes to os.devnull so the terminal does not skew the numbers.
+
+    python benchmarks/bench_logging.py --iterations 20000
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger_setup import JsonLinesFormatter, RateLimitFilter, _build_handlers
+
+TEXT_FORMAT = logging.Formatter('%(asctime)s - %(levelname)s - [%(module)s:%(lineno)d] - %(message)s')
+
+
+def _hot_path(logger, iterations, warn_every):
+    lock = threading.Lock()
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        with lock:
+            if warn_every and i % warn_every == 0:
+                logger.warning("Failed to grab frame. Retrying...")
+            else:
+                logger.info(f"Presence DETECTED. frame={i}")
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'p50_us': samples[len(samples) // 2] * 1e6,
+        'p99_us': samples[int(len(samples) * 0.99)] * 1e6,
+        'max_us': samples[-1] * 1e6,
+    }
+
+
+def run(mode, log_dir, iterations, json_lines, warn_every, devnull):
+    logger = logging.getLogger(f"bench.{mode}.{json_lines}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    log_format = JsonLinesFormatter() if json_lines else TEXT_FORMAT
+    handlers = _build_handlers(os.path.join(log_dir, f"{mode}_{json_lines}"), log_format, stream=devnull)
+    listener = None
+    if mode == "direct":
+        for handler in handlers:
+            logger.addHandler(handler)
+    else:
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+        logger.addHandler(queue_handler)
+        listener = QueueListener(log_queue, *handlers)
+        listener.start()
+
+    result = _hot_path(logger, iterations, warn_every)
+
+    if listener:
+        listener.stop()
+    for handler in handlers:
+        handler.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--warn-every', type=int, default=10,
+                        help="Log the repeated 'Failed to grab frame' warning every N iterations (0 = never).")
+    args = parser.parse_args()
+
+    print(f"{'pipeline':>8} {'format':>6} {'p50 us':>9} {'p99 us':>9} {'max us':>10}")
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, 'w') as devnull:
+        for json_lines in (False, True):
+            for mode in ("direct", "queued"):
+                os.makedirs(os.path.join(log_dir, f"{mode}_{json_lines}"))
+                r = run(mode, log_dir, args.iterations, json_lines, args.warn_every, devnull)
+                print(f"{mode:>8} {'json' if json_lines else 'text':>6} "
+                      f"{r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['max_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
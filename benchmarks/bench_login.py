@@ -0,0 +1,106 @@
+"""Tk event-loop stall time while a login is being verified.
+
+A 5 ms after() ticker runs on the Tk thread; the longest gap between ticks is
+the stall the user feels. "sync" calls bcrypt directly on the Tk thread (the
+old LoginWindow.check_password); "async" presses Return on the real
+LoginWindow several times in a row and waits for on_login_success.
+Needs a display (use xvfb-run on headless agents).
+
+    python benchmarks/bench_login.py --rounds 12 --presses 5
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.security_manager import SecurityManager
+from gui.login_window import LoginWindow
+
+PASSWORD = "benchmark-password"
+TICK_MS = 5
+
+
+class StallMeter:
+    def __init__(self, root):
+        self.root = root
+        self.max_gap = 0.0
+        self._last = None
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._last = time.perf_counter()
+        self.root.after(TICK_MS, self._tick)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.max_gap = max(self.max_gap, now - self._last)
+        self._last = now
+        if self._running:
+            self.root.after(TICK_MS, self._tick)
+
+    def stop(self):
+        self._running = False
+        return self.max_gap * 1000
+
+
+def run_sync(root, password_hash, presses):
+    meter = StallMeter(root)
+    meter.start()
+    done = []
+
+    def login():
+        for _ in range(presses):
+            SecurityManager.verify_password(PASSWORD, password_hash)
+        done.append(True)
+
+    root.after(50, login)
+    start = time.perf_counter()
+    while not done:
+        root.update()
+    root.update()
+    return meter.stop(), (time.perf_counter() - start) * 1000
+
+
+def run_async(root, password_hash, presses):
+    done = []
+    window = LoginWindow(root, on_login_success=lambda: done.append(True), current_hash=password_hash)
+    window.password_entry.insert(0, PASSWORD)
+    meter = StallMeter(root)
+    meter.start()
+
+    def login():
+        for _ in range(presses):
+            window.check_password()
+
+    root.after(50, login)
+    start = time.perf_counter()
+    while not done:
+        root.update()
+    root.update()
+    return meter.stop(), (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=12, help="bcrypt cost factor.")
+    parser.add_argument('--presses', type=int, default=5, help="Return presses in one burst.")
+    args = parser.parse_args()
+
+    SecurityManager.BCRYPT_ROUNDS = args.rounds
+    password_hash = SecurityManager.hash_password(PASSWORD)
+
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'mode':>6} {'max stall ms':>13} {'login ms':>10}")
+    for name, runner in (("sync", run_sync), ("async", run_async)):
+        stall_ms, total_ms = runner(root, password_hash, args.presses)
+        print(f"{name:>6} {stall_ms:>13.1f} {total_ms:>10.1f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Blocking and abort latency: synchronous lockdown vs the asyncio orchestrator.
+
+Runs on any OS against SimulatedBackend. For each device count it measures:
+
+- ``block``: how long the thread that detected the absence is held up. The
+  synchronous path runs the whole lockdown on it; the orchestrator returns
+  once the lockdown is scheduled.
+- ``abort``: the user comes back ``--abort-after`` seconds into a lockdown
+  and the session is unlocked. Time from that moment until every device the
+  lockdown touched is enabled again. The synchronous path has to let the
+  lockdown finish before it can restore; the orchestrator cancels it.
+- ``left``: devices still disabled afterwards (must be 0).
+
+    python benchmarks/bench_orchestrator.py --devices 20 100 400 --latency 0.01
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.lockdown import apply_lockdown
+from core.lockdown_journal import LockdownJournal
+from core.orchestrator import LockdownOrchestrator
+from core.system_backends import SimulatedBackend
+from core.system_controller import SystemController
+
+
+def _controller(journal_dir, name, device_count, latency):
+    backend = SimulatedBackend(device_count=device_count, call_latency=latency, seed=1)
+    journal = LockdownJournal(path=os.path.join(journal_dir, f"{name}_{device_count}.jsonl"))
+    return SystemController(journal=journal, backend=backend), backend
+
+
+def run_sync(journal_dir, device_count, latency, level, abort_after):
+    controller, backend = _controller(journal_dir, "sync", device_count, latency)
+    start = time.perf_counter()
+    apply_lockdown(controller, level, whitelisted_ids=set())
+    block = time.perf_counter() - start
+    controller.reset_all_usb_ports()
+
+    # Abort: the lockdown runs on the monitor thread; the unlock handler can
+    # only restore once it is done.
+    worker = threading.Thread(target=apply_lockdown, args=(controller, level, set()))
+    worker.start()
+    time.sleep(abort_after)
+    start = time.perf_counter()
+    worker.join()
+    controller.reset_all_usb_ports()
+    abort = time.perf_counter() - start
+    return block, abort, len(backend.disabled_devices())
+
+
+def run_orchestrated(journal_dir, device_count, latency, level, abort_after):
+    controller, backend = _controller(journal_dir, "async", device_count, latency)
+    orchestrator = LockdownOrchestrator(controller)
+    orchestrator.start()
+    try:
+        start = time.perf_counter()
+        future = orchestrator.start_lockdown(level, set())
+        block = time.perf_counter() - start
+        future.result()
+        orchestrator.restore().result()
+
+        orchestrator.start_lockdown(level, set())
+        time.sleep(abort_after)
+        start = time.perf_counter()
+        orchestrator.restore().result()
+        abort = time.perf_counter() - start
+    finally:
+        orchestrator.stop()
+    return block, abort, len(backend.disabled_devices())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, nargs='+', default=[20, 100, 400])
+    parser.add_argument('--latency', type=float, default=0.01, help="Seconds per devcon call per device.")
+    parser.add_argument('--abort-after', type=float, default=0.1, help="Seconds into the lockdown the user returns.")
+    parser.add_argument('--level', choices=['standard', 'total'], default='standard')
+    args = parser.parse_args()
+
+    header = f"{'devices':>8} {'variant':>13} {'block ms':>10} {'abort ms':>10} {'left':>6}"
+    print(header)
+    print("-" * len(header))
+    with tempfile.TemporaryDirectory() as journal_dir:
+        for device_count in args.devices:
+            for name, run in (("synchronous", run_sync), ("orchestrated", run_orchestrated)):
+                block, abort, left = run(journal_dir, device_count, args.latency, args.level, args.abort_after)
+                print(f"{device_count:>8} {name:>13} {block * 1000:>10.1f} {abort * 1000:>10.1f} {left:>6}")
+
+
+if __name__ == "__main__":
+    main()
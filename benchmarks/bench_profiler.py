@@ -0,0 +1,67 @@
+"""Cost of on-demand profiling on a live PresenceMonitor.
+
+The monitor runs the skin detector on synthetic 720p frames from a fake
+camera. Phases of ``--seconds`` each:
+
+- ``off``: no capture requested; the only cost is one attribute check per
+  monitor loop, so this is the baseline.
+- ``capturing``: a ProfileCapture (cProfile + tracemalloc) is active.
+- ``after``: the capture has finished; must match ``off`` again.
+
+For each phase it reports detections per second and monitor-thread CPU per
+detection, plus how long the capture took to reach disk and its size.
+
+    python benchmarks/bench_profiler.py --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.camera_watchdog import FaultInjectingCameras
+from core.presence_monitor import CustomSkinDetector, PresenceMonitor
+from core.profiler import ProfileCapture
+
+
+def measure(monitor, seconds):
+    detections, cpu = monitor.detections, monitor.cpu_seconds_total
+    time.sleep(seconds)
+    count = monitor.detections - detections
+    return count / seconds, 1e3 * (monitor.cpu_seconds_total - cpu) / max(count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0, help="Length of each phase.")
+    args = parser.parse_args()
+
+    cameras = FaultInjectingCameras(frame_shape=(720, 1280, 3))
+    monitor = PresenceMonitor(CustomSkinDetector(), lambda present: None, camera_factory=cameras.open)
+    monitor.grace_period_seconds = 0
+    monitor.start()
+    time.sleep(1.0)  # camera open and first frames
+
+    rows = [('off',) + measure(monitor, args.seconds)]
+    with tempfile.TemporaryDirectory() as directory:
+        capture = ProfileCapture(args.seconds, directory=directory)
+        requested = time.monotonic()
+        monitor.request_profile(capture)
+        rows.append(('capturing',) + measure(monitor, args.seconds))
+        capture.written.wait(timeout=30)
+        written_after = time.monotonic() - requested - args.seconds
+        size = os.path.getsize(capture.path) if capture.error is None else 0
+        rows.append(('after',) + measure(monitor, args.seconds))
+    monitor.stop()
+    monitor.join()
+
+    print(f"{'phase':<12}{'det/s':>8}{'cpu ms/det':>12}")
+    for phase, rate, cpu in rows:
+        print(f"{phase:<12}{rate:>8.1f}{cpu:>12.2f}")
+    print(f"\nprofile on disk {written_after:.2f} s after the window closed, {size / 1e3:.0f} kB")
+
+
+if __name__ == "__main__":
+    main()
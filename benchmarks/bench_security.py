@@ -0,0 +1,75 @@
+"""Key derivation time and encrypted settings load/save throughput.
+
+Reports how long PBKDF2 takes at several iteration counts, how long the
+constructor blocks now that derivation runs in the background, the cost of a
+second construction (served from the session cache) and settings round-trips
+per second once the key is ready.
+
+    python benchmarks/bench_security.py --iterations 120000 480000 --rounds 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.security_manager import SecurityManager
+
+SAMPLE_SETTINGS = {'lockdown_level': 'standard', 'detection_engine': 'haar', 'whitelist': ['USB\\VID_0000'] * 20}
+
+
+def run(work_dir, iterations, rounds):
+    SecurityManager.KDF_ITERATIONS = iterations
+    kdf_file = os.path.join(work_dir, f"kdf_{iterations}.json")
+    settings_file = os.path.join(work_dir, f"settings_{iterations}.enc")
+
+    start = time.perf_counter()
+    manager = SecurityManager("benchmark-password", kdf_file=kdf_file)
+    construct_s = time.perf_counter() - start
+    manager.wait_ready()
+    derive_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    SecurityManager("benchmark-password", kdf_file=kdf_file).wait_ready()
+    cached_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        manager.save_settings(SAMPLE_SETTINGS, settings_file)
+    save_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        manager.load_settings(settings_file)
+    load_s = time.perf_counter() - start
+
+    SecurityManager.clear_key_cache()
+    return {
+        'iterations': iterations,
+        'construct_ms': construct_s * 1000,
+        'derive_ms': derive_s * 1000,
+        'cached_ms': cached_s * 1000,
+        'saves_per_s': rounds / save_s,
+        'loads_per_s': rounds / load_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, nargs='+', default=[120000, 240000, 480000])
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'iterations':>10} {'ctor blocks ms':>15} {'derive ms':>10} {'cached ms':>10} "
+          f"{'saves/s':>9} {'loads/s':>9}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for iterations in args.iterations:
+            r = run(work_dir, iterations, args.rounds)
+            print(f"{r['iterations']:>10} {r['construct_ms']:>15.2f} {r['derive_ms']:>10.1f} "
+                  f"{r['cached_ms']:>10.3f} {r['saves_per_s']:>9.0f} {r['loads_per_s']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
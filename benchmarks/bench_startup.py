@@ -0,0 +1,90 @@
+"""Cold-start cost: import time of main.py and time until the login window is up.
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+The time-to-login-window run uses a simulated system backend (no admin rights
+or devcon needed) but a real Tk root, so it needs a display; use xvfb-run on
+headless machines. Pass --max-import-ms / --max-window-ms to fail on regressions.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("cv2", "numpy", "bcrypt", "cryptography", "pystray", "PIL", "plyer")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({'import_ms': elapsed * 1000,
+                  'heavy_loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+WINDOW_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+from core.lockdown_journal import LockdownJournal
+from core.system_backends import SimulatedBackend
+from core.system_controller import SystemController
+
+controller = SystemController(logger=main.logger, backend=SimulatedBackend(call_latency=0.2),
+                              journal=LockdownJournal(path=%r))
+app = main.FaceLockApp(system_controller=controller)
+
+def probe():
+    print(json.dumps({'window_ms': (time.perf_counter() - start) * 1000}), flush=True)
+    app.root.quit()
+
+app.root.after_idle(probe)
+app.run()
+"""
+
+
+def _probe(code):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"Probe failed:\n{result.stderr.strip()}")
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float)
+    parser.add_argument('--max-window-ms', type=float)
+    parser.add_argument('--skip-window', action='store_true', help="Only measure imports (no display needed).")
+    args = parser.parse_args()
+
+    imports = [_probe(IMPORT_PROBE) for _ in range(args.runs)]
+    import_ms = _median([r['import_ms'] for r in imports])
+    print(f"import main:           {import_ms:8.1f} ms (median of {args.runs})")
+    print(f"heavy modules loaded:  {', '.join(imports[0]['heavy_loaded']) or 'none'}")
+
+    failed = args.max_import_ms is not None and import_ms > args.max_import_ms
+    if not args.skip_window:
+        with tempfile.TemporaryDirectory() as work_dir:
+            journal = os.path.join(work_dir, "journal.jsonl")
+            window_ms = _median([_probe(WINDOW_PROBE % journal)['window_ms'] for _ in range(args.runs)])
+        print(f"time to login window:  {window_ms:8.1f} ms (median of {args.runs})")
+        failed = failed or (args.max_window_ms is not None and window_ms > args.max_window_ms)
+
+    if failed:
+        print("Startup regression: budget exceeded.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+HEALTHY = 'healthy'
+RECOVERING = 'recovering'
+UNAVAILABLE = 'unavailable'
+
+
+class CameraWatchdog:
+    """Owns the capture handle for PresenceMonitor and keeps it alive.
+
+    ``read()`` never blocks on a dead camera. After ``max_failures``
+    consecutive failed (or stalled) reads the handle is dropped, and reopen
+    attempts follow with exponential backoff. Each attempt tries the sources in
+    order, so the primary camera is preferred and an alternate is only picked
+    up when the primary cannot be opened. A source that was dropped for
+    failing reads moves behind the others until it delivers a frame again, so
+    a camera that opens but never works fails over too. A read that hangs inside the driver cannot be
+    interrupted from Python; it is detected, and counted as a stall, once it
+    returns.
+    """
+
+    def __init__(self, sources, open_source=cv2.VideoCapture, max_failures=3, stall_timeout=5.0,
+                 base_backoff=0.5, max_backoff=30.0, logger=None):
+        self.sources = list(sources)
+        self.open_source = open_source
+        self.max_failures = max_failures
+        self.stall_timeout = stall_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.logger = logger
+
+        self.health = UNAVAILABLE
+        self.active_source = None
+        self.reconnects = 0
+        self.failovers = 0
+        self.read_failures = 0
+        self.stalls = 0
+        self.active_seconds_total = 0.0
+
+        self._cap = None
+        self._opened_at = None
+        self._consecutive_failures = 0
+        self._open_attempts = 0
+        self._next_attempt = 0.0
+        self._down_since = time.monotonic()
+        self._reconnecting = False
+        # Sources dropped for failing reads, tried last (in the order they failed).
+        self._demoted = []
+
+    def unavailable_seconds(self):
+        """How long the monitor has gone without a good frame (0 while healthy)."""
+        down_since = self._down_since
+        return 0.0 if down_since is None else time.monotonic() - down_since
+
+    def active_seconds(self):
+        opened_at = self._opened_at
+        current = time.monotonic() - opened_at if opened_at is not None else 0.0
+        return self.active_seconds_total + current
+
+    def read(self):
+        """Returns the next frame, or None if the camera is unavailable right now."""
+        if self._cap is None and not self._try_open():
+            return None
+
+        started = time.monotonic()
+        ret, frame = self._cap.read()
+        if ret and frame is not None and time.monotonic() - started < self.stall_timeout:
+            self._consecutive_failures = 0
+            self._open_attempts = 0
+            self._down_since = None
+            self.health = HEALTHY
+            if self.active_source in self._demoted:
+                self._demoted.remove(self.active_source)
+            return frame
+
+        if ret:
+            self.stalls += 1
+        self.read_failures += 1
+        self._consecutive_failures += 1
+        if self._down_since is None:
+            self._down_since = started
+        self.health = RECOVERING
+        if self._consecutive_failures >= self.max_failures:
+            if self.logger: self.logger.warning(
+                f"Camera {self.active_source!r} failed {self._consecutive_failures} reads in a row. Reopening.")
+            if self.active_source not in self._demoted:
+                self._demoted.append(self.active_source)
+            self.close()
+            self._reconnecting = True
+            # The first reopen is immediate; a camera that keeps failing right
+            # after opening backs off like one that cannot be opened at all.
+            immediate = self._open_attempts == 0
+            self._open_attempts += 1
+            self._schedule_retry(immediate)
+        return None
+
+    def _try_open(self):
+        if time.monotonic() < self._next_attempt:
+            return False
+        for source in [s for s in self.sources if s not in self._demoted] + self._demoted:
+            try:
+                cap = self.open_source(source)
+            except Exception as e:
+                if self.logger: self.logger.error(f"Opening camera {source!r} raised: {e}")
+                continue
+            if cap.isOpened():
+                self._attach(cap, source)
+                return True
+            cap.release()
+
+        self._open_attempts += 1
+        self._reconnecting = True
+        self.health = UNAVAILABLE
+        if self.logger: self.logger.error(f"No camera could be opened (tried {self.sources}).")
+        self._schedule_retry()
+        return False
+
+    def _attach(self, cap, source):
+        if self._reconnecting:
+            self.reconnects += 1
+            if self.logger: self.logger.info(f"Camera {source!r} reopened after "
+                                             f"{self.unavailable_seconds():.1f} s.")
+        if source != self.sources[0]:
+            self.failovers += 1
+            if self.logger: self.logger.warning(f"Primary camera unavailable; using {source!r}.")
+        self._reconnecting = False
+        self._cap = cap
+        self._opened_at = time.monotonic()
+        self._consecutive_failures = 0
+        self.active_source = source
+        self.health = RECOVERING
+
+    def _schedule_retry(self, immediate=False):
+        if immediate:
+            self._next_attempt = 0.0
+            return
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (self._open_attempts - 1)))
+        self._next_attempt = time.monotonic() + delay
+
+    def close(self):
+        """Releases the camera on purpose (e.g. while input gating); the next read() reopens it."""
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+            self.active_seconds_total += time.monotonic() - self._opened_at
+            self._opened_at = None
+            self.active_source = None
+
+
+class FaultInjectingCameras:
+    """Fake cv2.VideoCapture factory whose sources can be broken on demand.
+
+    Pass ``cameras.open`` as CameraWatchdog's ``open_source``. Each source can be
+    put into one of the fault modes below at any time; handles that are already
+    open see the change on their next read, like a camera unplugged mid-stream.
+    """
+
+    OK = 'ok'
+    MISSING = 'missing'          # open fails
+    READ_ERRORS = 'read_errors'  # open works, every read fails
+    STALL = 'stall'              # reads succeed but take stall_seconds
+
+    def __init__(self, sources=(0,), frame_shape=(480, 640, 3), stall_seconds=6.0, fps=30):
+        self.frame = np.zeros(frame_shape, dtype=np.uint8)
+        self.stall_seconds = stall_seconds
+        self.frame_interval = 1.0 / fps if fps else 0.0
+        self._faults = {source: self.OK for source in sources}
+        self._lock = threading.Lock()
+        self.opens = 0
+
+    def set_fault(self, source, mode):
+        with self._lock:
+            self._faults[source] = mode
+
+    def fault(self, source):
+        with self._lock:
+            return self._faults.get(source, self.MISSING)
+
+    def open(self, source):
+        self.opens += 1
+        return _FakeCapture(self, source)
+
+
+class _FakeCapture:
+    def __init__(self, cameras, source):
+        self._cameras = cameras
+        self._source = source
+        self._open = cameras.fault(source) != FaultInjectingCameras.MISSING
+
+    def isOpened(self):
+        return self._open
+
+    def read(self):
+        mode = self._cameras.fault(self._source)
+        if not self._open or mode in (FaultInjectingCameras.MISSING, FaultInjectingCameras.READ_ERRORS):
+            return False, None
+        if mode == FaultInjectingCameras.STALL:
+            time.sleep(self._cameras.stall_seconds)
+        elif self._cameras.frame_interval:
+            time.sleep(self._cameras.frame_interval)
+        return True, self._cameras.frame
+
+    def release(self):
+        self._open = False
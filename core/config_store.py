@@ -0,0 +1,152 @@
+import copy
+import json
+import os
+import threading
+
+DOCUMENTS = {
+    'app_settings': ("config/app_settings.json", {'lockdown_level': 'standard', 'detection_engine': 'haar'}),
+    'password': ("config/password.json", {}),
+    'whitelist': ("config/whitelist.json", []),
+}
+
+
+class ConfigStore:
+    """Single owner of every JSON config file.
+
+    Each document is read from disk once and then served from memory. Changes
+    update the cache, notify subscribers straight away and are written back
+    after ``save_delay`` seconds of quiet, via a temp file and os.replace so a
+    crash never leaves a half-written file. Documents passed to
+    enable_encryption() are stored through a SecurityManager from then on.
+    """
+
+    def __init__(self, documents=None, save_delay=0.5, logger=None):
+        self.documents = dict(documents or DOCUMENTS)
+        self.save_delay = save_delay
+        self.logger = logger
+        self._cache = {}
+        self._subscribers = {}
+        self._timers = {}
+        self._lock = threading.RLock()
+        self._security_manager = None
+        self._encrypted = set()
+
+    def enable_encryption(self, security_manager, names):
+        with self._lock:
+            self._security_manager = security_manager
+            self._encrypted.update(names)
+            for name in names:
+                # Re-save so files written in plain JSON get encrypted.
+                self.get(name)
+                self._schedule_save(name)
+
+    def _path(self, name):
+        return self.documents[name][0]
+
+    def _read(self, name):
+        path, default = self.documents[name]
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return copy.deepcopy(default)
+
+        if self._security_manager and name in self._encrypted and not raw.lstrip().startswith((b'{', b'[')):
+            raw = self._security_manager.decrypt_data(raw)
+            if raw is None:
+                if self.logger: self.logger.error(f"Could not decrypt {path}. Using defaults.")
+                return copy.deepcopy(default)
+        try:
+            return json.loads(raw.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            if self.logger: self.logger.error(f"{path} is corrupt. Using defaults.")
+            return copy.deepcopy(default)
+
+    def get(self, name):
+        """Returns the cached document. Treat it as read-only; change it via set()/update()."""
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = self._read(name)
+            return self._cache[name]
+
+    def set(self, name, value, save_now=False):
+        saved = True
+        with self._lock:
+            self._cache[name] = value
+            if save_now:
+                saved = self._write(name)
+            else:
+                self._schedule_save(name)
+        self._notify(name, value)
+        return saved
+
+    def update(self, name, **changes):
+        with self._lock:
+            document = self.get(name)
+            document.update(changes)
+            self._schedule_save(name)
+        self._notify(name, document)
+
+    def reload(self, name):
+        """Re-reads a document from disk (e.g. after an external edit) and notifies subscribers.
+
+        Changes still waiting for their debounced save are discarded.
+        """
+        with self._lock:
+            timer = self._timers.pop(name, None)
+            if timer:
+                timer.cancel()
+            value = self._cache[name] = self._read(name)
+        self._notify(name, value)
+        return value
+
+    def subscribe(self, name, callback):
+        with self._lock:
+            self._subscribers.setdefault(name, []).append(callback)
+
+    def _notify(self, name, value):
+        for callback in list(self._subscribers.get(name, ())):
+            try:
+                callback(name, value)
+            except Exception as e:
+                if self.logger: self.logger.error(f"Config subscriber for '{name}' failed: {e}")
+
+    def _schedule_save(self, name):
+        timer = self._timers.pop(name, None)
+        if timer:
+            timer.cancel()
+        timer = threading.Timer(self.save_delay, self._write, args=(name,))
+        timer.daemon = True
+        self._timers[name] = timer
+        timer.start()
+
+    def _write(self, name):
+        with self._lock:
+            timer = self._timers.pop(name, None)
+            if timer:
+                timer.cancel()
+            if name not in self._cache:
+                return True
+            data = json.dumps(self._cache[name], indent=4).encode('utf-8')
+            if self._security_manager and name in self._encrypted:
+                data = self._security_manager.encrypt_data(data)
+            path = self._path(name)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+                return True
+            except OSError as e:
+                if self.logger: self.logger.error(f"Could not save {path}: {e}")
+                return False
+
+    def flush(self):
+        with self._lock:
+            for name in list(self._timers):
+                self._write(name)
@@ -0,0 +1,251 @@
+import ctypes
+import glob
+import os
+import sys
+import threading
+import time
+
+PRIORITIES = ('normal', 'below_normal', 'lowest', 'idle', 'background')
+
+# Built-in presets; "cpu_policy"/"battery_policy" in app_settings.json name one
+# of these or give a dict with a "preset" plus any fields to override.
+PRESETS = {
+    # Leave OpenCV and the OS scheduler alone (the behaviour before policies existed).
+    'default': {},
+    # Keep detection off most cores so the GUI and devcon stay responsive.
+    'balanced': {'opencv_threads': 2, 'monitor_priority': 'below_normal'},
+    # Laptops on battery: one OpenCV thread, background priority, fewer samples.
+    'low_impact': {'opencv_threads': 1, 'monitor_priority': 'background', 'restore_workers': 2,
+                   'detection_interval': 0.5},
+}
+
+
+class CpuPolicy:
+    """How much CPU monitoring may use. ``None`` fields are left as they are.
+
+    - ``opencv_threads``: cv2.setNumThreads (process-wide; 0 disables OpenCV's pool).
+    - ``use_optimized``: cv2.setUseOptimized (SIMD code paths).
+    - ``monitor_cores``: CPU indexes the monitor thread is pinned to.
+    - ``monitor_priority``: one of PRIORITIES, for the monitor thread.
+    - ``restore_workers``: parallel devcon calls when restoring ports.
+    - ``detection_interval``: seconds the monitor waits between detections.
+    """
+
+    FIELDS = ('opencv_threads', 'use_optimized', 'monitor_cores', 'monitor_priority', 'restore_workers',
+              'detection_interval')
+
+    def __init__(self, name='default', opencv_threads=None, use_optimized=None, monitor_cores=None,
+                 monitor_priority=None, restore_workers=None, detection_interval=None):
+        if monitor_priority is not None and monitor_priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {monitor_priority!r}; expected one of {', '.join(PRIORITIES)}.")
+        self.name = name
+        self.opencv_threads = opencv_threads
+        self.use_optimized = use_optimized
+        self.monitor_cores = list(monitor_cores) if monitor_cores is not None else None
+        self.monitor_priority = monitor_priority
+        self.restore_workers = restore_workers
+        self.detection_interval = detection_interval
+
+    @classmethod
+    def from_setting(cls, value):
+        """Builds a policy from a preset name or a {"preset": ..., <overrides>} dict."""
+        if value is None:
+            value = 'default'
+        if isinstance(value, str):
+            value = {'preset': value}
+        name = value.get('preset', 'default')
+        if name not in PRESETS:
+            raise ValueError(f"Unknown CPU policy preset {name!r}; expected one of {', '.join(PRESETS)}.")
+        fields = dict(PRESETS[name])
+        fields.update({key: value[key] for key in cls.FIELDS if key in value})
+        customised = bool(set(value) - {'preset'})
+        return cls(name=f"{name}+custom" if customised else name, **fields)
+
+    def describe(self):
+        parts = [f"{field}={getattr(self, field)}" for field in self.FIELDS if getattr(self, field) is not None]
+        return f"{self.name} ({', '.join(parts) or 'OS defaults'})"
+
+    def apply_to_opencv(self, defaults=None):
+        """Process-wide: affects every detector and any other cv2 user.
+
+        ``defaults`` is (threads, use_optimized) to put back for unset fields,
+        so switching away from a stricter policy undoes it.
+        """
+        import cv2
+        threads, optimized = defaults or (None, None)
+        if self.use_optimized is not None or optimized is not None:
+            cv2.setUseOptimized(bool(optimized if self.use_optimized is None else self.use_optimized))
+        if self.opencv_threads is not None or threads is not None:
+            cv2.setNumThreads(int(threads if self.opencv_threads is None else self.opencv_threads))
+
+    def apply_to_current_thread(self, logger=None):
+        """Pins and reprioritises the calling thread. Returns False if the OS refused."""
+        ok = True
+        if self.monitor_cores:
+            ok &= _set_thread_affinity(self.monitor_cores, logger)
+        if self.monitor_priority:
+            ok &= _set_thread_priority(self.monitor_priority, logger)
+        return ok
+
+
+# --- Per-thread affinity and priority ---
+_WINDOWS_PRIORITIES = {'normal': 0, 'below_normal': -1, 'lowest': -2, 'idle': -15}
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+_THREAD_MODE_BACKGROUND_END = 0x00020000
+# Linux has per-thread nice values; lowering priority never needs privileges.
+_NICE = {'normal': 0, 'below_normal': 5, 'lowest': 10, 'idle': 19, 'background': 19}
+
+
+def _kernel32():
+    # use_last_error makes ctypes.get_last_error() report the failing call's error.
+    return ctypes.WinDLL('kernel32', use_last_error=True)
+
+
+def _set_thread_affinity(cores, logger=None):
+    try:
+        if sys.platform == 'win32':
+            kernel32 = _kernel32()
+            kernel32.GetCurrentThread.restype = ctypes.c_void_p
+            kernel32.SetThreadAffinityMask.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+            mask = sum(1 << core for core in cores)
+            if not kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask):
+                raise ctypes.WinError(ctypes.get_last_error())
+        elif hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cores)  # 0 is the calling thread on Linux
+        else:
+            return False
+        return True
+    except (OSError, ValueError) as e:
+        if logger: logger.warning(f"Could not pin the monitor to cores {cores}: {e}")
+        return False
+
+
+def _set_thread_priority(priority, logger=None):
+    try:
+        if sys.platform == 'win32':
+            kernel32 = _kernel32()
+            kernel32.GetCurrentThread.restype = ctypes.c_void_p
+            kernel32.SetThreadPriority.argtypes = (ctypes.c_void_p, ctypes.c_int)
+            thread = kernel32.GetCurrentThread()
+            # Background mode also lowers I/O and memory priority; it has to be
+            # left explicitly before another priority takes effect.
+            kernel32.SetThreadPriority(thread, _THREAD_MODE_BACKGROUND_END)
+            value = _THREAD_MODE_BACKGROUND_BEGIN if priority == 'background' else _WINDOWS_PRIORITIES[priority]
+            if not kernel32.SetThreadPriority(thread, value):
+                raise ctypes.WinError(ctypes.get_last_error())
+        elif hasattr(os, 'setpriority'):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), _NICE[priority])
+        else:
+            return False
+        return True
+    except OSError as e:
+        if logger: logger.warning(f"Could not set monitor priority to {priority}: {e}")
+        return False
+
+
+# --- Power source ---
+class _SystemPowerStatus(ctypes.Structure):
+    _fields_ = [('ACLineStatus', ctypes.c_ubyte), ('BatteryFlag', ctypes.c_ubyte),
+                ('BatteryLifePercent', ctypes.c_ubyte), ('SystemStatusFlag', ctypes.c_ubyte),
+                ('BatteryLifeTime', ctypes.c_ulong), ('BatteryFullLifeTime', ctypes.c_ulong)]
+
+
+def on_battery():
+    """True on battery, False on mains power, None if it cannot be told (e.g. a desktop)."""
+    if sys.platform == 'win32':
+        status = _SystemPowerStatus()
+        if not ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+            return None
+        return {0: True, 1: False}.get(status.ACLineStatus)
+    supplies = glob.glob('/sys/class/power_supply/*/online')
+    if not supplies:
+        return None
+    try:
+        online = []
+        for path in supplies:
+            with open(path) as f:
+                online.append(f.read().strip() == '1')
+        return not any(online)
+    except OSError:
+        return None
+
+
+class CpuPolicyManager:
+    """Chooses between the configured policy and the battery policy, and applies it.
+
+    ``apply_global()`` sets the process-wide parts (OpenCV, pool sizes) when
+    monitoring starts. The monitor thread then calls
+    ``apply_to_current_thread()`` once and ``poll()`` on every iteration; the
+    power source is checked at most every ``check_interval`` seconds, and a
+    switch re-applies everything, putting fields the new policy leaves unset
+    back to their defaults.
+    """
+
+    def __init__(self, policy, battery_policy=None, system_controller=None, power_probe=on_battery,
+                 check_interval=30.0, logger=None):
+        self.policy = policy
+        self.battery_policy = battery_policy
+        self.system_controller = system_controller
+        self.power_probe = power_probe
+        self.check_interval = check_interval
+        self.logger = logger
+        self.switches = 0
+        self._next_check = 0.0
+        self._opencv_defaults = None
+        self._thread_configured = False
+        self.active = self._choose()
+
+    @classmethod
+    def from_settings(cls, settings, system_controller=None, logger=None):
+        """Returns None when neither "cpu_policy" nor "battery_policy" is set, so nothing is touched."""
+        policy, battery = settings.get('cpu_policy'), settings.get('battery_policy')
+        if policy is None and battery is None:
+            return None
+        return cls(CpuPolicy.from_setting(policy),
+                   battery_policy=CpuPolicy.from_setting(battery) if battery else None,
+                   system_controller=system_controller, logger=logger)
+
+    def _choose(self):
+        if self.battery_policy and self.power_probe and self.power_probe():
+            return self.battery_policy
+        return self.policy
+
+    def apply_global(self):
+        if self._opencv_defaults is None:
+            import cv2
+            self._opencv_defaults = (cv2.getNumThreads(), cv2.useOptimized())
+        self.active.apply_to_opencv(self._opencv_defaults)
+        if self.system_controller:
+            workers = self.active.restore_workers or type(self.system_controller).RESTORE_WORKERS
+            self.system_controller.restore_workers = int(workers)
+        if self.logger: self.logger.info(f"CPU policy: {self.active.describe()}")
+
+    def apply_to_current_thread(self):
+        policy = self.active
+        if self._thread_configured:
+            policy = CpuPolicy(monitor_priority=policy.monitor_priority or 'normal',
+                               monitor_cores=policy.monitor_cores or list(range(os.cpu_count() or 1)))
+        policy.apply_to_current_thread(self.logger)
+        self._thread_configured = bool(policy.monitor_priority or policy.monitor_cores)
+
+    def detection_interval(self, default):
+        interval = self.active.detection_interval
+        return default if interval is None else float(interval)
+
+    def poll(self):
+        """Switches policy if the power source changed. Call on the monitor thread; returns True on a switch."""
+        if not self.battery_policy:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        chosen = self._choose()
+        if chosen is self.active:
+            return False
+        self.active = chosen
+        self.switches += 1
+        if self.logger: self.logger.info("Power source changed; switching CPU policy.")
+        self.apply_global()
+        self.apply_to_current_thread()
+        return True
@@ -0,0 +1,127 @@
+import gzip
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.event_shipper import AGENT_HEADER, BATCH_HEADER
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hundreds of agents may (re)connect at once after an outage.
+    request_queue_size = 1024
+
+
+class EventCollector:
+    """Stand-in for the fleet collector, for local testing and load tests.
+
+    Accepts the batches EventShipper POSTs (gzip-compressed JSON lines) on
+    keep-alive connections, drops duplicate batch ids and counts events per
+    agent. ``outage()`` and ``failure_rate`` make it answer 503 so retry and
+    spooling can be exercised; ``latency`` delays every reply.
+    """
+
+    def __init__(self, port=0, host="127.0.0.1", token=None, failure_rate=0.0, latency=0.0,
+                 keep_events=False, logger=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.keep_events = keep_events
+        self.logger = logger
+        self.events = []
+        self.events_by_agent = Counter()
+        self.batches = 0
+        self.duplicate_batches = 0
+        self.rejected_requests = 0
+        self.bytes_received = 0
+        self.connections = 0
+        self._batch_ids = set()
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def outage(self, seconds):
+        """Answers 503 to everything for the next ``seconds``."""
+        self._down_until = time.monotonic() + seconds
+
+    def total_events(self):
+        return sum(self.events_by_agent.values())
+
+    def _make_handler(self):
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with collector._lock:
+                    collector.connections += 1
+
+            def _reply(self, status, extra_headers=()):
+                self.send_response(status)
+                for name, value in extra_headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if collector.latency:
+                    time.sleep(collector.latency)
+                if collector.token and self.headers.get("Authorization") != f"Bearer {collector.token}":
+                    collector.rejected_requests += 1
+                    self._reply(401)
+                    return
+                if time.monotonic() < collector._down_until or random.random() < collector.failure_rate:
+                    self._reply(503, [("Retry-After", "1")])
+                    return
+                try:
+                    lines = gzip.decompress(body).splitlines()
+                    events = [json.loads(line) for line in lines if line]
+                except (OSError, ValueError):
+                    collector.rejected_requests += 1
+                    self._reply(400)
+                    return
+                agent = self.headers.get(AGENT_HEADER, "unknown")
+                batch_id = self.headers.get(BATCH_HEADER)
+                with collector._lock:
+                    collector.bytes_received += len(body)
+                    if batch_id in collector._batch_ids:
+                        collector.duplicate_batches += 1
+                    else:
+                        collector._batch_ids.add(batch_id)
+                        collector.batches += 1
+                        collector.events_by_agent[agent] += len(events)
+                        if collector.keep_events:
+                            collector.events.extend(events)
+                self._reply(204)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = _Server((self.host, self.port), self._make_handler())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="event-collector", daemon=True)
+        self._thread.start()
+        if self.logger: self.logger.info(f"Event collector listening on http://{self.host}:{self.port}/events")
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/events"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,303 @@
+import gzip
+import http.client
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from urllib.parse import urlsplit
+
+CONTENT_TYPE = "application/x-ndjson"
+AGENT_HEADER = "X-FaceLock-Agent"
+BATCH_HEADER = "X-FaceLock-Batch"
+SPOOL_DIR = "../logs/spool"
+SPOOL_SUFFIX = ".ndjson.gz"
+
+# 4xx statuses worth retrying (auth can be fixed, throttling passes); any other
+# 4xx means the batch itself is bad and it is dropped.
+RETRY_STATUSES = {401, 403, 408, 425, 429}
+
+
+class _KeepAliveConnection:
+    """One persistent HTTP/1.1 connection to the collector, reopened when it goes stale.
+
+    Collectors close idle keep-alive connections at will, so the first failure
+    on a reused connection is retried once on a fresh one before it counts.
+    """
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported collector URL: {url!r}")
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._connection = None
+
+    def _open(self):
+        factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self._connection = factory(self.host, self.port, timeout=self.timeout)
+        self.connections_opened += 1
+        return self._connection
+
+    def post(self, body, headers):
+        """Returns (status, headers). Raises OSError/HTTPException if the collector is unreachable."""
+        reused = self._connection is not None
+        try:
+            return self._post(self._connection or self._open(), body, headers)
+        except (http.client.HTTPException, OSError):
+            self.close()
+            if not reused:
+                raise
+        return self._post(self._open(), body, headers)
+
+    def _post(self, connection, body, headers):
+        connection.request("POST", self.path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()  # the connection can only be reused once the body is consumed
+        if response.will_close:
+            self.close()
+        return response.status, response.headers
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+
+class EventShipper:
+    """Ships service events to a central HTTP collector in compressed batches.
+
+    ``submit()`` only appends to a bounded in-memory buffer, so it is safe to
+    use as a MonitorService subscriber. A background thread cuts the buffer
+    into batches of up to ``batch_size`` events (or whatever arrived within
+    ``flush_interval`` seconds), gzips them as JSON lines and POSTs them over
+    one keep-alive connection. Each batch carries a unique id so a collector
+    can drop the duplicates that retries may produce.
+
+    A batch that cannot be delivered goes to the spool directory as the exact
+    compressed payload and is retried, oldest first, with exponential backoff
+    (honouring ``Retry-After``). While the spool is not empty new batches are
+    spooled behind it, which keeps delivery in order and memory flat during a
+    collector outage. Disk use is capped at ``max_spool_bytes`` by dropping
+    the oldest spooled batches; memory at ``max_buffered`` events. Spooled
+    batches survive restarts.
+    """
+
+    def __init__(self, url, spool_dir=SPOOL_DIR, agent_id=None, token=None, batch_size=200, flush_interval=5.0,
+                 max_buffered=5000, max_spool_bytes=20 * 1024 * 1024, timeout=10.0, base_backoff=1.0,
+                 max_backoff=300.0, logger=None):
+        self.url = url
+        self.spool_dir = spool_dir
+        self.agent_id = agent_id or socket.gethostname()
+        self.token = token
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.max_spool_bytes = max_spool_bytes
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.logger = logger
+        self._connection = _KeepAliveConnection(url, timeout)
+
+        self.events_submitted = 0
+        self.events_sent = 0
+        self.events_dropped = 0
+        self.batches_sent = 0
+        self.batches_spooled = 0
+        self.batches_rejected = 0
+        self.send_failures = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+        os.makedirs(spool_dir, exist_ok=True)
+        self._spool = sorted(name for name in os.listdir(spool_dir) if name.endswith(SPOOL_SUFFIX))
+        self.spool_bytes = sum(os.path.getsize(os.path.join(spool_dir, name)) for name in self._spool)
+
+    @property
+    def connections_opened(self):
+        return self._connection.connections_opened
+
+    def spooled_batches(self):
+        return len(self._spool)
+
+    def buffered_events(self):
+        return len(self._buffer)
+
+    def submit(self, event):
+        with self._lock:
+            if len(self._buffer) >= self.max_buffered:
+                self._buffer.popleft()
+                self.events_dropped += 1
+            self._buffer.append(event)
+            self.events_submitted += 1
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="event-shipper", daemon=True)
+        self._thread.start()
+        if self.logger: self.logger.info(f"Shipping events to {self.url} ({len(self._spool)} spooled batch(es)).")
+
+    def stop(self, timeout=10.0):
+        """Sends (or spools) what is still buffered and stops the thread."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        self._connection.close()
+
+    def _take_batch(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping.is_set()
+            batch = self._take_batch()
+            while batch:
+                self._ship(batch, final=stopping)
+                batch = self._take_batch()
+            if not stopping:
+                self._drain_spool()
+            else:
+                break
+
+    def _ship(self, batch, final=False):
+        lines = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in batch).encode("utf-8")
+        body = gzip.compress(lines, compresslevel=6)
+        self.bytes_raw += len(lines)
+        # Behind a backlog (or while backing off) a new batch joins the queue so order is kept.
+        if self._spool or time.monotonic() < self._retry_at or final and self._failures:
+            self._spool_batch(body, len(batch))
+            return
+        batch_id = uuid.uuid4().hex
+        if not self._send(body, len(batch), batch_id):
+            self._spool_batch(body, len(batch), batch_id)
+
+    def _send(self, body, count, batch_id):
+        headers = {"Content-Type": CONTENT_TYPE, "Content-Encoding": "gzip", AGENT_HEADER: self.agent_id,
+                   BATCH_HEADER: batch_id}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        try:
+            status, response_headers = self._connection.post(body, headers)
+        except (http.client.HTTPException, OSError) as e:
+            self._failed(f"Collector unreachable: {e}")
+            return False
+        if 200 <= status < 300:
+            if self._failures and self.logger: self.logger.info("Collector reachable again; sending spooled events.")
+            self._failures = 0
+            self._retry_at = 0.0
+            self.batches_sent += 1
+            self.events_sent += count
+            self.bytes_sent += len(body)
+            return True
+        if 400 <= status < 500 and status not in RETRY_STATUSES:
+            # Retrying cannot fix a request the collector refuses.
+            self.batches_rejected += 1
+            self.events_dropped += count
+            if self.logger: self.logger.error(f"Collector rejected a batch of {count} event(s) with HTTP {status}.")
+            return True
+        self._failed(f"Collector answered HTTP {status}.", response_headers.get("Retry-After"))
+        return False
+
+    def _failed(self, reason, retry_after=None):
+        self.send_failures += 1
+        self._failures += 1
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (self._failures - 1))
+        delay *= random.uniform(0.5, 1.0)  # spread out a fleet that lost the collector at the same moment
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+        self._retry_at = time.monotonic() + delay
+        if self.logger and self._failures == 1:
+            self.logger.warning(f"{reason} Spooling events; retrying in {delay:.1f} s.")
+
+    # --- Spool: one gzip payload per file, named so that sorting gives delivery order ---
+    def _spool_batch(self, body, count, batch_id=None):
+        name = f"{time.time_ns():020d}_{batch_id or uuid.uuid4().hex}_{count}{SPOOL_SUFFIX}"
+        path = os.path.join(self.spool_dir, name)
+        try:
+            with open(path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            self.events_dropped += count
+            if self.logger: self.logger.error(f"Could not spool {count} event(s): {e}")
+            return
+        self._spool.append(name)
+        self.spool_bytes += len(body)
+        self.batches_spooled += 1
+        while self.spool_bytes > self.max_spool_bytes and len(self._spool) > 1:
+            self._discard(self._spool[0], dropped=True)
+
+    @staticmethod
+    def _parse_name(name):
+        _, batch_id, count = name[:-len(SPOOL_SUFFIX)].split("_")
+        return batch_id, int(count)
+
+    def _discard(self, name, dropped=False):
+        path = os.path.join(self.spool_dir, name)
+        try:
+            self.spool_bytes -= os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            pass
+        self._spool.remove(name)
+        if dropped:
+            self.events_dropped += self._parse_name(name)[1]
+            if self.logger: self.logger.warning(f"Spool is over {self.max_spool_bytes} bytes; dropped {name}.")
+
+    def _drain_spool(self):
+        while self._spool and time.monotonic() >= self._retry_at and not self._stopping.is_set():
+            name = self._spool[0]
+            try:
+                with open(os.path.join(self.spool_dir, name), "rb") as f:
+                    body = f.read()
+                batch_id, count = self._parse_name(name)
+            except (OSError, ValueError):
+                self._discard(name)
+                continue
+            if not self._send(body, count, batch_id):
+                return
+            self._discard(name)
+
+    def stats(self):
+        return {
+            'events_submitted': self.events_submitted,
+            'events_sent': self.events_sent,
+            'events_dropped': self.events_dropped,
+            'batches_sent': self.batches_sent,
+            'batches_spooled': self.batches_spooled,
+            'spooled_batches': len(self._spool),
+            'spool_bytes': self.spool_bytes,
+            'send_failures': self.send_failures,
+            'connections_opened': self.connections_opened,
+            'bytes_raw': self.bytes_raw,
+            'bytes_sent': self.bytes_sent,
+        }
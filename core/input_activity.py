@@ -0,0 +1,60 @@
+import ctypes
+import sys
+import threading
+import time
+
+
+class InputIdleProvider:
+    """Reports how long ago the user last touched the keyboard or mouse."""
+
+    def idle_seconds(self):
+        """Seconds since the last input event, or None if it cannot be determined."""
+        raise NotImplementedError
+
+
+class WindowsInputIdleProvider(InputIdleProvider):
+    """Uses GetLastInputInfo, which covers all keyboard and mouse input in the session."""
+
+    class _LastInputInfo(ctypes.Structure):
+        _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._info = self._LastInputInfo()
+        self._info.cbSize = ctypes.sizeof(self._info)
+
+    def idle_seconds(self):
+        if not self._user32.GetLastInputInfo(ctypes.byref(self._info)):
+            return None
+        # Both values are 32-bit tick counts; masking handles the 49.7-day wraparound.
+        elapsed_ms = (self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF
+        return elapsed_ms / 1000.0
+
+
+class FakeInputIdleProvider(InputIdleProvider):
+    """Scriptable provider for simulations: call touch() whenever "the user" types."""
+
+    def __init__(self, idle=None):
+        self._lock = threading.Lock()
+        self._last_input = None if idle is None else time.monotonic() - idle
+
+    def touch(self):
+        with self._lock:
+            self._last_input = time.monotonic()
+
+    def set_idle(self, seconds):
+        with self._lock:
+            self._last_input = None if seconds is None else time.monotonic() - seconds
+
+    def idle_seconds(self):
+        with self._lock:
+            if self._last_input is None:
+                return None
+            return time.monotonic() - self._last_input
+
+
+def default_input_provider():
+    if sys.platform == 'win32':
+        return WindowsInputIdleProvider()
+    return None
@@ -0,0 +1,254 @@
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+
+IPC_HOST = "127.0.0.1"
+IPC_PORT = 47811
+TOKEN_FILE = "config/ipc_token"
+# Well-known SIDs: LocalSystem and the built-in Administrators group.
+TOKEN_READERS = ("*S-1-5-18", "*S-1-5-32-544")
+
+
+class IPCError(Exception):
+    pass
+
+
+def restrict_token_file(path, logger=None):
+    """Limits who can read the token file. Returns False if that could not be done.
+
+    POSIX: owner only (0600). Windows ignores those bits, so the file's ACL
+    is replaced with full control for SYSTEM and Administrators only; the
+    app and ``service.py`` commands therefore need to run elevated.
+    """
+    if sys.platform != 'win32':
+        os.chmod(path, 0o600)
+        return True
+    grants = [arg for sid in TOKEN_READERS for arg in ("/grant:r", f"{sid}:F")]
+    try:
+        subprocess.run(["icacls", path, "/inheritance:r", *grants], capture_output=True, check=True,
+                       creationflags=subprocess.CREATE_NO_WINDOW)
+        return True
+    except (subprocess.CalledProcessError, OSError) as e:
+        if logger: logger.error(f"Could not restrict access to {path}; other local users may read it: {e}")
+        return False
+
+
+def load_or_create_token(path=TOKEN_FILE, logger=None):
+    """Shared secret that clients must present; readable only by SYSTEM/Administrators (owner on POSIX)."""
+    try:
+        with open(path, 'r') as f:
+            token = f.read().strip()
+        if token:
+            # Tokens created before the file was locked down get the same ACL.
+            restrict_token_file(path, logger)
+            return token
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    token = secrets.token_hex(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    restrict_token_file(path, logger)
+    return token
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    # On Windows SO_REUSEADDR would let another process bind the same port.
+    allow_reuse_address = sys.platform != 'win32'
+
+
+class IPCServer:
+    """Local control channel for a MonitorService.
+
+    Clients connect to the loopback interface and send one JSON line per
+    request: ``{"token": ..., "command": ..., "args": {...}}`` (``args`` is
+    optional). Every command except
+    ``events`` gets a single JSON reply line. ``events`` turns the connection
+    into a stream of service events, one JSON line each, until the client
+    disconnects. Requests without the right token are rejected, so other
+    local users cannot stop monitoring.
+    """
+
+    def __init__(self, service, token, port=IPC_PORT, host=IPC_HOST, logger=None, event_queue_size=256):
+        self.service = service
+        self.token = token
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self.event_queue_size = event_queue_size
+        self._server = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def _dispatch(self, command, args):
+        if command == 'status':
+            return self.service.status()
+        if command == 'start':
+            return self.service.start_monitoring()
+        if command == 'stop':
+            return self.service.stop_monitoring()
+        if command == 'reload':
+            self.service.reload_settings()
+            return True
+        if command == 'profile':
+            return self.service.capture_profile(args.get('seconds'))
+        raise IPCError(f"Unknown command: {command!r}")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def _reply(self, payload):
+                self.wfile.write(json.dumps(payload).encode('utf-8') + b"\n")
+                self.wfile.flush()
+
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError:
+                        self._reply({'ok': False, 'error': "Malformed request."})
+                        return
+                    if not hmac.compare_digest(str(request.get('token', '')), server.token):
+                        if server.logger: server.logger.warning("IPC request with a bad token rejected.")
+                        self._reply({'ok': False, 'error': "Unauthorized."})
+                        return
+                    command = request.get('command')
+                    if command == 'events':
+                        self._stream_events()
+                        return
+                    try:
+                        self._reply({'ok': True, 'result': server._dispatch(command, request.get('args') or {})})
+                    except Exception as e:
+                        self._reply({'ok': False, 'error': str(e)})
+
+            def _stream_events(self):
+                # A slow client gets a bounded backlog; the service never waits on it.
+                events = queue.Queue(maxsize=server.event_queue_size)
+
+                def enqueue(event):
+                    try:
+                        events.put_nowait(event)
+                    except queue.Full:
+                        pass
+
+                server.service.subscribe(enqueue)
+                try:
+                    self._reply({'ok': True, 'result': 'subscribed'})
+                    while not server._stopping.is_set():
+                        try:
+                            event = events.get(timeout=1.0)
+                        except queue.Empty:
+                            continue
+                        self._reply({'event': event})
+                except OSError:
+                    pass
+                finally:
+                    server.service.unsubscribe(enqueue)
+
+        return Handler
+
+    def start(self):
+        try:
+            self._server = _TCPServer((self.host, self.port), self._make_handler())
+        except OSError as e:
+            if self.logger: self.logger.error(f"Could not start IPC channel on {self.host}:{self.port}: {e}")
+            return False
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ipc-server", daemon=True)
+        self._thread.start()
+        if self.logger: self.logger.info(f"IPC channel listening on {self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        self._stopping.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class IPCClient:
+    """Talks to a running service. Each call uses its own short-lived connection."""
+
+    def __init__(self, token, port=IPC_PORT, host=IPC_HOST, timeout=5.0):
+        self.token = token
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def _connect(self, command, args=None):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        request = {'token': self.token, 'command': command}
+        if args:
+            request['args'] = args
+        request = json.dumps(request).encode('utf-8') + b"\n"
+        sock.sendall(request)
+        return sock
+
+    @staticmethod
+    def _parse(line):
+        if not line:
+            raise IPCError("Service closed the connection.")
+        reply = json.loads(line)
+        if not reply.get('ok', True):
+            raise IPCError(reply.get('error', "Request failed."))
+        return reply
+
+    def call(self, command, **args):
+        with self._connect(command, args) as sock, sock.makefile('rb') as reader:
+            return self._parse(reader.readline())['result']
+
+    def is_available(self):
+        try:
+            self.call('status')
+            return True
+        except (OSError, IPCError):
+            return False
+
+    def events(self, stop_event=None):
+        """Yields service events until the connection drops or ``stop_event`` is set."""
+        with self._connect('events') as sock:
+            # Read by hand: a file object cannot be used again after a timeout.
+            sock.settimeout(1.0)
+            buffer = b""
+            subscribed = False
+            while not (stop_event and stop_event.is_set()):
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    return
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    reply = self._parse(line)
+                    if subscribed:
+                        yield reply['event']
+                    subscribed = True
+
+    def status(self):
+        return self.call('status')
+
+    def start_monitoring(self):
+        return self.call('start')
+
+    def stop_monitoring(self):
+        return self.call('stop')
+
+    def reload_settings(self):
+        return self.call('reload')
+
+    def capture_profile(self, seconds=None):
+        return self.call('profile', seconds=seconds)
@@ -0,0 +1,242 @@
+import itertools
+
+import numpy as np
+
+# MonitorService's defaults ("lock_delay" and "grace_period" in app_settings.json).
+LOCK_DELAY = 10.0
+GRACE_PERIOD = 5.0
+# A gap longer than this between samples means monitoring was restarted.
+SESSION_GAP = 30.0
+
+RESULT = np.dtype([('lock_delay', 'f8'), ('grace_period', 'f8'), ('interval', 'f8'), ('k', 'i4'), ('n', 'i4'),
+                   ('locks', 'i8'), ('false_locks', 'i8'), ('absences', 'i8'), ('missed_absences', 'i8'),
+                   ('mean_time_to_lock', 'f8')])
+
+
+def load_trace(path):
+    """Loads (timestamps, detected, truth) from an .npz trace.
+
+    ``timestamps`` and ``verdicts`` are required (clips written by
+    export_recording.py have both; grace frames count as present). An optional
+    boolean ``truth`` array says whether the user was really at the desk; it is
+    None when the trace has no labels.
+    """
+    with np.load(path) as trace:
+        timestamps = trace['timestamps'].astype(np.float64)
+        detected = trace['verdicts'] != 0
+        truth = trace['truth'].astype(bool) if 'truth' in trace.files else None
+    order = np.argsort(timestamps, kind='stable')
+    return timestamps[order], detected[order], truth[order] if truth is not None else None
+
+
+def session_starts(timestamps, session_gap=SESSION_GAP):
+    """Boolean mask of samples that start a monitoring session."""
+    starts = np.empty(len(timestamps), dtype=bool)
+    starts[:1] = True
+    starts[1:] = np.diff(timestamps) > session_gap
+    return starts
+
+
+def _first_index(starts):
+    # For every sample, the index of the first sample of its session.
+    return np.maximum.accumulate(np.where(starts, np.arange(len(starts)), 0))
+
+
+def _runs(mask, starts):
+    # (first, last) indexes of maximal True runs that do not cross a session start.
+    if not len(mask):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    previous = np.empty_like(mask)
+    previous[0] = False
+    previous[1:] = mask[:-1]
+    following = np.empty_like(mask)
+    following[-1] = False
+    following[:-1] = mask[1:] & ~starts[1:]
+    first = np.flatnonzero(mask & (~previous | starts))
+    last = np.flatnonzero(mask & ~following)
+    return first, last
+
+
+def label_truth(timestamps, detected, min_absence=60.0, session_gap=SESSION_GAP):
+    """Guesses ground truth for an unlabelled trace: only a run of "no face" lasting
+    ``min_absence`` seconds or more counts as the user really being away."""
+    starts = session_starts(timestamps, session_gap)
+    first, last = _runs(~detected, starts)
+    long_runs = timestamps[last] - timestamps[first] >= min_absence
+    edges = np.zeros(len(timestamps) + 1, dtype=np.int32)
+    np.add.at(edges, first[long_runs], 1)
+    np.add.at(edges, last[long_runs] + 1, -1)
+    return np.cumsum(edges[:-1]) == 0
+
+
+class _Samples:
+    # One thinned copy of the trace, with the per-sample session bookkeeping
+    # that every (grace, k, n) combination shares.
+
+    def __init__(self, times, detected, truth, starts):
+        self.times, self.detected, self.truth, self.starts = times, detected, truth, starts
+        self.first_index = _first_index(starts)
+        self.index = np.arange(len(times))
+        self.since_start = times - times[self.first_index]
+
+    def absent_runs(self, grace, k, n):
+        absent = ~self.detected
+        if grace > 0:
+            absent &= self.since_start >= grace
+        if (k, n) != (1, 1):
+            counts = np.concatenate(([0], np.cumsum(absent, dtype=np.int64)))
+            window_start = np.maximum(self.index - n + 1, self.first_index)
+            absent = counts[1:] - counts[window_start] >= k
+        return _runs(absent, self.starts)
+
+
+class PolicySimulator:
+    """Evaluates lock policies against a detection trace, many at once.
+
+    A policy is (lock delay, grace period, sampling interval, k-of-n). The
+    trace is first thinned to one sample per ``interval`` seconds (0 keeps
+    every sample), samples within ``grace_period`` of a session start count
+    as present, and a sample counts as "no face" only if at least ``k`` of the
+    last ``n`` verdicts were (k = n = 1 is what the monitor does today). The
+    result feeds the same state machine as PresenceMonitor._update_state: a
+    run of "no face" samples locks once a sample is ``lock_delay`` seconds
+    after the run's first one.
+
+    Everything after thinning is whole-array NumPy: one cumulative sum per
+    (interval, grace, k, n) and a batched binary search over all lock delays.
+
+    Scored against ``truth`` (True = user at the desk). A lock lasts until
+    the next sample that counts as present:
+
+    - false lock: the user never left while it lasted;
+    - missed absence: a real absence of at least ``min_absence`` seconds
+      during which the workstation was never locked;
+    - time to lock: from the first away sample until locked (0 if a lock
+      was already in place), over the absences that were caught.
+    """
+
+    def __init__(self, timestamps, detected, truth=None, min_absence=60.0, session_gap=SESSION_GAP):
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.detected = np.asarray(detected, dtype=bool)
+        self.truth = label_truth(self.timestamps, self.detected, min_absence, session_gap) \
+            if truth is None else np.asarray(truth, dtype=bool)
+        self.min_absence = min_absence
+        self.starts = session_starts(self.timestamps, session_gap)
+
+        first, last = _runs(~self.truth, self.starts)
+        begin, end = self.timestamps[first], self.timestamps[last]
+        qualifying = end - begin >= min_absence
+        self.absence_start, self.absence_end = begin[qualifying], end[qualifying]
+
+    def _thin(self, interval):
+        times, starts = self.timestamps, self.starts
+        if not interval:
+            return _Samples(times, self.detected, self.truth, starts)
+        session_start = times[_first_index(starts)]
+        bucket = np.floor((times - session_start) / interval).astype(np.int64)
+        keep = starts.copy()
+        keep[1:] |= bucket[1:] != bucket[:-1]
+        return _Samples(times[keep], self.detected[keep], self.truth[keep], starts[keep])
+
+    @staticmethod
+    def _lock_indexes(times, first, last, lock_delays):
+        # For each run and delay: the first sample at least lock_delay after the
+        # run's first one, or -1 if the run ends before that. Runs too short for
+        # the smallest delay (most of them: brief detector misses) are skipped.
+        locks = np.full((len(first), len(lock_delays)), -1, dtype=np.int64)
+        long_enough = np.flatnonzero(times[last] - times[first] >= lock_delays.min())
+        first, last = first[long_enough], last[long_enough]
+        run_start = times[first][:, None]
+        index = np.searchsorted(times, run_start + lock_delays[None, :], side='left')
+
+        # Match the monitor's ``t - start >= delay`` test exactly, not ``t >= start + delay``.
+        def elapsed_enough(i):
+            return (i < len(times)) & (times[np.minimum(i, len(times) - 1)] - run_start >= lock_delays[None, :])
+        index = np.where(elapsed_enough(index), index, index + 1)
+        index = np.where((index - 1 >= first[:, None]) & elapsed_enough(index - 1), index - 1, index)
+        locks[long_enough] = np.where(index <= last[:, None], index, -1)
+        return locks
+
+    def _score(self, times, away_counts, lock_index, run_last):
+        lock_time, lock_end = times[lock_index], times[run_last]
+        never_left = away_counts[run_last + 1] - away_counts[lock_index] == 0
+        result = {'locks': len(lock_index), 'false_locks': int(never_left.sum()),
+                  'absences': len(self.absence_start)}
+        if not len(self.absence_start):
+            result.update(missed_absences=0, mean_time_to_lock=np.nan)
+            return result
+        # Locked intervals are disjoint and in time order: the first one that
+        # has not ended by the time the user left is the only candidate.
+        candidate = np.searchsorted(lock_end, self.absence_start, side='left')
+        locked_at = np.concatenate((lock_time, [np.inf]))[candidate]
+        caught = locked_at <= self.absence_end
+        result['missed_absences'] = int((~caught).sum())
+        result['mean_time_to_lock'] = float(np.maximum(locked_at[caught] - self.absence_start[caught], 0).mean()) \
+            if caught.any() else np.nan
+        return result
+
+    def run(self, lock_delays=(LOCK_DELAY,), grace_periods=(GRACE_PERIOD,), intervals=(0.0,), smoothing=((1, 1),)):
+        """Returns one RESULT row per combination of the given parameters."""
+        lock_delays = np.asarray(lock_delays, dtype=np.float64)
+        rows = []
+        for interval in intervals:
+            samples = self._thin(interval)
+            away_counts = np.concatenate(([0], np.cumsum(~samples.truth, dtype=np.int64)))
+            for grace, (k, n) in itertools.product(grace_periods, smoothing):
+                first, last = samples.absent_runs(grace, k, n)
+                locks = self._lock_indexes(samples.times, first, last, lock_delays)
+                for column, delay in enumerate(lock_delays):
+                    locked = locks[:, column] >= 0
+                    score = self._score(samples.times, away_counts, locks[locked, column], last[locked])
+                    rows.append((delay, grace, interval, k, n, score['locks'], score['false_locks'],
+                                 score['absences'], score['missed_absences'], score['mean_time_to_lock']))
+        return np.array(rows, dtype=RESULT)
+
+    def lock_times(self, lock_delay=LOCK_DELAY, grace_period=GRACE_PERIOD, interval=0.0, k=1, n=1):
+        """Lock times for a single policy."""
+        samples = self._thin(interval)
+        first, last = samples.absent_runs(grace_period, k, n)
+        index = self._lock_indexes(samples.times, first, last, np.array([lock_delay], dtype=np.float64))[:, 0]
+        return samples.times[index[index >= 0]]
+
+
+def synthetic_trace(days=7, hours_per_day=9.0, rate=10.0, mean_present=1200.0, mean_away=240.0,
+                    miss_rate=0.01, mean_miss=1.5, false_face_rate=0.0005, seed=0):
+    """Generates a labelled trace: (timestamps, detected, truth).
+
+    Each day is one monitoring session of ``hours_per_day`` hours sampled at
+    roughly ``rate`` Hz. The user alternates between exponentially distributed
+    stretches at the desk (``mean_present`` seconds) and away (``mean_away``,
+    log-normal so that short trips are common). While present the detector
+    misses the face in bursts (looking down, turning away) that start with
+    probability ``miss_rate`` per sample and last ``mean_miss`` seconds on
+    average with a heavy tail; while away it sees a face with probability
+    ``false_face_rate`` per sample.
+    """
+    rng = np.random.default_rng(seed)
+    per_day = int(hours_per_day * 3600 * rate)
+    offsets = np.cumsum(rng.uniform(0.8, 1.2, per_day) / rate)
+    timestamps = (np.arange(days)[:, None] * 86400.0 + 9 * 3600.0 + offsets[None, :]).ravel()
+    count = len(timestamps)
+
+    # Alternating present/away stretches, measured in samples.
+    stretches = []
+    total = 0
+    while total < count:
+        present = max(1, int(rng.exponential(mean_present) * rate))
+        away = max(1, int(rng.lognormal(np.log(mean_away / 2), 1.0) * rate))
+        stretches += [present, away]
+        total += present + away
+    truth = np.repeat(np.tile([True, False], len(stretches) // 2), stretches)[:count]
+
+    # Miss bursts as +1/-1 edges in a difference array.
+    burst_starts = np.flatnonzero(rng.random(count) < miss_rate)
+    lengths = np.maximum(1, (rng.lognormal(np.log(mean_miss / 1.6), 1.0, len(burst_starts)) * rate).astype(np.int64))
+    edges = np.zeros(count + 1, dtype=np.int32)
+    np.add.at(edges, burst_starts, 1)
+    np.add.at(edges, np.minimum(burst_starts + lengths, count), -1)
+    missed = np.cumsum(edges[:-1]) > 0
+
+    false_face = rng.random(count) < false_face_rate
+    detected = np.where(truth, ~missed, false_face)
+    return timestamps, detected, truth
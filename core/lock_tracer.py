@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+LAST_FACE_SEEN = 'last_face_seen'
+ABSENCE_DECIDED = 'absence_decided'
+WORKSTATION_LOCKED = 'workstation_locked'
+PORTS_SECURED = 'ports_secured'
+
+# (span name, start stage, end stage)
+SPANS = (
+    ('detection', LAST_FACE_SEEN, ABSENCE_DECIDED),
+    ('lock', ABSENCE_DECIDED, WORKSTATION_LOCKED),
+    ('secure_ports', WORKSTATION_LOCKED, PORTS_SECURED),
+    ('total', LAST_FACE_SEEN, PORTS_SECURED),
+)
+
+HISTOGRAM_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 15000, 30000, 60000)
+
+
+class LockTracer:
+    """Times each lock from the last frame with a face to the last port being secured.
+
+    All timestamps come from time.monotonic(). Finished traces are kept as
+    per-span durations in a bounded ring, so memory use stays constant.
+    """
+
+    def __init__(self, capacity=512):
+        self._traces = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._last_face = None
+        self._active = None
+
+    def face_seen(self):
+        # Called for every present frame; a single attribute store, no locking.
+        self._last_face = time.monotonic()
+
+    def absence_decided(self):
+        now = time.monotonic()
+        with self._lock:
+            self._active = {LAST_FACE_SEEN: self._last_face or now, ABSENCE_DECIDED: now}
+
+    def mark(self, stage):
+        with self._lock:
+            if self._active is not None:
+                self._active[stage] = time.monotonic()
+
+    def finish(self):
+        now = time.monotonic()
+        with self._lock:
+            trace, self._active = self._active, None
+            if trace is None:
+                return None
+            trace[PORTS_SECURED] = now
+            durations = {}
+            for name, start, end in SPANS:
+                if start in trace and end in trace:
+                    durations[name] = trace[end] - trace[start]
+            self._traces.append(durations)
+            return durations
+
+    def traces(self):
+        with self._lock:
+            return list(self._traces)
+
+    def summary(self):
+        traces = self.traces()
+        result = {'count': len(traces), 'spans': {}}
+        for name, _, _ in SPANS:
+            values_ms = sorted(t[name] * 1000 for t in traces if name in t)
+            result['spans'][name] = _describe(values_ms)
+        return result
+
+    def save_summary(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _describe(values_ms):
+    overflow = f">{HISTOGRAM_BUCKETS_MS[-1]}"
+    histogram = {f"<={bound}": 0 for bound in HISTOGRAM_BUCKETS_MS}
+    histogram[overflow] = 0
+    for value in values_ms:
+        for bound in HISTOGRAM_BUCKETS_MS:
+            if value <= bound:
+                histogram[f"<={bound}"] += 1
+                break
+        else:
+            histogram[overflow] += 1
+
+    if not values_ms:
+        return {'count': 0, 'histogram_ms': histogram}
+    return {
+        'count': len(values_ms),
+        'min_ms': values_ms[0],
+        'p50_ms': _percentile(values_ms, 0.50),
+        'p90_ms': _percentile(values_ms, 0.90),
+        'p99_ms': _percentile(values_ms, 0.99),
+        'max_ms': values_ms[-1],
+        'histogram_ms': histogram,
+    }
@@ -0,0 +1,78 @@
+PROTECTED_KEYWORDS = [
+    "root hub", "host controller", "camera", "webcam", "keyboard", "mouse",
+    "bluetooth", "intel", "dell", "hp", "lenovo", "usb composite",
+    "ucsi", "input device", "video", "monitor", "display", "audio",
+    "composite", "controller", "internal", "builtin"
+]
+
+
+def is_valid_device_id(device_id):
+    # --- فیلترهای ایمن برای حذف داده‌های نامعتبر ---
+    if not device_id or len(device_id) == 0:
+        return False
+
+    # حذف خطوطی که خروجی کنسول هستند
+    if ("matching device(s)" in device_id or
+            "device(s)" in device_id or
+            "found" in device_id or
+            "disabled" in device_id or
+            "enabled" in device_id or
+            len(device_id) > 200):
+        return False
+
+    # فقط دستگاه‌های با پیشوند معتبر
+    return (device_id.startswith("USB\\") or
+            device_id.startswith("SWD\\") or
+            device_id.startswith("ACPI\\"))
+
+
+def devices_to_disable(devices, whitelisted_ids):
+    for device in devices:
+        device_id = device.get('id')
+        device_name = device.get('name', '').lower().strip()
+
+        if not is_valid_device_id(device_id):
+            continue
+
+        is_protected = any(keyword in device_name for keyword in PROTECTED_KEYWORDS)
+        is_whitelisted = device_id in whitelisted_ids
+
+        if not is_protected and not is_whitelisted:
+            yield device_id, device_name
+
+
+def apply_lockdown(system_controller, lockdown_level, whitelisted_ids, logger=None):
+    system_controller.begin_lockdown()
+    try:
+        if lockdown_level == 'total':
+            if logger: logger.info("Applying TOTAL LOCKDOWN: Disabling USB storage service.")
+            system_controller.disable_usb_storage()
+        else:
+            if logger: logger.info("Applying STANDARD LOCK: Disabling non-whitelisted devices.")
+            all_usb_devices = system_controller.get_usb_devices()
+            for device_id, device_name in devices_to_disable(all_usb_devices, whitelisted_ids):
+                if logger: logger.info(f"Disabling non-essential device: {device_name}")
+                system_controller.disable_device(device_id)
+    finally:
+        system_controller.end_lockdown()
+
+
+async def apply_lockdown_async(system_controller, lockdown_level, whitelisted_ids, logger=None):
+    """Same steps as apply_lockdown(), as a task that can be cancelled between and during devcon calls.
+
+    Every device is journaled before it is touched, so a cancelled lockdown is
+    undone by the normal journal restore.
+    """
+    system_controller.begin_lockdown()
+    try:
+        if lockdown_level == 'total':
+            if logger: logger.info("Applying TOTAL LOCKDOWN: Disabling USB storage service.")
+            system_controller.disable_usb_storage()
+        else:
+            if logger: logger.info("Applying STANDARD LOCK: Disabling non-whitelisted devices.")
+            all_usb_devices = await system_controller.get_usb_devices_async()
+            for device_id, device_name in devices_to_disable(all_usb_devices, whitelisted_ids):
+                if logger: logger.info(f"Disabling non-essential device: {device_name}")
+                await system_controller.disable_device_async(device_id)
+    finally:
+        system_controller.end_lockdown()
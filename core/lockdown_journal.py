@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+
+JOURNAL_FILE = "config/lockdown_journal.jsonl"
+
+
+class LockdownJournal:
+    """Append-only record of every change made during a lockdown.
+
+    Entries are written (and fsync'd) *before* the change is applied, so a crash
+    mid-lockdown leaves enough behind to undo it on the next start. Restore only
+    replays what is still pending instead of re-enabling every USB device.
+    """
+
+    DEVICE = 'device'
+    USB_STORAGE = 'usbstor'
+
+    def __init__(self, path=JOURNAL_FILE, logger=None):
+        self.path = path
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    def _append(self, record):
+        record['ts'] = time.time()
+        line = (json.dumps(record) + "\n").encode('utf-8')
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a+b') as f:
+                # Terminate a torn line left by a crash so this record stays parseable.
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def begin(self):
+        self._append({'op': 'begin'})
+
+    def end(self):
+        self._append({'op': 'end'})
+
+    def record_device(self, device_id):
+        self._append({'op': 'disable', 'kind': self.DEVICE, 'target': device_id})
+
+    def record_usb_storage(self):
+        self._append({'op': 'disable', 'kind': self.USB_STORAGE, 'target': 'USBSTOR'})
+
+    def mark_restored(self, kind, target):
+        self._append({'op': 'restore', 'kind': kind, 'target': target})
+
+    def _read_records(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; the change it
+                    # described was never applied, so it is safe to drop.
+                    if self.logger: self.logger.warning("Skipping corrupt lockdown journal entry.")
+        return records
+
+    def pending(self):
+        """Returns (kind, target) pairs disabled but not yet restored, oldest first."""
+        pending = {}
+        for record in self._read_records():
+            key = (record.get('kind'), record.get('target'))
+            if None in key:
+                continue
+            if record.get('op') == 'disable':
+                pending[key] = True
+            elif record.get('op') == 'restore':
+                pending.pop(key, None)
+        return list(pending)
+
+    def compact(self):
+        """Drops the journal once nothing is left to restore."""
+        with self._lock:
+            if os.path.exists(self.path) and not self.pending():
+                os.remove(self.path)
@@ -0,0 +1,117 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsCollector:
+    """Builds a Prometheus text exposition from the live app objects.
+
+    Everything is read from plain attributes that the monitor and controller
+    update on their own threads, so a scrape never takes the monitor's lock.
+    """
+
+    def __init__(self, get_monitor, system_controller):
+        self.get_monitor = get_monitor
+        self.system_controller = system_controller
+
+    def collect(self):
+        lines = []
+
+        def metric(name, kind, help_text, value):
+            lines.append(f"# HELP facelock_{name} {help_text}")
+            lines.append(f"# TYPE facelock_{name} {kind}")
+            lines.append(f"facelock_{name} {float(value)!r}")
+
+        monitor = self.get_monitor()
+        running = bool(monitor and monitor.is_running)
+        metric("monitor_running", "gauge", "1 while the presence monitor thread is running.", running)
+        if monitor:
+            metric("capture_fps", "gauge", "Camera frames captured per second (moving average).",
+                   monitor.capture_fps)
+            metric("frames_captured_total", "counter", "Frames read from the camera.", monitor.frames_captured)
+            metric("frames_failed_total", "counter", "Failed camera reads.", monitor.frames_failed)
+            metric("frames_skipped_total", "counter", "Frames not analysed (startup grace period).",
+                   monitor.frames_skipped)
+            metric("detections_total", "counter", "Detector invocations.", monitor.detections)
+            metric("detection_seconds_total", "counter", "Total time spent in the detector.",
+                   monitor.detection_seconds_total)
+            metric("detection_last_seconds", "gauge", "Duration of the most recent detection.",
+                   monitor.last_detection_seconds)
+            metric("frames_gated_total", "counter", "Samples skipped because keyboard/mouse input was recent.",
+                   monitor.frames_gated)
+            metric("detection_seconds_saved_total", "counter",
+                   "Estimated detector time avoided by input gating.", monitor.detection_seconds_saved())
+            metric("camera_active_seconds_total", "counter", "Time the camera has been open.",
+                   monitor.camera_active_seconds())
+            metric("monitor_cpu_seconds_total", "counter", "CPU time used by the presence monitor thread.",
+                   monitor.cpu_seconds_total)
+            camera = monitor.camera
+            metric("camera_healthy", "gauge", "1 while the camera delivers frames.", camera.health == "healthy")
+            metric("camera_unavailable_seconds", "gauge", "Time since the last good frame (0 while healthy).",
+                   camera.unavailable_seconds())
+            metric("camera_reconnects_total", "counter", "Camera reopens after a failure.", camera.reconnects)
+            metric("camera_failovers_total", "counter", "Opens of an alternate camera source.", camera.failovers)
+            metric("user_present", "gauge", "1 if the user is considered present.", monitor.last_presence_state)
+            metric("absence_timer_progress", "gauge", "Fraction of the lock delay elapsed without a face (0-1).",
+                   monitor.absence_progress())
+
+        controller = self.system_controller
+        metric("workstation_locks_total", "counter", "Successful LockWorkStation calls.", controller.workstation_locks)
+        metric("lockdowns_total", "counter", "Completed port lockdowns.", controller.lockdowns)
+        metric("lockdown_seconds_total", "counter", "Total time spent applying port lockdowns.",
+               controller.lockdown_seconds_total)
+        metric("lockdown_last_seconds", "gauge", "Duration of the most recent port lockdown.",
+               controller.last_lockdown_seconds)
+        metric("devcon_failures_total", "counter", "Failed devcon invocations.", controller.devcon_failures)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Opt-in HTTP endpoint serving ``/metrics`` on the loopback interface only."""
+
+    def __init__(self, collector, port=9464, host="127.0.0.1", logger=None):
+        self.collector = collector
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self._server = None
+        self._thread = None
+
+    def _make_handler(self):
+        collector = self.collector
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = collector.collect().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        except OSError as e:
+            if self.logger: self.logger.error(f"Could not start metrics endpoint on {self.host}:{self.port}: {e}")
+            return False
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        if self.logger: self.logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
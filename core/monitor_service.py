@@ -0,0 +1,349 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.lock_tracer import LockTracer, WORKSTATION_LOCKED
+from core.orchestrator import LockdownOrchestrator
+from core.security_manager import SecurityManager
+
+LOCK_LATENCY_FILE = "../logs/lock_latency.json"
+RECORDING_FILE = "../logs/session.rec"
+HISTORY_DIR = "../logs/history"
+
+# Event types delivered to subscribers (and streamed over IPC).
+EVENT_MONITORING = 'monitoring'   # {'active': bool}
+EVENT_PRESENCE = 'presence'       # {'present': bool}
+EVENT_LOCKDOWN = 'lockdown'       # {'level': str, 'seconds': float, 'completed': bool}
+EVENT_SETTINGS = 'settings'       # {} after a reload
+# change is 'arrived'/'removed' (plugged in or out) or 'enabled'/'disabled' (by a lockdown or restore)
+EVENT_DEVICE = 'device'           # {'device': str, 'change': str, 'ok': bool, 'user_present': bool | None}
+EVENT_PROFILE = 'profile'         # {'path': str, 'ok': bool} once a requested profile is written
+
+
+class MonitorService:
+    """Presence monitoring and the lockdown response, without any UI.
+
+    Runs inside the Tk app (FaceLockApp) or on its own in the headless daemon
+    (service.py). OpenCV and the optional stores are imported only when
+    monitoring starts, so an idle service stays small. Subscribers receive
+    event dicts on the thread that produced them and must not block.
+    """
+
+    def __init__(self, system_controller, config, logger=None):
+        self.system_controller = system_controller
+        self.config = config
+        self.logger = logger
+        self.settings = config.get('app_settings')
+        config.subscribe('app_settings', self._apply_settings)
+
+        self.presence_monitor = None
+        self.lock_tracer = LockTracer()
+        self.presence_history = None
+        self.metrics_server = None
+        self.event_shipper = None
+        self.orchestrator = LockdownOrchestrator(system_controller, logger=logger)
+        # Lockdown results and device changes arrive on the orchestrator's loop;
+        # history writes and subscribers run here instead, in order, so a slow
+        # subscriber can never hold up a restore.
+        self._notifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-notify")
+        # Optional callable returning the device IDs to spare; the window sets it
+        # so unsaved whitelist toggles count, as they always have.
+        self.whitelist_provider = None
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        system_controller.on_device_change = self._device_changed
+
+    def _apply_settings(self, name, settings):
+        self.settings = settings
+
+    def subscribe(self, callback):
+        with self._subscribers_lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._subscribers_lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _emit(self, event_type, **fields):
+        event = {'type': event_type, 'time': time.time(), **fields}
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                if self.logger: self.logger.error(f"Event subscriber failed: {e}")
+
+    def is_monitoring(self):
+        monitor = self.presence_monitor
+        return bool(monitor and monitor.is_alive())
+
+    def start_metrics_server(self):
+        # Opt-in: only when "metrics_port" is set in app_settings.json.
+        port = self.settings.get('metrics_port')
+        if not port or self.metrics_server:
+            return
+        from core.metrics_server import MetricsCollector, MetricsServer
+        collector = MetricsCollector(get_monitor=lambda: self.presence_monitor,
+                                     system_controller=self.system_controller)
+        self.metrics_server = MetricsServer(collector, port=int(port), logger=self.logger)
+        if not self.metrics_server.start():
+            self.metrics_server = None
+
+    def start_event_shipper(self):
+        # Opt-in: only when "shipper_url" is set in app_settings.json.
+        url = self.settings.get('shipper_url')
+        if not url or self.event_shipper:
+            return
+        from core.event_shipper import EventShipper, SPOOL_DIR
+        try:
+            self.event_shipper = EventShipper(url, spool_dir=self.settings.get('shipper_spool_dir', SPOOL_DIR),
+                                              token=self.settings.get('shipper_token'), logger=self.logger)
+        except (OSError, ValueError) as e:
+            if self.logger: self.logger.error(f"Could not start the event shipper: {e}")
+            return
+        self.subscribe(self.event_shipper.submit)
+        self.event_shipper.start()
+
+    def _emit_device(self, device_id, change, ok=True):
+        monitor = self.presence_monitor
+        self._emit(EVENT_DEVICE, device=device_id, change=change, ok=ok,
+                   user_present=monitor.last_presence_state if monitor else None)
+
+    def _off_loop(self, func, *args):
+        try:
+            self._notifier.submit(func, *args)
+        except RuntimeError:
+            pass  # after shutdown(), e.g. the final USB reset: nobody is listening any more
+
+    def _device_changed(self, device_id, enabled, ok):
+        self._off_loop(self._emit_device, device_id, 'enabled' if enabled else 'disabled', ok)
+
+    def device_arrived(self, device_id):
+        """SessionEventDispatcher handler for DBT_DEVICEARRIVAL; a device plugged in while away is worth a warning."""
+        monitor = self.presence_monitor
+        if monitor and not monitor.last_presence_state and self.logger:
+            self.logger.warning(f"USB device {device_id} connected while the user is away.")
+        self._emit_device(device_id, 'arrived')
+
+    def device_removed(self, device_id):
+        self._emit_device(device_id, 'removed')
+
+    def handle_presence_change(self, is_present):
+        # Called on the monitor thread; the port lockdown itself runs on the
+        # orchestrator's loop so this returns as soon as the session is locked.
+        history = self.presence_history
+        self._emit(EVENT_PRESENCE, present=is_present)
+        if is_present:
+            if history: history.record_unlock()
+            # The session stays locked until the user signs in; only the port
+            # lockdown still in progress is abandoned.
+            self.orchestrator.cancel_lockdown()
+            return
+
+        if self.logger: self.logger.warning("Absence detected. Locking workstation and securing ports.")
+        self.system_controller.lock_workstation()
+        self.lock_tracer.mark(WORKSTATION_LOCKED)
+        # Dropping cached keys is not part of locking; keep it out of the latency span.
+        self._off_loop(SecurityManager.clear_key_cache)
+
+        lockdown_level = self.settings.get('lockdown_level', 'standard')
+        provider = self.whitelist_provider
+        whitelisted_ids = set(provider() if provider else self.config.get('whitelist'))
+        future = self.orchestrator.start_lockdown(lockdown_level, whitelisted_ids)
+        future.add_done_callback(lambda f: self._off_loop(self._lockdown_finished, f, lockdown_level))
+
+    def _lockdown_finished(self, future, lockdown_level):
+        if future.cancelled():
+            completed = False
+        elif future.exception():
+            completed = False
+            if self.logger: self.logger.error(f"Lockdown failed: {future.exception()}")
+        else:
+            completed = future.result()
+        seconds = self.system_controller.last_lockdown_seconds
+        if self.presence_history:
+            self.presence_history.record_lock(lockdown_seconds=seconds)
+        self._emit(EVENT_LOCKDOWN, level=lockdown_level, seconds=seconds, completed=completed)
+
+        spans = self.lock_tracer.finish() if completed else None
+        if spans and self.logger:
+            self.logger.info("Lock latency: " + ", ".join(f"{name}={value * 1000:.0f} ms"
+                                                          for name, value in spans.items()))
+
+    def restore_ports(self):
+        """Undoes the lockdown (e.g. on session unlock), cancelling one that is still running."""
+        return self.orchestrator.restore().result()
+
+    def _open_history(self):
+        # Opt-in: "history_enabled" keeps presence samples and lock events in a
+        # compact binary store for reports (see history_report.py).
+        if self.presence_history or not self.settings.get('history_enabled'):
+            return self.presence_history
+        from core.presence_history import PresenceHistory
+        directory = self.settings.get('history_dir', HISTORY_DIR)
+        try:
+            self.presence_history = PresenceHistory(directory)
+        except (OSError, ValueError) as e:
+            if self.logger: self.logger.error(f"Could not open presence history in {directory}: {e}")
+        return self.presence_history
+
+    def _open_recorder(self):
+        # Opt-in: "recorder_enabled" keeps the last few minutes of low-res frames
+        # and verdicts on disk so a false lock can be investigated afterwards.
+        if not self.settings.get('recorder_enabled'):
+            return None
+        from core.session_recorder import SessionRecorder
+        path = self.settings.get('recorder_path', RECORDING_FILE)
+        try:
+            return SessionRecorder(path, slots=int(self.settings.get('recorder_slots', 1800)))
+        except OSError as e:
+            if self.logger: self.logger.error(f"Could not open session recording {path}: {e}")
+            return None
+
+    def _input_gating_options(self):
+        # Opt-in: "input_gating_seconds" treats keyboard/mouse input within that
+        # many seconds as presence and skips detection; "release_camera_after"
+        # also closes the camera once input has been continuous that long.
+        seconds = self.settings.get('input_gating_seconds')
+        if not seconds:
+            return {}
+        from core.input_activity import default_input_provider
+        provider = default_input_provider()
+        if provider is None:
+            return {}
+        release_after = self.settings.get('release_camera_after')
+        return {'input_provider': provider, 'input_active_seconds': float(seconds),
+                'release_camera_after': float(release_after) if release_after is not None else None}
+
+    def _cpu_policy(self):
+        # Opt-in: "cpu_policy" (and "battery_policy" for laptops) limit how much
+        # CPU OpenCV and the monitor thread may take; see core/cpu_policy.py.
+        from core.cpu_policy import CpuPolicyManager
+        try:
+            manager = CpuPolicyManager.from_settings(self.settings, self.system_controller, logger=self.logger)
+        except (ValueError, TypeError) as e:
+            if self.logger: self.logger.error(f"Ignoring invalid CPU policy: {e}")
+            return None
+        if manager:
+            manager.apply_global()
+        return manager
+
+    def start_monitoring(self):
+        """Starts the presence monitor. Returns False if it was already running.
+
+        Raises FileNotFoundError/ValueError when the detector's assets are missing or broken.
+        """
+        with self._state_lock:
+            if self.is_monitoring():
+                if self.logger: self.logger.warning("Monitoring is already running.")
+                return False
+            from core.presence_monitor import PresenceMonitor, HaarCascadeDetector, CustomSkinDetector
+            cpu_policy = self._cpu_policy()
+            engine_choice = self.settings.get('detection_engine', 'haar')
+            if engine_choice == 'skin':
+                detector = CustomSkinDetector(logger=self.logger)
+            else:
+                detector = HaarCascadeDetector(logger=self.logger)
+            self.presence_monitor = PresenceMonitor(detector_engine=detector,
+                                                    on_presence_change=self.handle_presence_change,
+                                                    lock_delay=float(self.settings.get('lock_delay', 10)),
+                                                    grace_period=float(self.settings.get('grace_period', 5)),
+                                                    logger=self.logger, tracer=self.lock_tracer,
+                                                    recorder=self._open_recorder(),
+                                                    history=self._open_history(),
+                                                    alternate_sources=self.settings.get('alternate_cameras', ()),
+                                                    camera_lock_after=self.settings.get('camera_lock_after'),
+                                                    cpu_policy=cpu_policy,
+                                                    **self._input_gating_options())
+            self.presence_monitor.start()
+        self._emit(EVENT_MONITORING, active=True)
+        return True
+
+    def stop_monitoring(self):
+        """Stops the presence monitor. Returns False if it was not running."""
+        with self._state_lock:
+            if not self.is_monitoring():
+                if self.logger: self.logger.warning("Monitoring is not running.")
+                return False
+            monitor = self.presence_monitor
+            monitor.stop()
+            monitor.join(timeout=2.0)
+            if monitor.recorder and not monitor.is_alive():
+                monitor.recorder.close()
+            self.presence_monitor = None
+        self._emit(EVENT_MONITORING, active=False)
+        return True
+
+    def capture_profile(self, seconds=None):
+        """Profiles the monitor thread and its detector for ``seconds``; returns the file it will be written to.
+
+        Returns at once; EVENT_PROFILE follows when the file is complete.
+        Raises RuntimeError if monitoring is off or a capture is already running.
+        """
+        from core.profiler import ProfileCapture, PROFILE_DIR, DEFAULT_SECONDS
+        with self._state_lock:
+            monitor = self.presence_monitor
+            if not (monitor and monitor.is_alive()):
+                raise RuntimeError("Monitoring is not running; there is nothing to profile.")
+            capture = ProfileCapture(seconds or self.settings.get('profile_seconds', DEFAULT_SECONDS),
+                                     directory=self.settings.get('profile_dir', PROFILE_DIR),
+                                     on_written=self._profile_written, logger=self.logger)
+            monitor.request_profile(capture)
+        return capture.path
+
+    def _profile_written(self, capture):
+        self._emit(EVENT_PROFILE, path=capture.path, ok=capture.error is None)
+
+    def reload_settings(self):
+        """Re-reads app_settings.json and the whitelist; a running monitor is restarted to pick the changes up."""
+        self.config.reload('app_settings')
+        self.config.reload('whitelist')
+        if self.is_monitoring():
+            self.stop_monitoring()
+            self.start_monitoring()
+        self._emit(EVENT_SETTINGS)
+
+    def status(self):
+        monitor = self.presence_monitor
+        controller = self.system_controller
+        status = {
+            'monitoring': self.is_monitoring(),
+            'lockdown_level': self.settings.get('lockdown_level', 'standard'),
+            'detection_engine': self.settings.get('detection_engine', 'haar'),
+            'workstation_locks': controller.workstation_locks,
+            'lockdowns': controller.lockdowns,
+            'last_lockdown_seconds': controller.last_lockdown_seconds,
+            **self.orchestrator.stats(),
+        }
+        if monitor:
+            status.update({
+                'user_present': monitor.last_presence_state,
+                'absence_progress': monitor.absence_progress(),
+                'capture_fps': monitor.capture_fps,
+                'camera_health': monitor.camera.health,
+                'camera_source': monitor.camera.active_source,
+            })
+        if self.event_shipper:
+            status['shipper'] = self.event_shipper.stats()
+        return status
+
+    def shutdown(self):
+        if self.is_monitoring():
+            self.stop_monitoring()
+        self.orchestrator.stop()
+        self._notifier.shutdown(wait=True)
+        if self.lock_tracer.traces():
+            self.lock_tracer.save_summary(LOCK_LATENCY_FILE)
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.event_shipper:
+            self.unsubscribe(self.event_shipper.submit)
+            self.event_shipper.stop()
+            self.event_shipper = None
+        if self.presence_history:
+            self.presence_history.close()
+            self.presence_history = None
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+
+from core.lockdown import apply_lockdown_async
+
+
+class LockdownOrchestrator:
+    """Runs port lockdowns and restores as asyncio tasks on a dedicated loop thread.
+
+    The presence monitor only posts transitions here and returns straight
+    away, so a slow devcon never holds up detection or ``stop()``. At most one
+    lockdown runs at a time. ``cancel_lockdown()`` (the user came back) and
+    ``restore()`` (the session was unlocked) cancel a lockdown that is still
+    disabling devices; devcon processes that are running are killed, and
+    everything journaled so far is undone by the restore.
+
+    All public methods are thread-safe and return concurrent.futures.Future
+    objects where there is a result to wait for.
+    """
+
+    def __init__(self, system_controller, logger=None):
+        self.system_controller = system_controller
+        self.logger = logger
+        self.lockdowns_started = 0
+        self.lockdowns_cancelled = 0
+        self.restores = 0
+        self._loop = None
+        self._thread = None
+        self._lockdown_task = None
+        self._ready = threading.Event()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="lockdown-orchestrator", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def stop(self, timeout=5.0):
+        """Cancels outstanding tasks and stops the loop thread."""
+        if not self._thread or not self._thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_all(), self._loop).result(timeout=timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+
+    async def _cancel_all(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _submit(self, coroutine):
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def lockdown_running(self):
+        task = self._lockdown_task
+        return bool(task and not task.done())
+
+    def start_lockdown(self, lockdown_level, whitelisted_ids):
+        """Schedules a lockdown. Resolves to True when it completed, False if it was cancelled."""
+        return self._submit(self._lockdown(lockdown_level, whitelisted_ids))
+
+    async def _lockdown(self, lockdown_level, whitelisted_ids):
+        if self.lockdown_running():
+            # Already locking down; wait for that one instead of starting another.
+            return await asyncio.shield(self._lockdown_task)
+        self.lockdowns_started += 1
+        self._lockdown_task = asyncio.current_task()
+        try:
+            await apply_lockdown_async(self.system_controller, lockdown_level, whitelisted_ids, logger=self.logger)
+            return True
+        except asyncio.CancelledError:
+            self.lockdowns_cancelled += 1
+            if self.logger: self.logger.info("Lockdown cancelled before it finished.")
+            return False
+        finally:
+            self._lockdown_task = None
+
+    def cancel_lockdown(self):
+        """Cancels a running lockdown. Resolves to True if there was one to cancel."""
+        return self._submit(self._cancel_lockdown())
+
+    async def _cancel_lockdown(self):
+        task = self._lockdown_task
+        if not task or task.done():
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    def restore(self):
+        """Cancels any running lockdown, then replays the journal. Resolves to True on a clean restore."""
+        return self._submit(self._restore())
+
+    async def _restore(self):
+        await self._cancel_lockdown()
+        self.restores += 1
+        return await self.system_controller.reset_all_usb_ports_async()
+
+    def stats(self):
+        return {
+            'lockdowns_started': self.lockdowns_started,
+            'lockdowns_cancelled': self.lockdowns_cancelled,
+            'restores': self.restores,
+            'lockdown_running': self.lockdown_running(),
+        }
@@ -0,0 +1,59 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.security_manager import SecurityManager
+
+
+class PasswordVerifier:
+    """Checks passwords with bcrypt on a worker thread.
+
+    Only one check runs at a time: submitting while one is in flight returns the
+    same future instead of queueing another bcrypt run. After ``free_attempts``
+    consecutive failures each further failure doubles a lockout window, capped
+    at ``max_backoff`` seconds. A successful check against a hash made with a
+    different bcrypt cost also returns a fresh hash at the current cost.
+    """
+
+    def __init__(self, get_hash, free_attempts=3, base_backoff=1.0, max_backoff=60.0):
+        self.get_hash = get_hash
+        self.free_attempts = free_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self._locked_until = 0.0
+        self._in_flight = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-verify")
+
+    def retry_after(self):
+        return max(0.0, self._locked_until - time.monotonic())
+
+    def submit(self, password):
+        """Returns a future resolving to (ok, new_hash_or_None), or None while locked out."""
+        with self._lock:
+            if self._in_flight is not None and not self._in_flight.done():
+                return self._in_flight
+            if self.retry_after() > 0:
+                return None
+            self._in_flight = self._executor.submit(self._verify, password, self.get_hash())
+            return self._in_flight
+
+    def _verify(self, password, current_hash):
+        ok = SecurityManager.verify_password(password, current_hash)
+        if not ok:
+            self.failures += 1
+            if self.failures > self.free_attempts:
+                delay = self.base_backoff * 2 ** (self.failures - self.free_attempts - 1)
+                self._locked_until = time.monotonic() + min(self.max_backoff, delay)
+            return False, None
+
+        self.failures = 0
+        self._locked_until = 0.0
+        new_hash = None
+        if SecurityManager.needs_rehash(current_hash):
+            new_hash = SecurityManager.hash_password(password)
+        return True, new_hash
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,238 @@
+import glob
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'FLHIST01'
+# magic, record size, capacity, committed record count
+HEADER = struct.Struct('<8sIIQ')
+HEADER_SIZE = 64
+
+RECORD = np.dtype([('time', '<f8'), ('duration', '<f4'), ('kind', 'u1'), ('flags', 'u1'), ('reserved', '<u2')])
+
+KIND_PRESENT = 1   # the user was present for ``duration`` seconds starting at ``time``
+KIND_AWAY = 2      # the user was considered away for ``duration`` seconds
+KIND_LOCK = 3      # workstation locked
+KIND_UNLOCK = 4    # user came back
+KIND_LOCKDOWN = 5  # port lockdown finished; ``duration`` is how long it took
+
+DAY = 86400
+HOUR = 3600
+
+
+def local_utc_offset():
+    return time.localtime().tm_gmtoff
+
+
+class _Segment:
+    def __init__(self, path, capacity=None, readonly=False):
+        self.path = path
+        exists = os.path.exists(path)
+        if not exists:
+            size = HEADER_SIZE + RECORD.itemsize * capacity
+            with open(path, 'wb') as f:
+                f.truncate(size)
+        self._file = open(path, 'rb' if readonly else 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        if exists:
+            magic, record_size, self.capacity, self.count = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or record_size != RECORD.itemsize:
+                self.close()
+                raise ValueError(f"{path} is not a presence history segment.")
+        else:
+            self.capacity, self.count = capacity, 0
+            self._write_header()
+        self.records = np.ndarray((self.capacity,), dtype=RECORD, buffer=self._mmap, offset=HEADER_SIZE)
+
+    def _write_header(self):
+        HEADER.pack_into(self._mmap, 0, MAGIC, RECORD.itemsize, self.capacity, self.count)
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def first_time(self):
+        return float(self.records['time'][0]) if self.count else None
+
+    def last_time(self):
+        return float(self.records['time'][self.count - 1]) if self.count else None
+
+    def append(self, timestamp, kind, duration):
+        row = self.records[self.count]
+        row['time'] = timestamp
+        row['duration'] = duration
+        row['kind'] = kind
+        # The count is published last, so readers never see a half-written record.
+        self.count += 1
+        self._write_header()
+
+    def select(self, start, end):
+        # Records are appended in time order, so the range is two binary searches.
+        times = self.records['time'][:self.count]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        hi = self.count if end is None else int(np.searchsorted(times, end, side='left'))
+        return self.records[lo:hi]
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        self.records = None
+        self._mmap.close()
+        self._file.close()
+
+
+class PresenceHistory:
+    """Append-only store of presence samples and lock events.
+
+    Records are 16-byte rows (see ``RECORD``) in fixed-capacity memory-mapped
+    segment files, always appended in time order. Each segment's time range is
+    known from its first and last row, so a query maps only the overlapping
+    segments and finds its bounds by binary search. Aggregates are single
+    NumPy passes (bincount over day or hour buckets), which keeps months of
+    history answerable in milliseconds.
+
+    ``observe()`` is meant to be called on every monitor iteration. It merges
+    consecutive observations of the same state into one record per state
+    change or ``sample_interval``, whichever comes first.
+    """
+
+    def __init__(self, directory, segment_capacity=65536, sample_interval=60.0, readonly=False):
+        self.directory = directory
+        self.segment_capacity = segment_capacity
+        self.sample_interval = sample_interval
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+
+        paths = sorted(glob.glob(os.path.join(directory, 'segment_*.bin')))
+        self._segments = [_Segment(path, readonly=readonly) for path in paths]
+        self._last_time = max((s.last_time() for s in self._segments if s.count), default=0.0)
+        self._run_state = None
+        self._run_start = None
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"segment_{number:06d}.bin")
+
+    def _writable_segment(self):
+        if not self._segments or self._segments[-1].full:
+            if self._segments:
+                self._segments[-1].flush()
+            self._segments.append(_Segment(self._segment_path(len(self._segments) + 1), self.segment_capacity))
+        return self._segments[-1]
+
+    def _append(self, timestamp, kind, duration=0.0):
+        # A wall clock stepped backwards (e.g. by an NTP correction) is clamped
+        # so every segment stays sorted.
+        timestamp = max(timestamp, self._last_time)
+        self._writable_segment().append(timestamp, kind, duration)
+        self._last_time = timestamp
+
+    def _split_run(self, now):
+        # The sample in progress is written up to ``now`` and continues from
+        # there, so an event recorded mid-run does not push the run's start
+        # time (clamped in _append) past where it really began.
+        if self._run_state is not None and now > self._run_start:
+            self._append(self._run_start, self._run_state, now - self._run_start)
+            self._run_start = now
+
+    def record(self, kind, duration=0.0, timestamp=None):
+        with self._lock:
+            timestamp = time.time() if timestamp is None else timestamp
+            self._split_run(timestamp)
+            self._append(timestamp, kind, duration)
+
+    def record_lock(self, lockdown_seconds=None):
+        with self._lock:
+            now = time.time()
+            self._split_run(now)
+            self._append(now, KIND_LOCK)
+            if lockdown_seconds is not None:
+                self._append(now, KIND_LOCKDOWN, lockdown_seconds)
+
+    def record_unlock(self):
+        self.record(KIND_UNLOCK)
+
+    def observe(self, present, now=None):
+        now = time.time() if now is None else now
+        state = KIND_PRESENT if present else KIND_AWAY
+        with self._lock:
+            if self._run_state is None:
+                self._run_state, self._run_start = state, now
+            elif state != self._run_state or now - self._run_start >= self.sample_interval:
+                self._append(self._run_start, self._run_state, now - self._run_start)
+                self._run_state, self._run_start = state, now
+
+    def flush(self, now=None):
+        """Ends the sample in progress (call when monitoring stops) and syncs the current segment."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._split_run(now)
+            self._run_state = self._run_start = None
+            if self._segments and not self.readonly:
+                self._segments[-1].flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+
+    def query(self, start=None, end=None, kinds=None):
+        """Returns a copy of the records with start <= time < end, optionally filtered by kind."""
+        with self._lock:
+            parts = []
+            for segment in self._segments:
+                if not segment.count:
+                    continue
+                if (end is not None and segment.first_time() >= end) or \
+                        (start is not None and segment.last_time() < start):
+                    continue
+                records = segment.select(start, end)
+                # Filtering straight off the mapping copies only the matching rows.
+                parts.append(records[np.isin(records['kind'], kinds)] if kinds is not None else records.copy())
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+
+    def _bucketed(self, kind, start, end, bucket, utc_offset, weights):
+        records = self.query(start, end, kinds=[kind])
+        if utc_offset is None:
+            utc_offset = local_utc_offset()
+        keys = np.floor((records['time'] + utc_offset) / bucket).astype(np.int64)
+        if not len(keys):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        first = keys.min()
+        totals = np.bincount(keys - first, weights=records['duration'] if weights else None)
+        buckets = np.arange(first, first + len(totals))
+        nonzero = totals > 0
+        return buckets[nonzero] * bucket - utc_offset, totals[nonzero]
+
+    def away_minutes_per_day(self, start=None, end=None, utc_offset=None):
+        """Returns {local midnight (epoch seconds): minutes away}. Samples count toward the day they start in."""
+        days, seconds = self._bucketed(KIND_AWAY, start, end, DAY, utc_offset, weights=True)
+        return {int(day): float(total) / 60.0 for day, total in zip(days, seconds)}
+
+    def locks_per_hour(self, start=None, end=None, utc_offset=None):
+        """Returns {hour start (epoch seconds): number of locks}."""
+        hours, counts = self._bucketed(KIND_LOCK, start, end, HOUR, utc_offset, weights=False)
+        return {int(hour): int(count) for hour, count in zip(hours, counts)}
+
+    def locks_by_hour_of_day(self, start=None, end=None, utc_offset=None):
+        """Returns a 24-element array: how many locks happened in each local hour of the day."""
+        if utc_offset is None:
+            utc_offset = local_utc_offset()
+        times = self.query(start, end, kinds=[KIND_LOCK])['time']
+        hours = ((times + utc_offset) // HOUR).astype(np.int64) % 24
+        return np.bincount(hours, minlength=24)
+
+    def lockdown_stats(self, start=None, end=None):
+        durations = self.query(start, end, kinds=[KIND_LOCKDOWN])['duration']
+        if not len(durations):
+            return {'count': 0}
+        return {'count': int(len(durations)), 'mean': float(durations.mean()),
+                'p95': float(np.percentile(durations, 95)), 'max': float(durations.max())}
@@ -4,6 +4,9 @@ import threading
 import time
 import os
 
+from core.camera_watchdog import CameraWatchdog
+from core.session_recorder import VERDICT_ABSENT, VERDICT_GRACE, VERDICT_PRESENT
+
 
 class BaseDetector:
     def detect(self, frame):
@@ -80,13 +83,36 @@ class CustomSkinDetector(BaseDetector):
 
 
 class PresenceMonitor(threading.Thread):
-    def __init__(self, detector_engine, on_presence_change, lock_delay=10, camera_index=0, logger=None):
+    def __init__(self, detector_engine, on_presence_change, lock_delay=10, camera_index=0, logger=None,
+                 tracer=None, recorder=None, input_provider=None, input_active_seconds=3.0,
+                 release_camera_after=None, alternate_sources=(), camera_factory=None,
+                 camera_lock_after=None, history=None, grace_period=5, cpu_policy=None):
         super().__init__(daemon=True)
         self.detector = detector_engine
         self.on_presence_change = on_presence_change
         self.lock_delay_seconds = lock_delay
         self.camera_index = camera_index
         self.logger = logger
+        self.tracer = tracer
+        self.recorder = recorder
+        self.history = history
+        # Optional CpuPolicyManager: thread pinning/priority and the pause between detections.
+        self.cpu_policy = cpu_policy
+        # A ProfileCapture while someone profiles the monitor (see request_profile), else None.
+        self.profile_capture = None
+
+        # Input gating: recent keyboard/mouse input counts as presence, so the
+        # detector (and optionally the camera) can rest while the user types.
+        self.input_provider = input_provider
+        self.input_active_seconds = input_active_seconds
+        self.release_camera_after = release_camera_after
+
+        # The watchdog reopens a failing camera with backoff and falls back to
+        # alternate_sources. With camera_lock_after set, a camera that stays
+        # unavailable that long is treated as the user being away.
+        self.camera = CameraWatchdog([camera_index, *alternate_sources],
+                                     open_source=camera_factory or cv2.VideoCapture, logger=logger)
+        self.camera_lock_after = camera_lock_after
 
         self.is_running = False
         self._lock = threading.Lock()
@@ -95,52 +121,159 @@ class PresenceMonitor(threading.Thread):
 
         # --- NEW: Startup grace period ---
         self.start_time = None
-        self.grace_period_seconds = 5
+        self.grace_period_seconds = grace_period
+
+        # Statistics: written only by this thread, read without locking by exporters.
+        self.frames_captured = 0
+        self.frames_failed = 0
+        self.frames_skipped = 0
+        self.detections = 0
+        self.detection_seconds_total = 0.0
+        self.last_detection_seconds = 0.0
+        self.capture_fps = 0.0
+        self._last_frame_time = None
+        self.frames_gated = 0
+        self.gated_seconds_total = 0.0
+        self.cpu_seconds_total = 0.0
 
     def run(self):
         self.is_running = True
         self.start_time = time.time()  # Record the start time
         if self.logger: self.logger.info(f"Presence monitor thread started with {self.detector.__class__.__name__}.")
 
-        cap = cv2.VideoCapture(self.camera_index)
-        if not cap.isOpened():
-            if self.logger: self.logger.error(f"Could not open camera with index {self.camera_index}.")
-            self.is_running = False
-            return
-
+        if self.cpu_policy: self.cpu_policy.apply_to_current_thread()
+        gated_since = None
+        cpu_mark = time.thread_time()
         while self.is_running:
-            ret, frame = cap.read()
-            if not ret:
-                if self.logger: self.logger.warning("Failed to grab frame. Retrying...")
-                time.sleep(1)
+            if self.profile_capture and not self.profile_capture.tick():
+                self.profile_capture = None
+            if self.cpu_policy: self.cpu_policy.poll()
+            now_cpu = time.thread_time()
+            self.cpu_seconds_total += now_cpu - cpu_mark
+            cpu_mark = now_cpu
+            if self.history: self.history.observe(self.last_presence_state)
+
+            if self._input_recent():
+                now = time.monotonic()
+                if gated_since is None:
+                    gated_since = now
+                self.frames_gated += 1
+                self._update_state(is_present=True)
+                if self.camera.active_source is not None and self.release_camera_after is not None \
+                        and now - gated_since >= self.release_camera_after:
+                    self.camera.close()
+                    if self.logger: self.logger.info("User is typing; camera released until input goes idle.")
+                time.sleep(0.5)
+                self.gated_seconds_total += time.monotonic() - now
                 continue
+            gated_since = None
+
+            attempted_failures = self.camera.read_failures
+            frame = self.camera.read()
+            if frame is None:
+                # Waiting out a reopen backoff is not a failed frame; only count reads that failed.
+                if self.camera.read_failures != attempted_failures:
+                    self.frames_failed += 1
+                self._check_camera_policy()
+                time.sleep(0.2)
+                continue
+            self._count_frame()
 
             # --- NEW: Check if grace period is active ---
             if time.time() - self.start_time < self.grace_period_seconds:
                 # During the grace period, we assume the user is present
+                self.frames_skipped += 1
+                if self.recorder: self.recorder.write(frame, VERDICT_GRACE)
                 self._update_state(is_present=True)
                 time.sleep(0.5)  # Check less frequently during startup
                 continue
 
+            detect_start = time.perf_counter()
             face_present = self.detector.detect(frame)
+            self.last_detection_seconds = time.perf_counter() - detect_start
+            self.detection_seconds_total += self.last_detection_seconds
+            self.detections += 1
+            if self.recorder: self.recorder.write(frame, VERDICT_PRESENT if face_present else VERDICT_ABSENT)
             self._update_state(face_present)
-            time.sleep(0.1)
-
-        cap.release()
-        if self.logger: self.logger.info("Presence monitor thread stopped and camera released.")
+            time.sleep(self.cpu_policy.detection_interval(0.1) if self.cpu_policy else 0.1)
+
+        if self.profile_capture:
+            self.profile_capture.finish()
+            self.profile_capture = None
+        self.camera.close()
+        if self.history: self.history.flush()
+        if self.logger:
+            self.logger.info("Presence monitor thread stopped and camera released.")
+            if self.input_provider:
+                self.logger.info(f"Input gating: camera active {self.camera_active_seconds():.0f} s, "
+                                 f"{self.frames_gated} samples gated, about "
+                                 f"{self.detection_seconds_saved():.1f} s of detection CPU saved.")
+
+    def _check_camera_policy(self):
+        if self.camera_lock_after is None or not self.last_presence_state:
+            return
+        unavailable = self.camera.unavailable_seconds()
+        if unavailable >= self.camera_lock_after:
+            with self._lock:
+                if not self.last_presence_state:
+                    return
+                self._mark_absent()
+            if self.logger: self.logger.warning(f"Camera unavailable for {unavailable:.0f} seconds. Signaling to lock.")
+            self.on_presence_change(False)
+
+    def _input_recent(self):
+        if not self.input_provider:
+            return False
+        idle = self.input_provider.idle_seconds()
+        return idle is not None and idle < self.input_active_seconds
+
+    def camera_active_seconds(self):
+        return self.camera.active_seconds()
+
+    def request_profile(self, capture):
+        """Hands a ProfileCapture to the monitor thread; it starts on the next loop iteration."""
+        if self.profile_capture:
+            raise RuntimeError("A profile is already being captured.")
+        self.profile_capture = capture
+
+    def detection_seconds_saved(self):
+        # Estimate: each gated sample would have cost one average detection.
+        if not self.detections:
+            return 0.0
+        return self.frames_gated * self.detection_seconds_total / self.detections
+
+    def _count_frame(self):
+        now = time.monotonic()
+        if self._last_frame_time is not None:
+            interval = now - self._last_frame_time
+            if interval > 0:
+                # Exponential moving average keeps this O(1) per frame.
+                instant_fps = 1.0 / interval
+                self.capture_fps = 0.9 * self.capture_fps + 0.1 * instant_fps if self.capture_fps else instant_fps
+        self._last_frame_time = now
+        self.frames_captured += 1
+
+    def absence_progress(self):
+        started = self.no_face_start_time
+        if started is None or not self.lock_delay_seconds:
+            return 0.0
+        return min(1.0, (time.time() - started) / self.lock_delay_seconds)
 
     def stop(self):
         with self._lock:
             self.is_running = False
 
     def _update_state(self, is_present):
+        # Decide under the lock, call back outside it: the callback may take a
+        # while and must never hold up stop() or the next sample.
+        transition = None
         with self._lock:
             if is_present:
+                if self.tracer: self.tracer.face_seen()
                 self.no_face_start_time = None
                 if not self.last_presence_state:
                     self.last_presence_state = True
-                    self.on_presence_change(True)
-                    if self.logger: self.logger.info("Presence DETECTED.")
+                    transition = True
             else:
                 if self.no_face_start_time is None:
                     self.no_face_start_time = time.time()
@@ -148,7 +281,18 @@ class PresenceMonitor(threading.Thread):
                 elapsed = time.time() - self.no_face_start_time
                 if elapsed >= self.lock_delay_seconds:
                     if self.last_presence_state:
-                        self.last_presence_state = False
-                        self.on_presence_change(False)
-                        if self.logger: self.logger.warning(
-                            f"Absence detected for {self.lock_delay_seconds} seconds. Signaling to lock.")
\ No newline at end of file
+                        self._mark_absent()
+                        transition = False
+
+        if transition is True:
+            self.on_presence_change(True)
+            if self.logger: self.logger.info("Presence DETECTED.")
+        elif transition is False:
+            if self.logger: self.logger.warning(
+                f"Absence detected for {self.lock_delay_seconds} seconds. Signaling to lock.")
+            self.on_presence_change(False)
+
+    def _mark_absent(self):
+        # Caller holds self._lock.
+        self.last_presence_state = False
+        if self.tracer: self.tracer.absence_decided()
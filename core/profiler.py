@@ -0,0 +1,134 @@
+import cProfile
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+
+PROFILE_DIR = "../logs/profiles"
+PROFILE_SUFFIX = ".fprof"
+DEFAULT_SECONDS = 30.0
+MAX_SECONDS = 300.0
+TRACEMALLOC_FRAMES = 10
+FORMAT_VERSION = 1
+
+# Allocations made by the profiling machinery itself are left out of the snapshot.
+_OWN_FILES = (__file__, tracemalloc.__file__, cProfile.__file__, "<frozen importlib._bootstrap>",
+              "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+class ProfileCapture:
+    """A bounded profile of whichever thread calls ``tick()``.
+
+    The presence monitor holds no profiler at all until one is requested, so
+    monitoring costs nothing extra when nobody is profiling. Once handed a
+    capture, the monitor calls ``tick()`` at the top of every loop: the first
+    call enables cProfile on that thread (covering the monitor loop and the
+    detector) and starts tracemalloc, and the first call after ``seconds``
+    stops both. The result is written to a timestamped file in ``directory``
+    on a separate thread so detection is not held up; ``profile_report.py``
+    summarises it.
+
+    cProfile only sees the thread it was enabled on; tracemalloc sees every
+    allocation in the process and keeps those still alive at the end.
+    """
+
+    def __init__(self, seconds=DEFAULT_SECONDS, directory=PROFILE_DIR, label="presence-monitor", on_written=None,
+                 logger=None):
+        self.seconds = min(max(float(seconds), 0.1), MAX_SECONDS)
+        self.label = label
+        self.on_written = on_written
+        self.logger = logger
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, time.strftime(f"profile_%Y%m%d-%H%M%S{PROFILE_SUFFIX}"))
+        self.written = threading.Event()
+        self.error = None
+        self._profile = None
+        self._deadline = None
+        self._owns_tracemalloc = False
+        self._started_at = None
+        self._cpu_mark = None
+
+    def tick(self):
+        """Call once per loop on the profiled thread. Returns False once the capture has finished."""
+        if self._profile is None:
+            self._begin()
+            return True
+        if time.monotonic() < self._deadline:
+            return True
+        self.finish()
+        return False
+
+    def _begin(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._started_at = time.time()
+        self._cpu_mark = time.thread_time()
+        self._deadline = time.monotonic() + self.seconds
+        if self.logger: self.logger.info(f"Profiling the {self.label} thread for {self.seconds:.0f} s.")
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def finish(self):
+        """Stops profiling (on the profiled thread) and writes the file in the background."""
+        if self._profile is None:
+            self._begin()  # stopped before the first tick: write an empty profile rather than nothing
+        self._profile.disable()
+        meta = {
+            'version': FORMAT_VERSION,
+            'label': self.label,
+            'pid': os.getpid(),
+            'started': self._started_at,
+            'seconds': time.time() - self._started_at,
+            'thread_cpu_seconds': time.thread_time() - self._cpu_mark,
+            'traced_peak_bytes': tracemalloc.get_traced_memory()[1],
+        }
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        self._profile.create_stats()
+        threading.Thread(target=self._write, args=(meta, self._profile.stats, snapshot), name="profile-writer",
+                         daemon=True).start()
+
+    def _write(self, meta, stats, snapshot):
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, name) for name in _OWN_FILES])
+        try:
+            with open(self.path + ".tmp", "wb") as f:
+                pickle.dump({'meta': meta, 'stats': stats, 'snapshot': snapshot}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(self.path + ".tmp", self.path)
+            if self.logger: self.logger.info(f"Profile written to {self.path}")
+        except OSError as e:
+            self.error = str(e)
+            if self.logger: self.logger.error(f"Could not write profile {self.path}: {e}")
+        self.written.set()
+        if self.on_written:
+            self.on_written(self)
+
+
+class _LoadedStats:
+    # pstats.Stats accepts anything with create_stats() and a .stats dict.
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def load_profile(path):
+    """Returns (meta, pstats.Stats, tracemalloc.Snapshot). Only open profiles written by FaceLock."""
+    import pstats
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if data.get('meta', {}).get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a FaceLock profile of version {FORMAT_VERSION}.")
+    return data['meta'], pstats.Stats(_LoadedStats(data['stats'])), data['snapshot']
+
+
+def latest_profile(directory=PROFILE_DIR):
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(PROFILE_SUFFIX))
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, names[-1]) if names else None
@@ -1,55 +1,212 @@
-import bcrypt
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
+# bcrypt and cryptography are imported inside the methods that use them so that
+# importing this module (and showing the login window) stays cheap.
+from concurrent.futures import ThreadPoolExecutor
 import base64
+import hashlib
+import hmac
 import json
 import os
+import threading
+import weakref
+
+SALT_FILE = 'config/app.salt'
+KDF_FILE = 'config/kdf.json'
+REKEY_SUFFIX = '.rekey'
+
+_kdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kdf")
+_key_cache = {}
+_key_cache_lock = threading.Lock()
+# Live managers, so clear_key_cache() can make them drop their keys too.
+_instances = weakref.WeakSet()
 
 
 class SecurityManager:
-    def __init__(self, password):
+    BCRYPT_ROUNDS = 12
+    KDF_ALGORITHM = 'pbkdf2-sha256'
+    KDF_ITERATIONS = 480000
+    KDF_LENGTH = 32
+
+    def __init__(self, password, kdf_file=KDF_FILE):
+        # Key derivation runs on a background worker; use wait_ready()/key_future
+        # to block only when the key is actually needed.
         self._password = password.encode('utf-8')
-        self._salt = self._get_or_create_salt()
-        self._key = self._derive_key()
-        self.fernet = Fernet(self._key)
-
-    def _get_or_create_salt(self):
-        salt_path = 'config/app.salt'
-        if os.path.exists(salt_path):
-            with open(salt_path, 'rb') as f:
-                return f.read()
+        self._kdf_file = kdf_file
+        self.kdf_params = self._load_or_create_kdf_params()
+        # Set only while a rekey() is (or was, if interrupted) swapping files over.
+        self._previous_params = self.kdf_params.pop('previous', None)
+        self._salt = base64.b64decode(self.kdf_params['salt'])
+        self._fernet = None
+        self._previous_fernet = None
+        self._key_future = self._derive_key_async()
+        with _key_cache_lock:
+            _instances.add(self)
+
+    @property
+    def key_future(self):
+        # After clear_key_cache() the key is derived again on first use.
+        future = self._key_future
+        if future is None:
+            future = self._key_future = self._derive_key_async()
+        return future
+
+    def _load_or_create_kdf_params(self):
+        if os.path.exists(self._kdf_file):
+            with open(self._kdf_file, 'r') as f:
+                return json.load(f)
+
+        # Migrate the legacy raw salt file, which implied the original parameters.
+        if os.path.exists(SALT_FILE):
+            with open(SALT_FILE, 'rb') as f:
+                salt = f.read()
+            params = self._make_kdf_params(salt, 480000)
         else:
-            salt = os.urandom(16)
-            os.makedirs('config', exist_ok=True)
-            with open(salt_path, 'wb') as f:
-                f.write(salt)
-            return salt
+            params = self._make_kdf_params(os.urandom(16), self.KDF_ITERATIONS)
+        self._save_kdf_params(params)
+        return params
 
-    def _derive_key(self):
+    def _make_kdf_params(self, salt, iterations):
+        return {
+            'algorithm': self.KDF_ALGORITHM,
+            'iterations': iterations,
+            'length': self.KDF_LENGTH,
+            'salt': base64.b64encode(salt).decode('ascii'),
+        }
+
+    def _save_kdf_params(self, params):
+        directory = os.path.dirname(self._kdf_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self._kdf_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(params, f, indent=4)
+        os.replace(tmp_path, self._kdf_file)
+
+    def _cache_key(self, params):
+        # Identifies (password, salt, parameters) without keeping the password itself.
+        material = json.dumps(params, sort_keys=True).encode('utf-8')
+        salt = base64.b64decode(params['salt'])
+        return hmac.new(salt, self._password + b'\0' + material, hashlib.sha256).hexdigest()
+
+    def _derive_key_async(self, params=None):
+        params = params or self.kdf_params
+        cache_key = self._cache_key(params)
+        with _key_cache_lock:
+            cached = _key_cache.get(cache_key)
+            if cached is None:
+                cached = _kdf_executor.submit(self._derive_key, params)
+                _key_cache[cache_key] = cached
+        return cached
+
+    def _derive_key(self, params):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        from cryptography.hazmat.backends import default_backend
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
-            length=32,
-            salt=self._salt,
-            iterations=480000,
+            length=params['length'],
+            salt=base64.b64decode(params['salt']),
+            iterations=params['iterations'],
             backend=default_backend()
         )
-        return base64.urlsafe_b64encode(kdf.derive(self._password))
+        return bytearray(base64.urlsafe_b64encode(kdf.derive(self._password)))
+
+    def is_ready(self):
+        return self.key_future.done()
+
+    def wait_ready(self, timeout=None):
+        return self.key_future.result(timeout=timeout)
+
+    @property
+    def fernet(self):
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+            self._fernet = Fernet(bytes(self.wait_ready()))
+        return self._fernet
+
+    @property
+    def previous_fernet(self):
+        # Key of the parameters an interrupted rekey() was moving away from.
+        if self._previous_fernet is None and self._previous_params:
+            from cryptography.fernet import Fernet
+            self._previous_fernet = Fernet(bytes(self._derive_key_async(self._previous_params).result()))
+        return self._previous_fernet
+
+    def zeroize(self):
+        self._fernet = None
+        self._previous_fernet = None
+        self._password = b''
 
     @staticmethod
-    def hash_password(password):
+    def clear_key_cache():
+        """Overwrites every cached session key with zeros (call on lock and exit).
+
+        Live managers forget their key and Fernet first, so they derive the key
+        again when next used instead of reading a zeroed buffer. Fernet keeps
+        its own immutable copies; dropping our references to them is the best
+        Python allows.
+        """
+        with _key_cache_lock:
+            futures = list(_key_cache.values())
+            _key_cache.clear()
+            for instance in list(_instances):
+                instance._fernet = None
+                instance._previous_fernet = None
+                instance._key_future = None
+        for future in futures:
+            if future.done() and not future.exception():
+                key = future.result()
+                key[:] = bytes(len(key))
+
+    def rekey(self, iterations, file_paths):
+        """Re-encrypts the given settings files under new KDF parameters.
+
+        Safe against a crash at any point: the files are first written next to
+        the originals, then kdf.json is replaced by the new parameters with the
+        old ones kept as "previous", then the files are swapped in, and only
+        then is "previous" dropped. Until that last step decrypt_data() falls
+        back to the previous key, so every file stays readable.
+        """
+        contents = {path: self.load_settings(path) for path in file_paths}
+        old_params = self.kdf_params
+        new_params = self._make_kdf_params(os.urandom(16), iterations)
+        self.kdf_params = new_params
+        self._salt = base64.b64decode(new_params['salt'])
+        self._fernet = None
+        self._key_future = self._derive_key_async()
+
+        staged = [path for path, settings in contents.items() if settings is not None]
+        for path in staged:
+            self.save_settings(contents[path], path + REKEY_SUFFIX)
+        self._previous_params, self._previous_fernet = old_params, None
+        self._save_kdf_params(dict(new_params, previous=old_params))
+        for path in staged:
+            os.replace(path + REKEY_SUFFIX, path)
+        self._save_kdf_params(new_params)
+        self._previous_params, self._previous_fernet = None, None
+
+    @classmethod
+    def hash_password(cls, password):
+        import bcrypt
         password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=cls.BCRYPT_ROUNDS)
         hashed_password = bcrypt.hashpw(password_bytes, salt)
         return hashed_password.decode('utf-8')
 
     @staticmethod
     def verify_password(plain_password, hashed_password):
+        import bcrypt
         plain_bytes = plain_password.encode('utf-8')
         hashed_bytes = hashed_password.encode('utf-8')
         return bcrypt.checkpw(plain_bytes, hashed_bytes)
 
+    @classmethod
+    def needs_rehash(cls, hashed_password):
+        # bcrypt hashes look like $2b$<cost>$<salt+hash>
+        try:
+            return int(hashed_password.split('$')[2]) != cls.BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return False
+
     def encrypt_data(self, data):
         if not isinstance(data, bytes):
             data = str(data).encode('utf-8')
@@ -60,6 +217,10 @@ class SecurityManager:
             encrypted_data = encrypted_data.encode('utf-8')
         try:
             return self.fernet.decrypt(encrypted_data)
+        except Exception:
+            pass
+        try:
+            return self.previous_fernet.decrypt(encrypted_data) if self._previous_params else None
         except Exception:
             return None
 
@@ -79,4 +240,4 @@ class SecurityManager:
         decrypted_data = self.decrypt_data(encrypted_data)
         if decrypted_data:
             return json.loads(decrypted_data.decode('utf-8'))
-        return None
\ No newline at end of file
+        return None
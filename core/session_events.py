@@ -0,0 +1,221 @@
+import ctypes
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from ctypes import wintypes
+
+# wParam values of WM_WTSSESSION_CHANGE
+WTS_SESSION_LOGON = 0x5
+WTS_SESSION_LOGOFF = 0x6
+WTS_SESSION_LOCK = 0x7
+WTS_SESSION_UNLOCK = 0x8
+
+# wParam values of WM_DEVICECHANGE; posted with the device instance ID as argument.
+DBT_DEVICEARRIVAL = 0x8000
+DBT_DEVICEREMOVECOMPLETE = 0x8004
+DBT_DEVTYP_DEVICEINTERFACE = 0x5
+# Only whole USB devices (the scope of a lockdown), not every interface they expose.
+GUID_DEVINTERFACE_USB_DEVICE = "{A5DCBF10-6530-11D2-901F-00C04FB951ED}"
+
+
+class SessionEventDispatcher:
+    """Moves session events off the Win32 message loop onto a worker thread.
+
+    ``post`` never blocks, so the window procedure returns immediately. Runs of
+    the same coalescible event (e.g. several unlocks in a row) are handled once.
+    Arguments given to ``post`` (e.g. the device of a device change) are
+    passed on to the handler.
+    """
+
+    _STOP = object()
+
+    def __init__(self, handlers=None, coalesce=(WTS_SESSION_UNLOCK,), history=256, logger=None):
+        self.handlers = dict(handlers or {})
+        self.coalesce = set(coalesce)
+        self.logger = logger
+        self._queue = queue.Queue()
+        self._thread = None
+        self.latencies = deque(maxlen=history)
+        self.handled_count = 0
+        self.coalesced_count = 0
+        self.failed_count = 0
+
+    def register(self, event_type, handler):
+        self.handlers[event_type] = handler
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._worker, name="session-events", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._queue.put(self._STOP)
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def post(self, event_type, *args):
+        self._queue.put_nowait((event_type, time.monotonic(), args))
+
+    def _drain(self, first):
+        batch = [first]
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _coalesce(self, batch):
+        events = []
+        for item in batch:
+            if item is self._STOP:
+                events.append(item)
+                continue
+            previous = events[-1] if events else None
+            if (previous is not None and previous is not self._STOP and
+                    previous[0] == item[0] and item[0] in self.coalesce):
+                # Keep the oldest timestamp so latency reflects the first unhandled event.
+                self.coalesced_count += 1
+                continue
+            events.append(item)
+        return events
+
+    def _worker(self):
+        while True:
+            for item in self._coalesce(self._drain(self._queue.get())):
+                if item is self._STOP:
+                    return
+                self._handle(*item)
+
+    def _handle(self, event_type, posted_at, args):
+        if isinstance(event_type, threading.Event):
+            event_type.set()
+            return
+        handler = self.handlers.get(event_type)
+        if handler is None:
+            return
+        try:
+            handler(*args)
+        except Exception as e:
+            self.failed_count += 1
+            if self.logger: self.logger.error(f"Session event handler for {event_type:#x} failed: {e}")
+        self.handled_count += 1
+        self.latencies.append(time.monotonic() - posted_at)
+
+    def wait_idle(self, timeout=None):
+        """Blocks until everything posted so far has been handled (used by tests/benchmarks)."""
+        done = threading.Event()
+        self._queue.put((done, time.monotonic(), ()))
+        return done.wait(timeout)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        else:
+            p50 = p99 = 0.0
+        return {
+            'handled': self.handled_count,
+            'coalesced': self.coalesced_count,
+            'failed': self.failed_count,
+            'latency_p50_ms': p50 * 1000,
+            'latency_p99_ms': p99 * 1000,
+            'latency_max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        }
+
+
+class SimulatedSessionSource:
+    """Stands in for the Win32 message loop on Linux: replays a scripted event sequence."""
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    def replay(self, events, interval=0.0):
+        """``events`` holds event types, or (event type, args...) tuples for device changes."""
+        for event in events:
+            self.dispatcher.post(*(event if isinstance(event, tuple) else (event,)))
+            if interval:
+                time.sleep(interval)
+
+
+def device_instance_id(interface_path):
+    """Turns an interface path (\\\\?\\USB#VID_1234&PID_5678#SN#{guid}) into the devcon-style instance ID."""
+    path = interface_path[4:] if interface_path.startswith("\\\\?\\") else interface_path
+    parts = path.split("#")
+    if len(parts) > 1 and parts[-1].startswith("{"):
+        parts = parts[:-1]
+    return "\\".join(parts).upper()
+
+
+class _DevBroadcastDeviceInterface(ctypes.Structure):
+    _fields_ = [('dbcc_size', wintypes.DWORD), ('dbcc_devicetype', wintypes.DWORD),
+                ('dbcc_reserved', wintypes.DWORD), ('dbcc_classguid', ctypes.c_byte * 16),
+                ('dbcc_name', ctypes.c_wchar * 1)]
+
+
+def wait_for_user_login(dispatcher):
+    # The window procedure only enqueues; the dispatcher's worker does the slow part.
+    if sys.platform != 'win32':
+        return
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    WM_WTSSESSION_CHANGE = 0x02B1
+    WM_DEVICECHANGE = 0x0219
+    NOTIFY_FOR_ALL_SESSIONS = 1
+    DEVICE_NOTIFY_WINDOW_HANDLE = 0
+    name_offset = _DevBroadcastDeviceInterface.dbcc_name.offset
+
+    hwnd = None
+    msg = wintypes.MSG()
+
+    def window_proc(hwnd, msg_type, wparam, lparam):
+        if msg_type == WM_WTSSESSION_CHANGE:
+            dispatcher.post(wparam)
+        elif msg_type == WM_DEVICECHANGE and wparam in (DBT_DEVICEARRIVAL, DBT_DEVICEREMOVECOMPLETE) and lparam:
+            # lParam is only valid during this call: copy the device path out now.
+            header = _DevBroadcastDeviceInterface.from_address(lparam)
+            if header.dbcc_devicetype == DBT_DEVTYP_DEVICEINTERFACE:
+                dispatcher.post(wparam, device_instance_id(ctypes.wstring_at(lparam + name_offset)))
+        return user32.DefWindowProcW(hwnd, msg_type, wparam, lparam)
+
+    wndproc = ctypes.WINFUNCTYPE(
+        wintypes.LRESULT,
+        wintypes.HWND,
+        wintypes.UINT,
+        wintypes.WPARAM,
+        wintypes.LPARAM
+    )(window_proc)
+
+    wc = wintypes.WNDCLASSW()
+    wc.lpfnWndProc = wndproc
+    wc.lpszClassName = "UserLoginMonitor"
+    wc.hInstance = user32.GetModuleHandleW(None)
+
+    class_atom = user32.RegisterClassW(ctypes.byref(wc))
+    if not class_atom:
+        return
+
+    hwnd = user32.CreateWindowExW(0, class_atom, "UserLoginMonitor", 0, 0, 0, 0, 0, None, None, wc.hInstance, None)
+    if not hwnd:
+        return
+
+    if not user32.WTSRegisterSessionNotification(hwnd, NOTIFY_FOR_ALL_SESSIONS):
+        user32.DestroyWindow(hwnd)
+        return
+
+    # USB arrivals and removals arrive as WM_DEVICECHANGE on the same window.
+    device_filter = _DevBroadcastDeviceInterface(dbcc_size=ctypes.sizeof(_DevBroadcastDeviceInterface),
+                                                 dbcc_devicetype=DBT_DEVTYP_DEVICEINTERFACE)
+    ctypes.oledll.ole32.CLSIDFromString(GUID_DEVINTERFACE_USB_DEVICE, ctypes.byref(device_filter.dbcc_classguid))
+    user32.RegisterDeviceNotificationW.restype = ctypes.c_void_p
+    user32.RegisterDeviceNotificationW.argtypes = (wintypes.HWND, ctypes.c_void_p, wintypes.DWORD)
+    user32.RegisterDeviceNotificationW(hwnd, ctypes.byref(device_filter), DEVICE_NOTIFY_WINDOW_HANDLE)
+
+    while True:
+        result = user32.GetMessageW(ctypes.byref(msg), None, 0, 0)
+        if result <= 0:
+            break
+        user32.TranslateMessage(ctypes.byref(msg))
+        user32.DispatchMessageW(ctypes.byref(msg))
@@ -0,0 +1,147 @@
+import cv2
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b'FLREC001'
+# magic, width, height, slot count, next sequence number
+HEADER = struct.Struct('<8sIIIQ')
+HEADER_SIZE = 64
+# sequence (0 = empty slot), wall-clock time, monotonic time, verdict
+SLOT_META = struct.Struct('<Qddb7x')
+
+VERDICT_ABSENT = 0
+VERDICT_PRESENT = 1
+VERDICT_GRACE = 2
+
+
+class SessionRecorder:
+    """Fixed-size ring of downscaled grayscale frames in a memory-mapped file.
+
+    The file is sized once up front, so disk use is bounded by ``slots``. Each
+    write resizes and converts the camera frame straight into the mapped slot
+    with preallocated OpenCV ``dst`` buffers, then stamps the slot metadata; no
+    per-frame arrays are allocated. The sequence number is written last, so a
+    crash mid-write leaves at worst one stale slot.
+    """
+
+    def __init__(self, path, width=160, height=120, slots=1800):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self._frame_size = width * height
+        self._meta_offset = HEADER_SIZE
+        self._frames_offset = HEADER_SIZE + SLOT_META.size * slots
+        size = self._frames_offset + self._frame_size * slots
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        existing = self._read_header()
+        if existing is None:
+            self._file.truncate(size)
+        self._file.flush()
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self._frames = np.ndarray((slots, height, width), dtype=np.uint8, buffer=self._mmap,
+                                  offset=self._frames_offset)
+        self._slot_views = [self._frames[i] for i in range(slots)]
+        self._small_bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self._sequence = existing or 1
+        HEADER.pack_into(self._mmap, 0, MAGIC, width, height, slots, self._sequence)
+
+    def _read_header(self):
+        # Reuse an existing ring with identical geometry so history survives restarts.
+        self._file.seek(0)
+        raw = self._file.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            return None
+        magic, width, height, slots, sequence = HEADER.unpack(raw)
+        if magic != MAGIC or (width, height, slots) != (self.width, self.height, self.slots):
+            self._file.truncate(0)
+            return None
+        return sequence
+
+    def write(self, frame_bgr, verdict):
+        index = self._sequence % self.slots
+        if frame_bgr.ndim == 2:
+            cv2.resize(frame_bgr, (self.width, self.height), dst=self._slot_views[index],
+                       interpolation=cv2.INTER_AREA)
+        else:
+            cv2.resize(frame_bgr, (self.width, self.height), dst=self._small_bgr, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._small_bgr, cv2.COLOR_BGR2GRAY, dst=self._slot_views[index])
+        self._commit(index, verdict)
+
+    def write_gray(self, gray_small, verdict):
+        """Stores an already downscaled grayscale frame (height x width)."""
+        index = self._sequence % self.slots
+        self._slot_views[index][...] = gray_small
+        self._commit(index, verdict)
+
+    def _commit(self, index, verdict):
+        SLOT_META.pack_into(self._mmap, self._meta_offset + index * SLOT_META.size,
+                            self._sequence, time.time(), time.monotonic(), verdict)
+        self._sequence += 1
+        HEADER.pack_into(self._mmap, 0, MAGIC, self.width, self.height, self.slots, self._sequence)
+
+    def close(self):
+        if self._mmap:
+            # Views into the mapping must go before it can be closed.
+            self._frames = self._slot_views = None
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+            self._file.close()
+
+
+class SessionRecording:
+    """Read-only view of a recorder ring file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.height, self.slots, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a FaceLock recording.")
+        self._frames = np.ndarray((self.slots, self.height, self.width), dtype=np.uint8, buffer=self._mmap,
+                                  offset=HEADER_SIZE + SLOT_META.size * self.slots)
+
+    def entries(self):
+        """Returns (sequence, wall_time, monotonic_time, verdict, slot) for every filled slot, oldest first."""
+        entries = []
+        for slot in range(self.slots):
+            sequence, wall, mono, verdict = SLOT_META.unpack_from(self._mmap, HEADER_SIZE + slot * SLOT_META.size)
+            if sequence:
+                entries.append((sequence, wall, mono, verdict, slot))
+        entries.sort()
+        return entries
+
+    def window(self, start=None, end=None):
+        """Copies out frames whose wall-clock time is within [start, end]."""
+        selected = [e for e in self.entries()
+                    if (start is None or e[1] >= start) and (end is None or e[1] <= end)]
+        frames = np.stack([self._frames[e[4]] for e in selected]) if selected else \
+            np.empty((0, self.height, self.width), dtype=np.uint8)
+        timestamps = np.array([e[1] for e in selected], dtype=np.float64)
+        verdicts = np.array([e[3] for e in selected], dtype=np.int8)
+        return frames, timestamps, verdicts
+
+    def export_clip(self, out_path, start=None, end=None):
+        frames, timestamps, verdicts = self.window(start, end)
+        np.savez_compressed(out_path, frames=frames, timestamps=timestamps, verdicts=verdicts)
+        return len(frames)
+
+    def close(self):
+        self._frames = None
+        self._mmap.close()
+
+
+def load_clip(path):
+    """Loads an exported clip as (frames, timestamps, verdicts) for replay through a detector."""
+    with np.load(path) as clip:
+        return clip['frames'], clip['timestamps'], clip['verdicts']
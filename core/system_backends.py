@@ -0,0 +1,194 @@
+import asyncio
+import ctypes
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+USBSTOR_KEY = r"SYSTEM\CurrentControlSet\Services\USBSTOR"
+
+
+class SystemBackend:
+    """Everything SystemController needs from the OS: devcon, the registry and the session."""
+
+    def find_devcon(self):
+        raise NotImplementedError
+
+    def run(self, command_list):
+        """Runs a command and returns a CompletedProcess; raises CalledProcessError on failure."""
+        raise NotImplementedError
+
+    async def run_async(self, command_list):
+        """Coroutine version of run(). Cancelling it must stop the command."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.run, command_list)
+
+    def set_registry_dword(self, key_path, name, value):
+        raise NotImplementedError
+
+    def lock_workstation(self):
+        raise NotImplementedError
+
+    def is_admin(self):
+        raise NotImplementedError
+
+
+class WindowsBackend(SystemBackend):
+    def find_devcon(self):
+        if getattr(sys, 'frozen', False):
+            application_path = os.path.dirname(sys.executable)
+        else:
+            application_path = os.path.dirname(os.path.abspath(sys.argv[0]))
+
+        path_to_check = os.path.join(application_path, 'devcon.exe')
+        if os.path.exists(path_to_check):
+            return os.path.normpath(path_to_check)
+        return None
+
+    def run(self, command_list):
+        return subprocess.run(command_list, capture_output=True, text=True, check=True,
+                              creationflags=subprocess.CREATE_NO_WINDOW)
+
+    async def run_async(self, command_list):
+        process = await asyncio.create_subprocess_exec(*command_list, stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.PIPE,
+                                                       creationflags=subprocess.CREATE_NO_WINDOW)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        stdout, stderr = stdout.decode(errors='replace'), stderr.decode(errors='replace')
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command_list, output=stdout, stderr=stderr)
+        return subprocess.CompletedProcess(command_list, process.returncode, stdout=stdout, stderr=stderr)
+
+    def set_registry_dword(self, key_path, name, value):
+        import winreg
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path, 0, winreg.KEY_SET_VALUE)
+        try:
+            winreg.SetValueEx(key, name, 0, winreg.REG_DWORD, value)
+        finally:
+            winreg.CloseKey(key)
+
+    def lock_workstation(self):
+        ctypes.windll.user32.LockWorkStation()
+
+    def is_admin(self):
+        try:
+            return ctypes.windll.shell32.IsUserAnAdmin()
+        except:
+            return False
+
+
+class SimulatedBackend(SystemBackend):
+    """In-memory stand-in for devcon and the registry, for Linux benchmarks.
+
+    Models a machine with ``device_count`` USB devices. Every devcon call sleeps
+    ``call_latency`` seconds (wildcard commands pay it once per matched device)
+    and fails with probability ``failure_rate``.
+    """
+
+    DEVCON_PATH = "devcon.exe"
+    PROTECTED_NAMES = ["USB Root Hub", "HID Keyboard Device", "USB Input Device", "Integrated Webcam"]
+    LOCKABLE_NAMES = ["USB Mass Storage Device", "Generic USB Flash Disk", "USB Serial Device", "Android ADB Interface"]
+
+    def __init__(self, device_count=20, call_latency=0.05, failure_rate=0.0, protected_ratio=0.25, seed=None):
+        self.call_latency = call_latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.devices = {}
+        for i in range(device_count):
+            if self._random.random() < protected_ratio:
+                name = self.PROTECTED_NAMES[i % len(self.PROTECTED_NAMES)]
+            else:
+                name = self.LOCKABLE_NAMES[i % len(self.LOCKABLE_NAMES)]
+            device_id = f"USB\\VID_{0x1000 + i:04X}&PID_{i:04X}\\SIM{i:06d}"
+            self.devices[device_id] = {'name': name, 'enabled': True}
+        self.registry = {(USBSTOR_KEY, "Start"): 3}
+        self.call_count = 0
+        self.failure_count = 0
+        self.admin = True
+        self.locked = False
+
+    def _bill(self):
+        with self._lock:
+            self.call_count += 1
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failure_count += 1
+        return failed
+
+    @staticmethod
+    def _failure(command_list):
+        return subprocess.CalledProcessError(1, command_list, output="", stderr="Simulated devcon failure.")
+
+    def find_devcon(self):
+        return self.DEVCON_PATH
+
+    def _plan(self, command_list):
+        # Returns (latency units, function producing the result once the call "completes").
+        action, pattern = command_list[1], command_list[2]
+        if action == "find":
+            def find():
+                lines = [f"{device_id} : {d['name']}" for device_id, d in self.devices.items()]
+                lines.append(f"{len(self.devices)} matching device(s) found.")
+                return subprocess.CompletedProcess(command_list, 0, stdout="\n".join(lines) + "\n", stderr="")
+            return 1, find
+
+        if action not in ("enable", "disable"):
+            raise FileNotFoundError(command_list[0])
+
+        targets = [pattern[1:]] if pattern.startswith("@") else list(self.devices)
+        targets = [t for t in targets if t in self.devices]
+
+        def change_state():
+            if not targets:
+                return subprocess.CompletedProcess(command_list, 0, stdout="No matching devices found.\n", stderr="")
+            state = "Enabled" if action == "enable" else "Disabled"
+            with self._lock:
+                for device_id in targets:
+                    self.devices[device_id]['enabled'] = action == "enable"
+            stdout = "".join(f"{t}: {state}\n" for t in targets) + f"{len(targets)} device(s) {state.lower()}.\n"
+            return subprocess.CompletedProcess(command_list, 0, stdout=stdout, stderr="")
+        return max(1, len(targets)), change_state
+
+    def run(self, command_list):
+        units, finish = self._plan(command_list)
+        failed = self._bill()
+        if self.call_latency:
+            time.sleep(self.call_latency * units)
+        if failed:
+            raise self._failure(command_list)
+        return finish()
+
+    async def run_async(self, command_list):
+        # A cancelled call leaves the device untouched, like a killed devcon.
+        units, finish = self._plan(command_list)
+        failed = self._bill()
+        if self.call_latency:
+            await asyncio.sleep(self.call_latency * units)
+        if failed:
+            raise self._failure(command_list)
+        return finish()
+
+    def set_registry_dword(self, key_path, name, value):
+        if self._random.random() < self.failure_rate:
+            raise PermissionError("Simulated registry access denied.")
+        self.registry[(key_path, name)] = value
+
+    def lock_workstation(self):
+        self.locked = True
+
+    def is_admin(self):
+        return self.admin
+
+    def disabled_devices(self):
+        return [device_id for device_id, d in self.devices.items() if not d['enabled']]
+
+
+def default_backend():
+    return WindowsBackend()
@@ -1,38 +1,43 @@
-import ctypes
-import os
-import sys
+import asyncio
 import subprocess
-import winreg
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.lockdown_journal import LockdownJournal
+from core.system_backends import USBSTOR_KEY, default_backend
 
 
 class SystemController:
-    def __init__(self, logger=None):
+    RESTORE_WORKERS = 8
+
+    def __init__(self, logger=None, journal=None, backend=None):
         self.logger = logger
+        self.backend = backend or default_backend()
         self.devcon_path = self._find_devcon()
+        self.journal = journal or LockdownJournal(logger=logger)
+        self.restore_workers = self.RESTORE_WORKERS
+        self.devcon_failures = 0
+        self.workstation_locks = 0
+        self.lockdowns = 0
+        self.lockdown_seconds_total = 0.0
+        self.last_lockdown_seconds = 0.0
+        self._lockdown_started = None
+        # Optional callback(device_id, enabled, ok) after every device state change attempt.
+        self.on_device_change = None
 
     def is_admin(self):
-        try:
-            return ctypes.windll.shell32.IsUserAnAdmin()
-        except:
-            return False
+        return self.backend.is_admin()
 
     def _find_devcon(self):
-        if getattr(sys, 'frozen', False):
-            application_path = os.path.dirname(sys.executable)
-        else:
-            application_path = os.path.dirname(os.path.abspath(sys.argv[0]))
-
-        path_to_check = os.path.join(application_path, 'devcon.exe')
-
-        if os.path.exists(path_to_check):
-            return os.path.normpath(path_to_check)
-        if self.logger:
+        path = self.backend.find_devcon()
+        if not path and self.logger:
             self.logger.error("devcon.exe not found in the application's root directory.")
-        return None
+        return path
 
     def lock_workstation(self):
         try:
-            ctypes.windll.user32.LockWorkStation()
+            self.backend.lock_workstation()
+            self.workstation_locks += 1
             return True
         except Exception as e:
             if self.logger: self.logger.error(f"Failed to lock workstation: {e}")
@@ -41,20 +46,41 @@ class SystemController:
     def _run_command(self, command_list):
         if self.logger: self.logger.info(f"Executing command: {' '.join(command_list)}")
         try:
-            result = subprocess.run(command_list, capture_output=True, text=True, check=True,
-                                    creationflags=subprocess.CREATE_NO_WINDOW)
-            if result.stdout: self.logger.info(f"Command STDOUT: {result.stdout.strip()}")
-            if result.stderr: self.logger.warning(f"Command STDERR: {result.stderr.strip()}")
-            return result
+            return self._log_result(self.backend.run(command_list))
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            if self.logger:
-                error_output = e.stderr if hasattr(e, 'stderr') else str(e)
-                self.logger.error(f"Command failed: {' '.join(command_list)}. Error: {error_output}")
+            self._log_failure(command_list, e)
+            return None
+
+    async def _run_command_async(self, command_list):
+        if self.logger: self.logger.info(f"Executing command: {' '.join(command_list)}")
+        try:
+            return self._log_result(await self.backend.run_async(command_list))
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            self._log_failure(command_list, e)
             return None
 
+    def _log_result(self, result):
+        if self.logger:
+            if result.stdout: self.logger.info(f"Command STDOUT: {result.stdout.strip()}")
+            if result.stderr: self.logger.warning(f"Command STDERR: {result.stderr.strip()}")
+        return result
+
+    def _log_failure(self, command_list, error):
+        self.devcon_failures += 1
+        if self.logger:
+            error_output = error.stderr if hasattr(error, 'stderr') else str(error)
+            self.logger.error(f"Command failed: {' '.join(command_list)}. Error: {error_output}")
+
     def get_usb_devices(self):
         if not self.devcon_path: return []
-        result = self._run_command([self.devcon_path, "find", "*USB*"])
+        return self._parse_devices(self._run_command([self.devcon_path, "find", "*USB*"]))
+
+    async def get_usb_devices_async(self):
+        if not self.devcon_path: return []
+        return self._parse_devices(await self._run_command_async([self.devcon_path, "find", "*USB*"]))
+
+    @staticmethod
+    def _parse_devices(result):
         if not result: return []
         devices = []
         for line in result.stdout.splitlines():
@@ -65,25 +91,34 @@ class SystemController:
                 devices.append({'id': device_id, 'name': name})
         return devices
 
+    def _device_command(self, device_id, enable):
+        action = "enable" if enable else "disable"
+        return [self.devcon_path, action, f"@{device_id}"]
+
     def set_device_state_by_id(self, device_id, enable=True):
         if not self.devcon_path: return False
-        action = "enable" if enable else "disable"
-        command = [self.devcon_path, action, f"@{device_id}"]
-        result = self._run_command(command)
+        return self._state_changed(device_id, enable, self._run_command(self._device_command(device_id, enable)))
+
+    async def set_device_state_by_id_async(self, device_id, enable=True):
+        if not self.devcon_path: return False
+        result = await self._run_command_async(self._device_command(device_id, enable))
+        return self._state_changed(device_id, enable, result)
+
+    def _state_changed(self, device_id, enable, result):
+        changed = False
         if result and result.stdout:
             if "disabled" in result.stdout.lower() or "enabled" in result.stdout.lower():
                 if "No matching devices" not in result.stdout:
-                    return True
-        if self.logger: self.logger.error(f"Failed to change state for device {device_id}.")
-        return False
+                    changed = True
+        if not changed and self.logger: self.logger.error(f"Failed to change state for device {device_id}.")
+        if self.on_device_change:
+            self.on_device_change(device_id, enable, changed)
+        return changed
 
     def set_usb_storage_state(self, enable=True):
-        key_path = r"SYSTEM\CurrentControlSet\Services\USBSTOR"
         value = 3 if enable else 4
         try:
-            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path, 0, winreg.KEY_SET_VALUE)
-            winreg.SetValueEx(key, "Start", 0, winreg.REG_DWORD, value)
-            winreg.CloseKey(key)
+            self.backend.set_registry_dword(USBSTOR_KEY, "Start", value)
             if self.logger:
                 status = "Enabled" if enable else "Disabled"
                 self.logger.info(f"USBSTOR service has been {status}.")
@@ -92,9 +127,93 @@ class SystemController:
             if self.logger: self.logger.error(f"Failed to change USBSTOR state: {e}")
             return False
 
-    # --- NEW RESET FUNCTION ---
+    # --- Journaled lockdown: every change is recorded before it is applied ---
+    def begin_lockdown(self):
+        self._lockdown_started = time.perf_counter()
+        self.journal.begin()
+
+    def end_lockdown(self):
+        self.journal.end()
+        if self._lockdown_started is not None:
+            self.last_lockdown_seconds = time.perf_counter() - self._lockdown_started
+            self.lockdown_seconds_total += self.last_lockdown_seconds
+            self.lockdowns += 1
+            self._lockdown_started = None
+
+    def disable_device(self, device_id):
+        self.journal.record_device(device_id)
+        return self.set_device_state_by_id(device_id, enable=False)
+
+    async def disable_device_async(self, device_id):
+        self.journal.record_device(device_id)
+        return await self.set_device_state_by_id_async(device_id, enable=False)
+
+    def disable_usb_storage(self):
+        self.journal.record_usb_storage()
+        return self.set_usb_storage_state(enable=False)
+
+    def _restore_entry(self, entry):
+        kind, target = entry
+        if kind == LockdownJournal.USB_STORAGE:
+            restored = self.set_usb_storage_state(enable=True)
+        else:
+            restored = self.set_device_state_by_id(target, enable=True)
+        if restored:
+            self.journal.mark_restored(kind, target)
+        return restored
+
     def reset_all_usb_ports(self):
-        self.logger.info("--- Starting Full USB Port Reset ---")
+        """Undoes only what the lockdown journal says we changed, in parallel."""
+        pending = self.journal.pending()
+        if not pending:
+            if self.logger: self.logger.info("Lockdown journal is empty. Nothing to restore.")
+            return True
+
+        if self.logger: self.logger.info(f"--- Restoring {len(pending)} journaled lockdown change(s) ---")
+        start = time.perf_counter()
+        workers = min(self.restore_workers, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="usb-restore") as pool:
+            results = list(pool.map(self._restore_entry, pending))
+        return self._finish_restore(results, start)
+
+    def _finish_restore(self, results, start):
+        failed = results.count(False)
+        self.journal.compact()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if self.logger:
+            if failed:
+                self.logger.error(f"--- Restore finished in {elapsed_ms:.0f} ms with {failed} failure(s); "
+                                  f"they remain in the journal ---")
+            else:
+                self.logger.info(f"--- Restore complete in {elapsed_ms:.0f} ms ---")
+        return failed == 0
+
+    async def _restore_entry_async(self, entry, semaphore):
+        kind, target = entry
+        async with semaphore:
+            if kind == LockdownJournal.USB_STORAGE:
+                restored = self.set_usb_storage_state(enable=True)
+            else:
+                restored = await self.set_device_state_by_id_async(target, enable=True)
+        if restored:
+            self.journal.mark_restored(kind, target)
+        return restored
+
+    async def reset_all_usb_ports_async(self):
+        """Coroutine version of reset_all_usb_ports(), for the asyncio orchestrator."""
+        pending = self.journal.pending()
+        if not pending:
+            if self.logger: self.logger.info("Lockdown journal is empty. Nothing to restore.")
+            return True
+
+        if self.logger: self.logger.info(f"--- Restoring {len(pending)} journaled lockdown change(s) ---")
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.restore_workers)
+        results = await asyncio.gather(*(self._restore_entry_async(entry, semaphore) for entry in pending))
+        return self._finish_restore(results, start)
+
+    def full_usb_reset(self):
+        if self.logger: self.logger.info("--- Starting Full USB Port Reset ---")
 
         # Step 1: Reset the USB Storage Service
         self.set_usb_storage_state(enable=True)
@@ -104,4 +223,4 @@ class SystemController:
             command = [self.devcon_path, "enable", "*USB*"]
             self._run_command(command)
 
-        self.logger.info("--- Full USB Port Reset Complete ---")
\ No newline at end of file
+        if self.logger: self.logger.info("--- Full USB Port Reset Complete ---")
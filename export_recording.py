@@ -0,0 +1,58 @@
+# export_recording.py
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from core.session_recorder import SessionRecording, VERDICT_ABSENT, VERDICT_PRESENT, VERDICT_GRACE
+
+VERDICT_NAMES = {VERDICT_ABSENT: "absent", VERDICT_PRESENT: "present", VERDICT_GRACE: "grace"}
+
+
+def parse_time(value):
+    # Accepts an ISO timestamp ("2025-01-31T14:05:00") or epoch seconds.
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export a FaceLock session recording.")
+    parser.add_argument("recording", help="Path to the ring file (recorder_path in app_settings.json).")
+    parser.add_argument("--out", help="Write the selected window to this .npz clip.")
+    parser.add_argument("--start", type=parse_time, help="Window start (ISO time or epoch seconds).")
+    parser.add_argument("--end", type=parse_time, help="Window end (ISO time or epoch seconds).")
+    parser.add_argument("--last", type=float, help="Only the last N seconds before the newest frame.")
+    args = parser.parse_args()
+
+    recording = SessionRecording(args.recording)
+    entries = recording.entries()
+    if not entries:
+        print("Recording is empty.")
+        return
+
+    start, end = args.start, args.end
+    if args.last:
+        end = entries[-1][1]
+        start = end - args.last
+
+    first, last = entries[0][1], entries[-1][1]
+    print(f"{len(entries)} frames from {time.ctime(first)} to {time.ctime(last)} "
+          f"({recording.width}x{recording.height}, {recording.slots} slots)")
+
+    frames, timestamps, verdicts = recording.window(start, end)
+    counts = {name: int((verdicts == code).sum()) for code, name in VERDICT_NAMES.items()}
+    print(f"Selected {len(frames)} frames: " + ", ".join(f"{n}={c}" for n, c in counts.items()))
+
+    if args.out:
+        if not len(frames):
+            print("Nothing to export.")
+            sys.exit(1)
+        recording.export_clip(args.out, start, end)
+        print(f"Clip written to {args.out}")
+    recording.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# fleet_collector.py
+import argparse
+import time
+
+from core.event_collector import EventCollector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the fleet event collector.")
+    parser.add_argument("--port", type=int, default=8470)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--token", help="Require this bearer token (shipper_token in app_settings.json).")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Answer 503 to this share of batches.")
+    parser.add_argument("--print-events", action="store_true", help="Print every received event.")
+    args = parser.parse_args()
+
+    collector = EventCollector(port=args.port, host=args.host, token=args.token, failure_rate=args.failure_rate,
+                               keep_events=args.print_events).start()
+    print(f"Collecting on {collector.url} (set \"shipper_url\" to this). Ctrl+C to stop.")
+    shown = 0
+    try:
+        while True:
+            time.sleep(2)
+            if args.print_events:
+                for event in collector.events[shown:]:
+                    print(event)
+                shown = len(collector.events)
+            print(f"{collector.total_events()} events in {collector.batches} batches from "
+                  f"{len(collector.events_by_agent)} agent(s), {collector.bytes_received} bytes, "
+                  f"{collector.duplicate_batches} duplicate batch(es)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+
+
+if __name__ == "__main__":
+    main()
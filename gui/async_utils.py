@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ui-worker")
+
+
+def poll_future(widget, future, callback, interval_ms=20):
+    # Tk is not thread-safe, so the result is picked up from the Tk thread via after().
+    def check():
+        if not widget.winfo_exists():
+            return
+        if future.done():
+            callback(future)
+        else:
+            widget.after(interval_ms, check)
+
+    widget.after(interval_ms, check)
+
+
+def run_in_background(widget, func, callback, *args):
+    future = _executor.submit(func, *args)
+    poll_future(widget, future, callback)
+    return future
@@ -1,14 +1,19 @@
 import tkinter as tk
 from tkinter import messagebox
 from .config import Config
-from core.security_manager import SecurityManager
+from .async_utils import poll_future
+from core.password_verifier import PasswordVerifier
 
 class LoginWindow(tk.Toplevel):
-    def __init__(self, master, on_login_success, current_hash):
+    def __init__(self, master, on_login_success, current_hash=None, on_password_rehash=None, verifier=None):
         super().__init__(master)
         self.on_login_success = on_login_success
+        self.on_password_rehash = on_password_rehash
         self.current_hash = current_hash
-        self.security_manager = SecurityManager
+        # A verifier passed in is shared (its failure count carries over) and stays running.
+        self._owns_verifier = verifier is None
+        self.verifier = verifier or PasswordVerifier(get_hash=lambda: self.current_hash)
+        self._pending = None
 
         self.setup_window()
         self.create_ui()
@@ -37,17 +42,44 @@ class LoginWindow(tk.Toplevel):
         self.password_entry.pack(fill='x', ipady=8, pady=5)
         self.password_entry.bind('<Return>', self.check_password)
 
-        tk.Button(frame, text="LOGIN", command=self.check_password, font=Config.FONT_BOLD, bg=Config.PRIMARY_COLOR,
-                  fg=Config.WHITE_COLOR, relief='flat').pack(fill='x', pady=(15, 0), ipady=10)
+        self.login_button = tk.Button(frame, text="LOGIN", command=self.check_password, font=Config.FONT_BOLD,
+                                      bg=Config.PRIMARY_COLOR, fg=Config.WHITE_COLOR, relief='flat')
+        self.login_button.pack(fill='x', pady=(15, 0), ipady=10)
+
+        self.status_label = tk.Label(frame, text="", font=Config.FONT_NORMAL, fg=Config.ERROR_COLOR,
+                                     bg=Config.DARK_GRAY_BG)
+        self.status_label.pack(pady=(5, 0))
 
         self.password_entry.focus()
 
     def check_password(self, event=None):
-        entered_password = self.password_entry.get()
-        if self.security_manager.verify_password(entered_password, self.current_hash):
+        # bcrypt runs on the verifier's worker; repeated Return presses while a
+        # check is in flight get the same future back and are ignored here.
+        wait = self.verifier.retry_after()
+        if wait > 0:
+            self.status_label.config(text=f"Too many attempts. Try again in {wait:.0f} s.")
+            return
+        future = self.verifier.submit(self.password_entry.get())
+        if future is None or future is self._pending:
+            return
+        self._pending = future
+        self.login_button.config(state='disabled')
+        self.status_label.config(text="Verifying...", fg=Config.WHITE_COLOR)
+        poll_future(self, future, self._on_verified)
+
+    def _on_verified(self, future):
+        self._pending = None
+        self.login_button.config(state='normal')
+        ok, new_hash = future.result()
+        if ok:
+            if new_hash and self.on_password_rehash:
+                self.on_password_rehash(new_hash)
+            if self._owns_verifier:
+                self.verifier.shutdown()
             self.destroy()
             self.on_login_success()
         else:
+            self.status_label.config(text="", fg=Config.ERROR_COLOR)
             messagebox.showerror("Login Failed", "Incorrect password!", parent=self)
             self.password_entry.delete(0, tk.END)
 
@@ -1,34 +1,49 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-import os
 from .config import Config
 from .notification_manager import NotificationManager
 from .tray_icon import TrayIcon
+from .async_utils import poll_future, run_in_background
 from core.security_manager import SecurityManager
 from core.startup_manager import StartupManager
 
 
 class MainWindow(tk.Toplevel):
-    def __init__(self, on_exit, on_password_change, get_current_hash_func, system_controller, settings):
+    def __init__(self, on_exit, on_password_change, password_verifier, system_controller, config_store,
+                 ui_bus):
         super().__init__()
         self.on_exit = on_exit
         self.on_password_change = on_password_change
-        self.get_current_hash = get_current_hash_func
+        # Shared with the login window, so failed attempts here count toward the same lockout.
+        self.password_verifier = password_verifier
+        self._password_check = None
         self.system_controller = system_controller
         self.security_manager = SecurityManager
         self.startup_manager = StartupManager()
-        self.settings = settings
+        self.config_store = config_store
+        self.settings = config_store.get('app_settings')
 
         self.whitelisted_devices = self._load_whitelist()
 
+        self.ui_bus = ui_bus
         self.withdraw()
-        self.notification_manager = NotificationManager()
+        self.notification_manager = NotificationManager(ui_bus=ui_bus)
         self.tray_icon = TrayIcon(self)
 
         self.is_monitoring = False
         self.start_monitoring_callback = None
         self.stop_monitoring_callback = None
+        self.capture_profile_callback = None
+        self.settings_saved_callback = None
+
+        # Hardware tab state: device ID -> Treeview item, and back.
+        self._device_rows = {}
+        self._device_names = {}
+        self._row_devices = {}
+        self._hidden_rows = set()
+        self._enumeration = None
+        self._applying_diff = False
+        self._filter_job = None
 
         self.setup_window()
         self.create_ui()
@@ -119,18 +134,22 @@ class MainWindow(tk.Toplevel):
         startup_check.pack(pady=5, anchor='w')
 
     def save_settings(self):
-        self.settings['lockdown_level'] = self.lockdown_level.get()
-        self.settings['detection_engine'] = self.detection_engine.get()
-        try:
-            with open("config/app_settings.json", "w") as f:
-                json.dump(self.settings, f, indent=4)
-            self.notification_manager.show_success("Settings Saved", "Your settings have been updated.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not save settings: {e}", parent=self)
+        # The store updates its cache now and writes the file once clicks settle.
+        self.config_store.update('app_settings', lockdown_level=self.lockdown_level.get(),
+                                 detection_engine=self.detection_engine.get())
+        if self.settings_saved_callback:
+            self.settings_saved_callback()
+        self.notification_manager.show_success("Settings Saved", "Your settings have been updated.")
 
     def create_hardware_tab(self, parent_frame):
         usb_frame = ttk.LabelFrame(parent_frame, text="USB Device Whitelist (for Standard Lock)", padding=(20, 10))
         usb_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        filter_frame = ttk.Frame(usb_frame)
+        filter_frame.pack(fill='x', pady=(0, 10))
+        ttk.Label(filter_frame, text="Filter:").pack(side='left')
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', self._schedule_filter)
+        ttk.Entry(filter_frame, textvariable=self.filter_var).pack(side='left', fill='x', expand=True, padx=(5, 0))
         cols = ('Status', 'Name', 'ID')
         self.usb_tree = ttk.Treeview(usb_frame, columns=cols, show='headings')
         self.usb_tree.heading('Status', text='Status')
@@ -145,57 +164,137 @@ class MainWindow(tk.Toplevel):
         button_frame = ttk.Frame(usb_frame)
         button_frame.pack(fill='x', pady=10)
         ttk.Button(button_frame, text="Refresh List", command=self.populate_usb_devices).pack(side='left')
+        self.device_status_label = ttk.Label(button_frame, text="")
+        self.device_status_label.pack(side='left', padx=10)
         ttk.Button(button_frame, text="Save Whitelist", command=self._save_whitelist).pack(side='right')
 
     def populate_usb_devices(self):
-        for i in self.usb_tree.get_children():
-            self.usb_tree.delete(i)
-        devices = self.system_controller.get_usb_devices()
+        # devcon runs on a worker; a refresh while one is in flight is dropped.
+        if self._applying_diff or (self._enumeration and not self._enumeration.done()):
+            return
+        self.device_status_label.config(text="Scanning devices...")
+        self._enumeration = run_in_background(self, self.system_controller.get_usb_devices, self._on_devices_enumerated)
+
+    def _on_devices_enumerated(self, future):
+        try:
+            devices = future.result()
+        except Exception as e:
+            self.device_status_label.config(text=f"Scan failed: {e}")
+            return
+        upserts = {}
         for dev in devices:
             dev_id = dev.get('id', '')
-            status = 'Whitelisted' if dev_id in self.whitelisted_devices else 'Blocked'
-            tag = 'whitelisted' if dev_id in self.whitelisted_devices else 'blocked'
-            self.usb_tree.insert('', 'end', values=(status, dev.get('name', ''), dev_id), tags=(tag,))
+            if dev_id:
+                upserts[dev_id] = dev.get('name', '')
+        removed = [dev_id for dev_id in self._device_rows if dev_id not in upserts]
+        self._applying_diff = True
+        self._apply_device_diff(list(upserts.items()), removed)
+
+    def _row_values(self, dev_id):
+        whitelisted = dev_id in self.whitelisted_devices
+        status = 'Whitelisted' if whitelisted else 'Blocked'
+        tag = 'whitelisted' if whitelisted else 'blocked'
+        return (status, self._device_names.get(dev_id, ''), dev_id), (tag,)
+
+    def _apply_device_diff(self, upserts, removed, batch_size=300):
+        # Applied in batches so thousands of rows never block the event loop for long.
+        for dev_id in removed:
+            item = self._device_rows.pop(dev_id)
+            self._device_names.pop(dev_id, None)
+            self._row_devices.pop(item, None)
+            self._hidden_rows.discard(item)
+            self.usb_tree.delete(item)
+
+        for dev_id, name in upserts[:batch_size]:
+            item = self._device_rows.get(dev_id)
+            if item is None:
+                self._device_names[dev_id] = name
+                values, tags = self._row_values(dev_id)
+                item = self.usb_tree.insert('', 'end', values=values, tags=tags)
+                self._device_rows[dev_id] = item
+                self._row_devices[item] = dev_id
+            elif self._device_names.get(dev_id) != name:
+                self._device_names[dev_id] = name
+                values, tags = self._row_values(dev_id)
+                self.usb_tree.item(item, values=values, tags=tags)
+
+        if len(upserts) > batch_size:
+            self.after(1, self._apply_device_diff, upserts[batch_size:], [], batch_size)
+        else:
+            self._applying_diff = False
+            self.device_status_label.config(text=f"{len(self._device_rows)} devices")
+            self._apply_filter()
+
+    def _schedule_filter(self, *args):
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(150, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        text = self.filter_var.get().strip().lower()
+        position = 0
+        for dev_id, item in self._device_rows.items():
+            visible = not text or text in dev_id.lower() or text in self._device_names.get(dev_id, '').lower()
+            if visible:
+                if item in self._hidden_rows:
+                    self.usb_tree.move(item, '', position)
+                    self._hidden_rows.discard(item)
+                position += 1
+            elif item not in self._hidden_rows:
+                self.usb_tree.detach(item)
+                self._hidden_rows.add(item)
 
     def toggle_whitelist(self, event):
         item_id = self.usb_tree.focus()
-        if not item_id:
+        dev_id = self._row_devices.get(item_id)
+        if not dev_id:
             return
-        item = self.usb_tree.item(item_id)
-        dev_id = item['values'][2]
-        if dev_id in self.whitelisted_devices:
-            self.whitelisted_devices.remove(dev_id)
-        else:
-            self.whitelisted_devices.add(dev_id)
-        self.populate_usb_devices()
+        # Replaced rather than mutated: the monitor thread may be reading it for a lockdown.
+        self.whitelisted_devices = self.whitelisted_devices ^ {dev_id}
+        values, tags = self._row_values(dev_id)
+        self.usb_tree.item(item_id, values=values, tags=tags)
 
     def _load_whitelist(self):
-        try:
-            with open('config/whitelist.json', 'r') as f:
-                return set(json.load(f))
-        except (FileNotFoundError, json.JSONDecodeError):
-            return set()
+        return set(self.config_store.get('whitelist'))
 
     def _save_whitelist(self):
-        try:
-            with open('config/whitelist.json', 'w') as f:
-                json.dump(list(self.whitelisted_devices), f, indent=4)
+        if self.config_store.set('whitelist', sorted(self.whitelisted_devices), save_now=True):
+            if self.settings_saved_callback:
+                self.settings_saved_callback()
             self.notification_manager.show_success("Whitelist Saved", "The list of safe devices has been updated.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not save whitelist: {e}", parent=self)
+        else:
+            messagebox.showerror("Error", "Could not save whitelist. See the log for details.", parent=self)
 
     def change_password(self):
         old_pwd, new_pwd, confirm_pwd = self.old_pwd_entry.get(), self.new_pwd_entry.get(), self.confirm_pwd_entry.get()
         if not all((old_pwd, new_pwd, confirm_pwd)):
             messagebox.showerror("Error", "All fields are required.", parent=self)
             return
-        if not self.security_manager.verify_password(old_pwd, self.get_current_hash()):
-            messagebox.showerror("Error", "Old password is not correct.", parent=self)
-            return
         if new_pwd != confirm_pwd:
             messagebox.showerror("Error", "New passwords do not match.", parent=self)
             return
-        new_hash = self.security_manager.hash_password(new_pwd)
+        wait = self.password_verifier.retry_after()
+        if wait > 0:
+            messagebox.showerror("Error", f"Too many attempts. Try again in {wait:.0f} s.", parent=self)
+            return
+        future = self.password_verifier.submit(old_pwd)
+        if future is None or future is self._password_check:
+            return
+        self._password_check = future
+        poll_future(self, future, lambda f: self._on_old_password_checked(f, new_pwd))
+
+    def _on_old_password_checked(self, future, new_pwd):
+        self._password_check = None
+        ok, _ = future.result()
+        if not ok:
+            messagebox.showerror("Error", "Old password is not correct.", parent=self)
+            return
+        # Hashing the new password is another bcrypt run, so it stays off the Tk thread too.
+        run_in_background(self, self.security_manager.hash_password, self._on_password_hashed, new_pwd)
+
+    def _on_password_hashed(self, future):
+        new_hash = future.result()
         self.on_password_change(new_hash)
         self.old_pwd_entry.delete(0, tk.END)
         self.new_pwd_entry.delete(0, tk.END)
@@ -211,6 +310,10 @@ class MainWindow(tk.Toplevel):
             if self.stop_monitoring_callback:
                 self.stop_monitoring_callback()
 
+    def capture_profile(self):
+        if self.capture_profile_callback:
+            self.capture_profile_callback()
+
     def update_monitoring_ui(self, is_active):
         self.is_monitoring = is_active
         if self.is_monitoring:
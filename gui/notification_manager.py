@@ -1,9 +1,24 @@
 from plyer import notification
 from tkinter import messagebox
-import tkinter as tk
+from collections import OrderedDict
+import threading
+import time
 
 
 class NotificationManager:
+    def __init__(self, ui_bus=None, min_interval=2.0, max_pending=5):
+        # Toasts are shown by a worker thread: plyer can block for a while.
+        # Pending toasts with the same title are merged, at most one toast is
+        # shown every min_interval seconds and the backlog is capped.
+        self.ui_bus = ui_bus
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._last_shown = 0.0
+        self._thread = threading.Thread(target=self._worker, name="notifications", daemon=True)
+        self._thread.start()
+
     def show_info(self, title, message):
         self._show_system_notification(title, message)
 
@@ -11,6 +26,27 @@ class NotificationManager:
         self._show_system_notification(title, message)
 
     def _show_system_notification(self, title, message):
+        with self._condition:
+            self._pending[title] = message
+            self._pending.move_to_end(title)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+            self._condition.notify()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                title, message = self._pending.popitem(last=False)
+
+            wait = self._last_shown + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_shown = time.monotonic()
+            self._notify(title, message)
+
+    def _notify(self, title, message):
         try:
             notification.notify(
                 title=title,
@@ -21,4 +57,5 @@ class NotificationManager:
         except Exception as e:
             # Fallback to a simple messagebox if plyer fails
             print(f"System notification failed: {e}")
-            messagebox.showinfo(title, message)
\ No newline at end of file
+            if self.ui_bus:
+                self.ui_bus.post(messagebox.showinfo, title, message)
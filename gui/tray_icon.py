@@ -6,6 +6,12 @@ from .config import Config
 class TrayIcon:
     def __init__(self, main_window):
         self.main_window = main_window
+        # Rendered once; switching state only swaps the image reference.
+        self._images = {
+            True: self._create_image(Config.SUCCESS_COLOR),
+            False: self._create_image(Config.DARK_GRAY_FRAME),
+        }
+        self._active = False
         self.icon = self._create_pystray_icon()
         self.thread = threading.Thread(target=self.icon.run, daemon=True)
         self.thread.start()
@@ -19,20 +25,24 @@ class TrayIcon:
         return image
 
     def _create_pystray_icon(self):
+        # Menu callbacks run on the pystray thread; the UI bus moves them to Tk.
+        bus = self.main_window.ui_bus
         menu = pystray.Menu(
-            pystray.MenuItem("Show Window", self.main_window.show, default=True),
-            pystray.MenuItem("Toggle Monitoring", self.main_window.toggle_monitoring),
+            pystray.MenuItem("Show Window", bus.callback(self.main_window.show), default=True),
+            # Not keyed: two quick clicks are two toggles, not one.
+            pystray.MenuItem("Toggle Monitoring", bus.callback(self.main_window.toggle_monitoring)),
+            pystray.MenuItem("Capture Profile", bus.callback(self.main_window.capture_profile,
+                                                             key='capture_profile')),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem("Exit", self.main_window.exit_app)
+            pystray.MenuItem("Exit", bus.callback(self.main_window.exit_app, key='exit'))
         )
-        image = self._create_image(Config.DARK_GRAY_FRAME)
-        return pystray.Icon("FaceLock", image, "FaceLock", menu)
+        return pystray.Icon("FaceLock", self._images[False], "FaceLock", menu)
 
     def update_icon_status(self, active: bool):
-        if self.icon:
-            color = Config.SUCCESS_COLOR if active else Config.DARK_GRAY_FRAME
-            self.icon.icon = self._create_image(color)
+        if self.icon and active != self._active:
+            self._active = active
+            self.icon.icon = self._images[active]
 
     def stop(self):
         if self.icon:
-            self.icon.stop()
\ No newline at end of file
+            self.icon.stop()
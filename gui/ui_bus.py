@@ -0,0 +1,59 @@
+import queue
+import threading
+
+
+class UIEventBus:
+    """Runs callables on the Tk thread on behalf of any other thread.
+
+    Background threads call post(); the Tk thread drains the queue every
+    ``poll_ms`` milliseconds via after(). Posts that share a ``key`` are
+    coalesced: only the most recent one runs, once.
+    """
+
+    def __init__(self, root, poll_ms=30, max_per_poll=100, logger=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.max_per_poll = max_per_poll
+        self.logger = logger
+        self._queue = queue.SimpleQueue()
+        self._keyed = {}
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def stop(self):
+        self._running = False
+
+    def post(self, func, *args, key=None):
+        if key is None:
+            self._queue.put((None, func, args))
+            return
+        with self._lock:
+            already_queued = key in self._keyed
+            self._keyed[key] = (func, args)
+        if not already_queued:
+            self._queue.put((key, None, None))
+
+    def callback(self, func, *args, key=None):
+        """Wraps func so calling the wrapper from any thread posts it to the Tk thread."""
+        return lambda: self.post(func, *args, key=key)
+
+    def _poll(self):
+        for _ in range(self.max_per_poll):
+            try:
+                key, func, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is not None:
+                with self._lock:
+                    func, args = self._keyed.pop(key)
+            try:
+                func(*args)
+            except Exception as e:
+                if self.logger: self.logger.error(f"UI callback {getattr(func, '__name__', func)} failed: {e}")
+        if self._running:
+            self.root.after(self.poll_ms, self._poll)
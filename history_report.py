@@ -0,0 +1,45 @@
+# history_report.py
+import argparse
+import time
+
+from core.presence_history import PresenceHistory, DAY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise FaceLock presence history.")
+    parser.add_argument("directory", nargs="?", default="../logs/history",
+                        help="History directory (history_dir in app_settings.json).")
+    parser.add_argument("--days", type=int, default=7, help="How many days back to report.")
+    args = parser.parse_args()
+
+    history = PresenceHistory(args.directory, readonly=True)
+    end = time.time()
+    start = end - args.days * DAY
+
+    query_start = time.perf_counter()
+    away = history.away_minutes_per_day(start, end)
+    by_hour = history.locks_by_hour_of_day(start, end)
+    lockdowns = history.lockdown_stats(start, end)
+    query_ms = (time.perf_counter() - query_start) * 1000
+
+    print(f"Away minutes per day (last {args.days} days):")
+    for day, minutes in away.items():
+        print(f"  {time.strftime('%Y-%m-%d', time.localtime(day))}  {minutes:7.1f}")
+    if not away:
+        print("  no data")
+
+    print("\nLocks by hour of day:")
+    peak = max(by_hour.max(), 1)
+    for hour, count in enumerate(by_hour):
+        if count:
+            print(f"  {hour:02d}:00  {count:5d}  {'#' * int(40 * count / peak)}")
+
+    if lockdowns['count']:
+        print(f"\nLockdowns: {lockdowns['count']}, mean {lockdowns['mean']:.2f} s, "
+              f"p95 {lockdowns['p95']:.2f} s, max {lockdowns['max']:.2f} s")
+    print(f"\n(queries took {query_ms:.1f} ms)")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,43 @@
 import sys
 import tkinter as tk
 from tkinter import messagebox
-import json
-import os
+import importlib
 import threading
-import ctypes
-from ctypes import wintypes
 
 from utils.logger_setup import setup_logging
 from core.security_manager import SecurityManager
+from core.config_store import ConfigStore
 from core.system_controller import SystemController
-from core.presence_monitor import PresenceMonitor, HaarCascadeDetector, CustomSkinDetector
+from core.monitor_service import MonitorService, EVENT_MONITORING
+from core.session_events import (SessionEventDispatcher, WTS_SESSION_UNLOCK, DBT_DEVICEARRIVAL,
+                                 DBT_DEVICEREMOVECOMPLETE, wait_for_user_login)
+from gui.async_utils import run_in_background
+from core.password_verifier import PasswordVerifier
 from gui.login_window import LoginWindow
-from gui.main_window import MainWindow
-import reset_locks
+from gui.ui_bus import UIEventBus
 
 logger = setup_logging()
-SETTINGS_FILE = "config/app_settings.json"
-PASSWORD_FILE = "config/password.json"
 
+# Heavy modules (OpenCV, bcrypt, pystray/PIL, plyer) are not needed to show the
+# login window. They are imported in the background once it is up.
+DEFERRED_IMPORTS = ("bcrypt", "core.presence_monitor", "gui.main_window")
 
-def wait_for_user_login():
-    def on_unlock():
-        reset_locks.main()
 
-    user32 = ctypes.WinDLL('user32', use_last_error=True)
-    WTS_SESSION_UNLOCK = 0x8
-    WM_WTSSESSION_CHANGE = 0x02B1
-    NOTIFY_FOR_ALL_SESSIONS = 1
-
-    hwnd = None
-    msg = wintypes.MSG()
-
-    def window_proc(hwnd, msg_type, wparam, lparam):
-        if msg_type == WM_WTSSESSION_CHANGE and wparam == WTS_SESSION_UNLOCK:
-            on_unlock()
-        return user32.DefWindowProcW(hwnd, msg_type, wparam, lparam)
-
-    wndproc = ctypes.WINFUNCTYPE(
-        wintypes.LRESULT,
-        wintypes.HWND,
-        wintypes.UINT,
-        wintypes.WPARAM,
-        wintypes.LPARAM
-    )(window_proc)
-
-    wc = wintypes.WNDCLASSW()
-    wc.lpfnWndProc = wndproc
-    wc.lpszClassName = "UserLoginMonitor"
-    wc.hInstance = user32.GetModuleHandleW(None)
-
-    class_atom = user32.RegisterClassW(ctypes.byref(wc))
-    if not class_atom:
-        return
-
-    hwnd = user32.CreateWindowExW(0, class_atom, "UserLoginMonitor", 0, 0, 0, 0, 0, None, None, wc.hInstance, None)
-    if not hwnd:
-        return
-
-    if not user32.WTSRegisterSessionNotification(hwnd, NOTIFY_FOR_ALL_SESSIONS):
-        user32.DestroyWindow(hwnd)
-        return
-
-    while True:
-        result = user32.GetMessageW(ctypes.byref(msg), None, 0, 0)
-        if result <= 0:
-            break
-        user32.TranslateMessage(ctypes.byref(msg))
-        user32.DispatchMessageW(ctypes.byref(msg))
+def preload_modules(names=DEFERRED_IMPORTS):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"Background import of {name} failed: {e}")
 
 
 class FaceLockApp:
-    def __init__(self):
+    def __init__(self, system_controller=None):
         self.root = tk.Tk()
         self.root.withdraw()
+        self.ui_bus = UIEventBus(self.root, logger=logger)
 
-        self.system_controller = SystemController(logger=logger)
-        self.system_controller.reset_all_usb_ports()
+        self.system_controller = system_controller or SystemController(logger=logger)
 
         if not self.system_controller.is_admin():
             logger.error("FATAL: Application must be run with administrator privileges.")
@@ -84,156 +45,242 @@ class FaceLockApp:
                                  "This application requires administrator privileges. Please restart as admin.")
             sys.exit(1)
 
-        self.settings = self._load_settings()
+        self.config = ConfigStore(logger=logger)
+        self.settings = self.config.get('app_settings')
+        self._apply_settings('app_settings', self.settings)
+        self.config.subscribe('app_settings', self._apply_settings)
         self.current_password_hash = self._load_or_create_password_hash()
-
-        self.presence_monitor = None
+        # One verifier for the login window and the password change form, so
+        # both count toward the same lockout.
+        self.password_verifier = PasswordVerifier(get_hash=lambda: self.current_password_hash)
+
+        # Monitoring runs in-process unless "use_service" points the window at
+        # a running headless daemon (service.py), which then owns the camera.
+        # Reaching the daemon can take up to the IPC timeout, so it is tried in
+        # the background once the login window is up; until then there is no service.
+        self.service = None
+        self.remote_service = False
         self.main_window = None
+        self.session_dispatcher = None
+        self._stop_events = threading.Event()
 
-    def _load_settings(self):
+    def _apply_settings(self, name, settings):
+        self.settings = settings
+        SecurityManager.BCRYPT_ROUNDS = int(settings.get('bcrypt_rounds', SecurityManager.BCRYPT_ROUNDS))
+
+    def _connect_to_service(self):
+        from core.ipc import IPCClient, TOKEN_FILE, IPC_PORT
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {'lockdown_level': 'standard', 'detection_engine': 'haar'}
+            with open(TOKEN_FILE, 'r') as f:
+                token = f.read().strip()
+        except OSError:
+            logger.warning("use_service is set but no service token was found. Monitoring in-process.")
+            return None
+        client = IPCClient(token, port=int(self.settings.get('ipc_port', IPC_PORT)))
+        if not client.is_available():
+            logger.warning("use_service is set but the service is not reachable. Monitoring in-process.")
+            return None
+        logger.info("Connected to the FaceLock service.")
+        return client
 
     def _load_or_create_password_hash(self):
-        try:
-            with open(PASSWORD_FILE, 'r') as f:
-                return json.load(f)['password_hash']
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            default_hash = SecurityManager.hash_password("admin")
-            self._save_password_hash(default_hash)
-            logger.info("Password file not found. Created with default 'admin'.")
-            return default_hash
+        password_hash = self.config.get('password').get('password_hash')
+        if password_hash:
+            return password_hash
+        default_hash = SecurityManager.hash_password("admin")
+        self._save_password_hash(default_hash)
+        logger.info("Password file not found. Created with default 'admin'.")
+        return default_hash
 
     def _save_password_hash(self, new_hash):
         self.current_password_hash = new_hash
-        os.makedirs(os.path.dirname(PASSWORD_FILE), exist_ok=True)
-        with open(PASSWORD_FILE, 'w') as f:
-            json.dump({'password_hash': new_hash}, f, indent=4)
+        self.config.set('password', {'password_hash': new_hash}, save_now=True)
         logger.info("Password hash has been updated.")
 
     def run(self):
+        self.ui_bus.start()
         login_window = LoginWindow(
             master=self.root,
             on_login_success=self.on_login_success,
-            current_hash=self.current_password_hash
+            on_password_rehash=self._save_password_hash,
+            verifier=self.password_verifier
         )
         login_window.show()
 
-        login_thread = threading.Thread(target=wait_for_user_login, daemon=True)
+        if self.settings.get('use_service'):
+            run_in_background(self.root, self._connect_to_service, lambda future: self._use_service(future.result()))
+        else:
+            self._use_service(None)
+        self.root.mainloop()
+
+    def _use_service(self, client):
+        self.service = client or MonitorService(self.system_controller, self.config, logger=logger)
+        self.remote_service = client is not None
+        if self.main_window:
+            self._attach_main_window()
+
+        if self.remote_service:
+            # The daemon handles port restores and session events itself.
+            threading.Thread(target=self._follow_service_events, name="service-events", daemon=True).start()
+            threading.Thread(target=preload_modules, args=(("bcrypt", "gui.main_window"),), name="preload",
+                             daemon=True).start()
+            return
+
+        self.service.start_metrics_server()
+        self.service.start_event_shipper()
+        # Undo any lockdown left over from a crash, without delaying the login window.
+        threading.Thread(target=self._startup_usb_reset, name="startup-usb-reset", daemon=True).start()
+        threading.Thread(target=preload_modules, name="preload", daemon=True).start()
+
+        self.session_dispatcher = SessionEventDispatcher(
+            handlers={WTS_SESSION_UNLOCK: self.service.restore_ports,
+                      DBT_DEVICEARRIVAL: self.service.device_arrived,
+                      DBT_DEVICEREMOVECOMPLETE: self.service.device_removed},
+            logger=logger
+        )
+        self.session_dispatcher.start()
+        login_thread = threading.Thread(target=wait_for_user_login, args=(self.session_dispatcher,), daemon=True)
         login_thread.start()
 
-        self.root.mainloop()
+    def _follow_service_events(self):
+        from core.ipc import IPCError
+        try:
+            self.ui_bus.post(self._show_monitoring_state, self.service.status().get('monitoring', False))
+            for event in self.service.events(stop_event=self._stop_events):
+                if event['type'] == EVENT_MONITORING:
+                    self.ui_bus.post(self._show_monitoring_state, event['active'], key='monitoring_state')
+        except (OSError, IPCError) as e:
+            logger.error(f"Lost connection to the FaceLock service: {e}")
+
+    def _startup_usb_reset(self):
+        try:
+            restored = self.system_controller.reset_all_usb_ports()
+        except Exception as e:
+            logger.error(f"Startup USB reset failed: {e}")
+            restored = False
+        self.ui_bus.post(self._report_startup_usb_reset, restored)
+
+    def _report_startup_usb_reset(self, restored):
+        if restored:
+            logger.info("Startup USB reset finished.")
+        else:
+            messagebox.showwarning("USB Reset",
+                                   "Some USB devices from a previous lockdown could not be re-enabled. "
+                                   "See the log for details.")
 
     def on_login_success(self):
-        self.system_controller.reset_all_usb_ports()
+        from gui.main_window import MainWindow
 
         self.main_window = MainWindow(
             on_exit=self.shutdown,
             on_password_change=self._save_password_hash,
-            get_current_hash_func=lambda: self.current_password_hash,
+            password_verifier=self.password_verifier,
             system_controller=self.system_controller,
-            settings=self.settings
+            config_store=self.config,
+            ui_bus=self.ui_bus
         )
         self.main_window.start_monitoring_callback = self.start_monitoring
         self.main_window.stop_monitoring_callback = self.stop_monitoring
+        self.main_window.capture_profile_callback = self.capture_profile
+        if self.service is not None:
+            self._attach_main_window()
         self.main_window.show()
         logger.info("Main window displayed.")
 
-    def _handle_presence_change(self, is_present):
-        if is_present:
-            return
+    def _attach_main_window(self):
+        if self.remote_service:
+            self.main_window.settings_saved_callback = self._push_settings_to_service
+        else:
+            self.service.whitelist_provider = lambda: self.main_window.whitelisted_devices
 
-        logger.warning("Absence detected. Locking workstation and securing ports.")
-        self.system_controller.lock_workstation()
+    def _push_settings_to_service(self):
+        # The daemon has its own ConfigStore: write ours out, then have it re-read.
+        self.config.flush()
 
-        lockdown_level = self.settings.get('lockdown_level', 'standard')
+        def reload():
+            try:
+                self.service.reload_settings()
+            except Exception as e:
+                logger.error(f"Could not reload settings in the FaceLock service: {e}")
 
-        if lockdown_level == 'total':
-            logger.info("Applying TOTAL LOCKDOWN: Disabling USB storage service.")
-            self.system_controller.set_usb_storage_state(enable=False)
-        else:
-            logger.info("Applying STANDARD LOCK: Disabling non-whitelisted devices.")
-            protected_keywords = [
-                "root hub", "host controller", "camera", "webcam", "keyboard", "mouse",
-                "bluetooth", "intel", "dell", "hp", "lenovo", "usb composite",
-                "ucsi", "input device", "video", "monitor", "display", "audio",
-                "composite", "controller", "internal", "builtin"
-            ]
-            whitelisted_ids = self.main_window.whitelisted_devices if self.main_window else set()
-            all_usb_devices = self.system_controller.get_usb_devices()
-
-            for device in all_usb_devices:
-                device_id = device.get('id')
-                device_name = device.get('name', '').lower().strip()
-
-                # --- فیلترهای ایمن برای حذف داده‌های نامعتبر ---
-                if not device_id or len(device_id) == 0:
-                    continue
-
-                # حذف خطوطی که خروجی کنسول هستند
-                if ("matching device(s)" in device_id or
-                        "device(s)" in device_id or
-                        "found" in device_id or
-                        "disabled" in device_id or
-                        "enabled" in device_id or
-                        len(device_id) > 200):
-                    continue
-
-                # فقط دستگاه‌های با پیشوند معتبر
-                if not (device_id.startswith("USB\\") or
-                        device_id.startswith("SWD\\") or
-                        device_id.startswith("ACPI\\")):
-                    continue
-
-                is_protected = any(keyword in device_name for keyword in protected_keywords)
-                is_whitelisted = device_id in whitelisted_ids
-
-                if not is_protected and not is_whitelisted:
-                    logger.info(f"Disabling non-essential device: {device_name}")
-                    self.system_controller.set_device_state_by_id(device_id, enable=False)
+        threading.Thread(target=reload, name="service-reload", daemon=True).start()
+
+    def _show_monitoring_state(self, active):
+        if self.main_window:
+            self.main_window.update_monitoring_ui(is_active=active)
+
+    def _service_ready(self):
+        if self.service is not None:
+            return True
+        messagebox.showinfo("FaceLock", "Still connecting to the FaceLock service, please try again in a moment.")
+        self._show_monitoring_state(False)
+        return False
 
+    # Over IPC these calls can block for the client timeout, so they run on a
+    # worker thread and the result is handled back on the Tk thread.
     def start_monitoring(self):
-        if self.presence_monitor and self.presence_monitor.is_alive():
-            logger.warning("Monitoring is already running.")
-            return
+        if self._service_ready():
+            run_in_background(self.root, self.service.start_monitoring, self._monitoring_started)
+
+    def _monitoring_started(self, future):
         try:
-            engine_choice = self.settings.get('detection_engine', 'haar')
-            detector = CustomSkinDetector(logger=logger) if engine_choice == 'skin' else HaarCascadeDetector(logger=logger)
-            self.presence_monitor = PresenceMonitor(detector_engine=detector,
-                                                    on_presence_change=self._handle_presence_change, lock_delay=10,
-                                                    logger=logger)
-            self.presence_monitor.start()
-            if self.main_window:
-                self.main_window.update_monitoring_ui(is_active=True)
-                self.main_window.notification_manager.show_success("Monitoring Started",
-                                                                   "System is now being monitored.")
-        except (FileNotFoundError, ValueError) as e:
+            started = future.result()
+        except Exception as e:
             logger.error(f"Could not start monitoring: {e}")
             messagebox.showerror("Error", "Could not start monitoring. Ensure asset files are correct and readable.")
-            if self.main_window:
-                self.main_window.update_monitoring_ui(is_active=False)
+            self._show_monitoring_state(False)
+            return
+        if started and self.main_window:
+            self.main_window.update_monitoring_ui(is_active=True)
+            self.main_window.notification_manager.show_success("Monitoring Started",
+                                                               "System is now being monitored.")
 
     def stop_monitoring(self):
-        if not self.presence_monitor or not self.presence_monitor.is_alive():
-            logger.warning("Monitoring is not running.")
+        if self._service_ready():
+            run_in_background(self.root, self.service.stop_monitoring, self._monitoring_stopped)
+
+    def _monitoring_stopped(self, future):
+        try:
+            stopped = future.result()
+        except Exception as e:
+            logger.error(f"Could not stop monitoring: {e}")
+            self._show_monitoring_state(True)
             return
-        self.presence_monitor.stop()
-        self.presence_monitor.join(timeout=2.0)
-        self.presence_monitor = None
-        if self.main_window:
+        if stopped and self.main_window:
             self.main_window.update_monitoring_ui(is_active=False)
             self.main_window.notification_manager.show_info("Monitoring Stopped", "System is no longer monitored.")
 
+    def capture_profile(self):
+        # Works for the in-process service and, over IPC, for the daemon.
+        if self._service_ready():
+            run_in_background(self.root, self.service.capture_profile, self._profile_requested)
+
+    def _profile_requested(self, future):
+        try:
+            path = future.result()
+        except Exception as e:
+            logger.error(f"Could not capture a profile: {e}")
+            messagebox.showerror("Profile", f"Could not capture a profile: {e}")
+            return
+        self.main_window.notification_manager.show_info("Profiling", f"Capturing a profile to {path}")
+
     def shutdown(self):
         logger.info("Shutdown sequence initiated.")
-        self.stop_monitoring()
         if self.main_window and self.main_window.tray_icon:
             self.main_window.tray_icon.stop()
 
-        self.system_controller.reset_all_usb_ports()
+        if self.remote_service:
+            # Closing the window leaves the daemon (and monitoring) running.
+            self._stop_events.set()
+        elif self.service is not None:
+            self.service.shutdown()
+            if self.session_dispatcher:
+                self.session_dispatcher.stop()
+                logger.info(f"Session event stats: {self.session_dispatcher.stats()}")
+            self.system_controller.reset_all_usb_ports()
+        self.password_verifier.shutdown()
+        self.config.flush()
+        SecurityManager.clear_key_cache()
         self.root.quit()
         logger.info("Application has been shut down gracefully.")
         sys.exit(0)
@@ -241,4 +288,4 @@ class FaceLockApp:
 
 if __name__ == "__main__":
     app = FaceLockApp()
-    app.run()
\ No newline at end of file
+    app.run()
@@ -0,0 +1,70 @@
+# profile_report.py
+import argparse
+import pstats
+import sys
+import time
+
+from core.profiler import PROFILE_DIR, latest_profile, load_profile
+
+SORT_KEYS = {'self': pstats.SortKey.TIME, 'cumulative': pstats.SortKey.CUMULATIVE, 'calls': pstats.SortKey.CALLS}
+
+
+def short_path(filename, width=60):
+    return filename if len(filename) <= width else "..." + filename[-(width - 3):]
+
+
+def print_hotspots(stats, sort, top):
+    stats.sort_stats(SORT_KEYS[sort])
+    print(f"Top {top} functions by {sort} time:")
+    print(f"  {'calls':>9} {'self s':>9} {'cum s':>9}  function")
+    for func in stats.fcn_list[:top]:
+        primitive, calls, self_time, cumulative, _ = stats.stats[func]
+        filename, line, name = func
+        where = name if filename == '~' else f"{name}  ({short_path(filename)}:{line})"
+        count = f"{calls}" if calls == primitive else f"{calls}/{primitive}"
+        print(f"  {count:>9} {self_time:9.3f} {cumulative:9.3f}  {where}")
+
+
+def print_allocations(snapshot, group, top):
+    statistics = snapshot.statistics(group)
+    total = sum(stat.size for stat in statistics)
+    print(f"\nTop {top} allocation sites still held at the end ({total / 1e6:.1f} MB in "
+          f"{sum(stat.count for stat in statistics)} blocks):")
+    for stat in statistics[:top]:
+        frame = stat.traceback[0]
+        print(f"  {stat.size / 1e3:9.1f} kB {stat.count:7d} blocks  {short_path(frame.filename)}:{frame.lineno}")
+        if group == 'traceback':
+            for caller in list(stat.traceback)[1:4]:
+                print(f"  {'':27}from {short_path(caller.filename)}:{caller.lineno}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a FaceLock profile capture.")
+    parser.add_argument("profile", nargs="?",
+                        help=f"Profile file (default: the newest one in {PROFILE_DIR}, profile_dir in app_settings.json).")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table.")
+    parser.add_argument("--sort", choices=SORT_KEYS, default='self', help="Order of the function table.")
+    parser.add_argument("--tracebacks", action="store_true", help="Group allocations by call stack, not by line.")
+    parser.add_argument("--export-pstats", metavar="FILE",
+                        help="Also write the function profile in pstats format (snakeviz, gprof2dot, ...).")
+    args = parser.parse_args()
+
+    path = args.profile or latest_profile()
+    if not path:
+        print(f"No profiles in {PROFILE_DIR}.")
+        sys.exit(1)
+    meta, stats, snapshot = load_profile(path)
+
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(meta['started']))
+    print(f"{path}: {meta['label']} thread of process {meta['pid']}, {started}, {meta['seconds']:.1f} s")
+    print(f"Thread CPU {meta['thread_cpu_seconds']:.2f} s ({100 * meta['thread_cpu_seconds'] / meta['seconds']:.0f}% "
+          f"of one core), traced memory peak {meta['traced_peak_bytes'] / 1e6:.1f} MB\n")
+    print_hotspots(stats, args.sort, args.top)
+    print_allocations(snapshot, 'traceback' if args.tracebacks else 'lineno', args.top)
+    if args.export_pstats:
+        stats.dump_stats(args.export_pstats)
+        print(f"\npstats written to {args.export_pstats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ import ctypes
 import sys
 import os
 
+from core.system_controller import SystemController
+from utils.logger_setup import setup_logging
+
 def is_admin():
     try:
         return ctypes.windll.shell32.IsUserAnAdmin()
@@ -19,14 +22,15 @@ def find_devcon():
         return os.path.normpath(path_to_check)
     return None
 
-def main():
-    if not is_admin():
-        print("ERROR: This script must be run as an administrator!")
-        input("Press Enter to exit...")
-        return
-
-    print("--- Starting System Reset ---")
+def restore_from_journal():
+    # Only undo what FaceLock recorded in its lockdown journal.
+    controller = SystemController(logger=setup_logging())
+    if controller.reset_all_usb_ports():
+        print("[SUCCESS] All journaled lockdown changes have been restored.")
+    else:
+        print("[ERROR] Some devices could not be restored. Run with --all for a full reset.")
 
+def full_reset():
     # Step 1: Re-enable the USB Storage Service via Registry
     try:
         key_path = r"SYSTEM\CurrentControlSet\Services\USBSTOR"
@@ -51,8 +55,20 @@ def main():
     else:
         print("[ERROR] devcon.exe not found. Cannot perform devcon reset.")
 
+def main(full=False):
+    if not is_admin():
+        print("ERROR: This script must be run as an administrator!")
+        input("Press Enter to exit...")
+        return
+
+    print("--- Starting System Reset ---")
+    if full:
+        full_reset()
+    else:
+        restore_from_journal()
+
     print("\n--- Reset Complete ---")
     input("Press Enter to exit...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(full="--all" in sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,119 @@
+# service.py
+import argparse
+import json
+import signal
+import sys
+import threading
+
+from utils.logger_setup import setup_logging
+from core.config_store import ConfigStore
+from core.ipc import IPCClient, IPCError, IPCServer, IPC_PORT, TOKEN_FILE, load_or_create_token
+from core.monitor_service import MonitorService
+from core.session_events import (SessionEventDispatcher, WTS_SESSION_UNLOCK, DBT_DEVICEARRIVAL,
+                                 DBT_DEVICEREMOVECOMPLETE, wait_for_user_login)
+from core.system_controller import SystemController
+
+CONTROL_COMMANDS = ('status', 'start', 'stop', 'reload', 'events', 'profile')
+
+
+def run_daemon(start_monitoring=True, port=None):
+    """Headless FaceLock: monitoring, lockdown and the IPC channel, without Tk or the tray."""
+    logger = setup_logging()
+    controller = SystemController(logger=logger)
+    if not controller.is_admin():
+        logger.error("FATAL: The service must be run with administrator privileges.")
+        sys.exit(1)
+
+    config = ConfigStore(logger=logger)
+    service = MonitorService(controller, config, logger=logger)
+    port = port or int(config.get('app_settings').get('ipc_port', IPC_PORT))
+    server = IPCServer(service, load_or_create_token(logger=logger), port=port, logger=logger)
+    if not server.start():
+        sys.exit(1)
+
+    # Undo any lockdown left over from a crash before protecting again.
+    controller.reset_all_usb_ports()
+    service.start_metrics_server()
+    service.start_event_shipper()
+    dispatcher = SessionEventDispatcher(handlers={WTS_SESSION_UNLOCK: service.restore_ports,
+                                                  DBT_DEVICEARRIVAL: service.device_arrived,
+                                                  DBT_DEVICEREMOVECOMPLETE: service.device_removed},
+                                        logger=logger)
+    dispatcher.start()
+    threading.Thread(target=wait_for_user_login, args=(dispatcher,), name="session-listener", daemon=True).start()
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    # SIGUSR1 (Ctrl+Break on Windows) captures a profile of the monitor thread.
+    profile_signal = getattr(signal, 'SIGUSR1', None) or getattr(signal, 'SIGBREAK', None)
+    if profile_signal:
+        signal.signal(profile_signal, lambda *_: threading.Thread(target=_profile_on_signal, args=(service, logger),
+                                                                  daemon=True).start())
+
+    if start_monitoring:
+        try:
+            service.start_monitoring()
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"Could not start monitoring: {e}")
+    logger.info("FaceLock service running.")
+
+    # Short waits keep the main thread responsive to signals on Windows.
+    while not stop.wait(1.0):
+        pass
+
+    logger.info("FaceLock service stopping.")
+    server.stop()
+    service.shutdown()
+    dispatcher.stop()
+    controller.reset_all_usb_ports()
+    config.flush()
+
+
+def _profile_on_signal(service, logger):
+    try:
+        service.capture_profile()
+    except RuntimeError as e:
+        logger.warning(f"Profile requested by signal not captured: {e}")
+
+
+def configured_port():
+    # Same lookup as run_daemon, so a client finds a daemon on a configured port.
+    return int(ConfigStore().get('app_settings').get('ipc_port', IPC_PORT))
+
+
+def control(command, port, seconds=None):
+    try:
+        with open(TOKEN_FILE, 'r') as f:
+            token = f.read().strip()
+    except OSError:
+        print(f"No service token at {TOKEN_FILE}; is the service installed here?")
+        sys.exit(1)
+    client = IPCClient(token, port=port)
+    try:
+        if command == 'events':
+            for event in client.events():
+                print(json.dumps(event))
+        elif command == 'profile':
+            print(f"Profiling; the result will be written to {client.capture_profile(seconds)}")
+        else:
+            print(json.dumps(client.call(command), indent=2))
+    except (OSError, IPCError) as e:
+        print(f"Service request failed: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run FaceLock headless, or control a running service.")
+    parser.add_argument("command", nargs="?", choices=CONTROL_COMMANDS,
+                        help="Send a command to the running service instead of starting one.")
+    parser.add_argument("--idle", action="store_true", help="Start the service without starting monitoring.")
+    parser.add_argument("--port", type=int, help=f"IPC port (default: ipc_port setting or {IPC_PORT}).")
+    parser.add_argument("--seconds", type=float, help="Length of a 'profile' capture (default: profile_seconds or 30).")
+    args = parser.parse_args()
+    if args.command:
+        control(args.command, args.port or configured_port(), seconds=args.seconds)
+    else:
+        run_daemon(start_monitoring=not args.idle, port=args.port)
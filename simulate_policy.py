@@ -0,0 +1,97 @@
+# simulate_policy.py
+import argparse
+import time
+
+import numpy as np
+
+from core.config_store import ConfigStore
+from core.lock_policy import (PolicySimulator, load_trace, synthetic_trace, LOCK_DELAY, GRACE_PERIOD,
+                              SESSION_GAP)
+
+
+def parse_smoothing(value):
+    # "k/n", e.g. "2/3": no face in at least 2 of the last 3 samples.
+    k, n = (int(part) for part in value.split('/'))
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError(f"Expected k/n with 1 <= k <= n, got {value!r}.")
+    return k, n
+
+
+def current_policy():
+    # What the monitor is configured with now, as MonitorService reads it.
+    settings = ConfigStore().get('app_settings')
+    return float(settings.get('lock_delay', LOCK_DELAY)), float(settings.get('grace_period', GRACE_PERIOD))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a detection trace under many lock policies at once.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("trace", nargs="?", help="An .npz trace with timestamps and verdicts (e.g. from "
+                                                 "export_recording.py) and optionally a boolean truth array.")
+    source.add_argument("--synthetic", type=float, metavar="DAYS", help="Use a generated, labelled trace instead.")
+    parser.add_argument("--delays", type=float, nargs="+", default=[3, 5, 7, 10, 15, 20, 30, 45, 60])
+    parser.add_argument("--grace", type=float, nargs="+", default=[0, 5, 10])
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0, 0.5, 1.0],
+                        help="Seconds between samples; 0 replays the trace as recorded.")
+    parser.add_argument("--smoothing", type=parse_smoothing, nargs="+", default=[(1, 1), (2, 3), (3, 5)],
+                        help="k/n: a sample counts as no face only if k of the last n had none.")
+    parser.add_argument("--min-absence", type=float, default=60.0,
+                        help="Shortest real absence that must lock (also used to label unlabelled traces).")
+    parser.add_argument("--session-gap", type=float, default=SESSION_GAP,
+                        help="A gap this long between samples is treated as a monitor restart.")
+    parser.add_argument("--max-time-to-lock", type=float,
+                        help="Only list policies that lock within this many seconds on average.")
+    parser.add_argument("--top", type=int, default=15, help="How many policies to list.")
+    parser.add_argument("--csv", help="Also write every result row to this CSV file.")
+    args = parser.parse_args()
+    # The configured policy is always evaluated so it can be marked in the table.
+    lock_delay, grace_period = current_policy()
+    args.delays = sorted(set(args.delays) | {lock_delay})
+    args.grace = sorted(set(args.grace) | {grace_period})
+    args.intervals = sorted(set(args.intervals) | {0.0})
+    args.smoothing = sorted(set(args.smoothing) | {(1, 1)})
+
+    if args.synthetic:
+        timestamps, detected, truth = synthetic_trace(days=args.synthetic)
+    else:
+        timestamps, detected, truth = load_trace(args.trace)
+    if not len(timestamps):
+        print("Trace is empty.")
+        return
+    hours = (timestamps[-1] - timestamps[0]) / 3600
+    print(f"{len(timestamps)} samples over {hours:.1f} h"
+          f"{'' if truth is not None else f' (unlabelled: no-face runs of {args.min_absence:.0f} s or more count as away)'}")
+
+    start = time.perf_counter()
+    simulator = PolicySimulator(timestamps, detected, truth, min_absence=args.min_absence,
+                                session_gap=args.session_gap)
+    results = simulator.run(args.delays, args.grace, args.intervals, args.smoothing)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(results)} policies in {elapsed:.2f} s; {simulator.absence_start.size} real absences "
+          f"of {args.min_absence:.0f} s or more.\n")
+
+    # Best first: fewest missed absences, then fewest false locks, then fastest.
+    ranked = results[np.lexsort((results['mean_time_to_lock'], results['false_locks'], results['missed_absences']))]
+    current = (ranked['lock_delay'] == lock_delay) & (ranked['grace_period'] == grace_period) & \
+              (ranked['interval'] == 0) & (ranked['k'] == 1) & (ranked['n'] == 1)
+    eligible = ranked['mean_time_to_lock'] <= args.max_time_to_lock if args.max_time_to_lock else \
+        np.ones(len(ranked), dtype=bool)
+    shown = eligible & (np.cumsum(eligible) <= args.top)
+    shown |= current
+
+    print(f"{'delay s':>8}{'grace s':>9}{'interval s':>11}{'k/n':>6}{'locks':>8}{'false':>8}{'missed':>8}"
+          f"{'time to lock s':>16}")
+    for row, is_current in zip(ranked[shown], current[shown]):
+        print(f"{row['lock_delay']:>8g}{row['grace_period']:>9g}{row['interval']:>11g}"
+              f"{row['k']:>4d}/{row['n']:<1d}{row['locks']:>8d}{row['false_locks']:>8d}"
+              f"{row['missed_absences']:>8d}{row['mean_time_to_lock']:>16.1f}"
+              f"{'   <- current' if is_current else ''}")
+
+    if args.csv:
+        np.savetxt(args.csv, results, delimiter=",", header=",".join(results.dtype.names), comments="",
+                   fmt=["%g", "%g", "%g", "%d", "%d", "%d", "%d", "%d", "%d", "%.3f"])
+        print(f"\nAll results written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,126 @@
+import atexit
+import copy
+import gzip
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import shutil
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logging():
-    log_dir = "../logs"
+LOG_FORMAT_ENV = "FACELOCK_LOG_FORMAT"  # "text" (default) or "json"
+
+_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_text or record.exc_info:
+            entry['exception'] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _TracebackQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback out of the message.
+
+    The stock prepare() bakes the formatted traceback into ``msg`` and drops
+    ``exc_info``, so the JSON formatter never saw an exception. Here the
+    traceback travels as ``exc_text``, which both formatters use.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None  # tracebacks do not pickle and pin frames
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets an identical warning or error through at most once per ``interval`` seconds.
+
+    The next copy after a quiet period reports how many were dropped, so a dead
+    camera logs "Failed to grab frame" a few times a minute instead of every
+    second. Lower levels are never limited.
+    """
+
+    def __init__(self, interval=10.0, min_level=logging.WARNING, max_keys=1024):
+        super().__init__()
+        self.interval = interval
+        self.min_level = min_level
+        self.max_keys = max_keys
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        key = (record.levelno, record.msg if not record.args else (record.msg, record.args))
+        now = time.monotonic()
+        with self._lock:
+            last_time, suppressed = self._seen.get(key, (None, 0))
+            if last_time is not None and now - last_time < self.interval:
+                self._seen[key] = (last_time, suppressed + 1)
+                return False
+            if len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = (now, 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} (suppressed {suppressed} similar messages)"
+            record.args = None
+        return True
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _build_handlers(log_dir, log_format, stream=None):
+    log_file_path = os.path.join(log_dir, "app.log")
+    file_handler = RotatingFileHandler(
+        log_file_path,
+        maxBytes=2 * 1024 * 1024,  # 2 MB
+        backupCount=5,
+        encoding='utf-8'
+    )
+    # Rotated files are gzip-compressed on the listener thread, never on the caller's.
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(log_format)
+
+    console_handler = logging.StreamHandler(stream or sys.stdout)
+    console_handler.setFormatter(log_format)
+    return [file_handler, console_handler]
+
+
+def stop_logging():
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(log_dir="../logs", json_lines=None, rate_limit_seconds=10.0):
+    global _listener
     if not os.path.exists(log_dir):
         try:
             os.makedirs(log_dir)
@@ -19,26 +135,28 @@ def setup_logging():
 
     logger.setLevel(logging.INFO)
 
-    log_format = logging.Formatter(
-        '%(asctime)s - %(levelname)s - [%(module)s:%(lineno)d] - %(message)s'
-    )
+    if json_lines is None:
+        json_lines = os.environ.get(LOG_FORMAT_ENV, "text").lower() == "json"
+    if json_lines:
+        log_format = JsonLinesFormatter()
+    else:
+        log_format = logging.Formatter(
+            '%(asctime)s - %(levelname)s - [%(module)s:%(lineno)d] - %(message)s'
+        )
 
-    log_file_path = os.path.join(log_dir, "app.log")
-    file_handler = RotatingFileHandler(
-        log_file_path,
-        maxBytes=2 * 1024 * 1024,  # 2 MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setFormatter(log_format)
-    logger.addHandler(file_handler)
+    # Callers only enqueue; file and console I/O happen on the listener thread.
+    log_queue = queue.SimpleQueue()
+    queue_handler = _TracebackQueueHandler(log_queue)
+    if rate_limit_seconds:
+        queue_handler.addFilter(RateLimitFilter(interval=rate_limit_seconds))
+    logger.addHandler(queue_handler)
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(log_format)
-    logger.addHandler(console_handler)
+    _listener = QueueListener(log_queue, *_build_handlers(log_dir, log_format), respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
 
     logger.info("="*50)
     logger.info("Logger initialized successfully.")
     logger.info("="*50)
 
-    return logger
\ No newline at end of file
+    return logger